@@ -14,6 +14,9 @@ import sys
 import traceback
 import logging
 import uuid
+import hmac
+import sqlite3
+from concurrent.futures import CancelledError
 import numpy as np
 
 # Set up logging
@@ -25,23 +28,41 @@ logger = logging.getLogger(__name__)
 # Import attempt with error handling
 try:
     from pose_estimation.estimation import PoseEstimator
+    from pose_estimation.inference_gate import InferenceGate
+    from pose_estimation.inference_service import PoseInferenceService
+    from pose_estimation.landmark_recorder import LandmarkRecorder
+    from pose_estimation.process_worker import ProcessPoseEstimator
+    from pose_estimation.landmarks import NUM_LANDMARKS, landmarks_from_array
+    from pose_estimation import wire_protocol
     # NEW: Import Exercise Engine
     from exercises.engine import ExerciseEngine
+    from exercises.session import ExerciseSession
     from exercises.loader import get_available_exercises, get_exercise_info
+    from db.state_store import SessionRegistry, SharedSessionRegistry, SharedStateStore
+    from utils.capture_manager import CaptureManager, parse_stations
+    from utils.frame_source import open_frame_source
     from utils.draw_text_with_background import draw_text_with_background
+    from utils.metrics import MetricsRegistry, process_rss_bytes, stage_metrics
+    from utils.tracing import Tracer
+    from utils import profiler
     logger.info("Successfully imported pose estimation modules")
 except ImportError as e:
     logger.error(f"Failed to import required modules: {e}")
     traceback.print_exc()
     sys.exit(1)
 
+# Multi-worker deployments (gunicorn -c gunicorn.conf.py app:app) keep session and
+# job state in a store shared by the worker processes, see db/state_store.py
+SHARED_STATE = os.environ.get('SHARED_STATE', '0') == '1'
+
 # Try to import WorkoutLogger with fallback
 try:
     from db.workout_logger import WorkoutLogger
-    workout_logger = WorkoutLogger()
+    workout_logger = WorkoutLogger(shared=SHARED_STATE)
     logger.info("Successfully initialized workout logger")
-except ImportError:
-    logger.warning("WorkoutLogger import failed, creating dummy class")
+except (ImportError, sqlite3.Error, OSError) as e:
+    # Unwritable data/, a locked or corrupt database: keep serving without history
+    logger.warning(f"WorkoutLogger unavailable ({e}), creating dummy class")
     
     class DummyWorkoutLogger:
         def __init__(self):
@@ -56,19 +77,50 @@ except ImportError:
             return {}
         def get_user_stats(self, *args, **kwargs):
             return {'total_workouts': 0, 'total_exercises': 0, 'streak_days': 0}
+        def get_cached_stats(self, *args, **kwargs):
+            return {'total_workouts': 0, 'total_exercises': 0, 'total_reps': 0, 'total_minutes': 0,
+                    'avg_form_score': None, 'streak_days': 0, 'weekly_workouts': 0,
+                    'weekly_minutes': [0] * 7, 'today_reps': 0, 'exercise_distribution': {}}
     
     workout_logger = DummyWorkoutLogger()
 
+# Per-rep telemetry history (columnar store under data/rep_telemetry)
+try:
+    from db.rep_telemetry import RepTelemetryStore
+    rep_telemetry = RepTelemetryStore(shared=SHARED_STATE)
+except (ImportError, OSError) as e:
+    logger.warning(f"Rep telemetry store unavailable: {e}")
+    rep_telemetry = None
+
 logger.info("Setting up Flask application")
 app = Flask(__name__)
 app.secret_key = 'fitness_trainer_secret_key'  # Required for sessions
 
 # Global variables
 camera = None
+live_frame_shape = None
 output_frame = None
 lock = threading.Lock()
 exercise_running = False
-exercise_engine = ExerciseEngine()  # NEW: Global exercise engine
+
+# Per-frame stage spans for /api/trace and video jobs (Chrome trace-event JSON),
+# kept in a ring buffer of the most recent POSE_TRACE_BUFFER spans
+POSE_TRACE = os.environ.get('POSE_TRACE', '0') == '1'
+POSE_TRACE_BUFFER = int(os.environ.get('POSE_TRACE_BUFFER', 50000))
+tracer = Tracer(POSE_TRACE_BUFFER, enabled=POSE_TRACE)
+
+# Sampling profiler at /api/admin/profile, enabled by setting an admin token
+PROFILER_TOKEN = os.environ.get('PROFILER_TOKEN')
+PROFILER_MAX_SECONDS = 60
+profiler_lock = threading.Lock()
+
+# Prometheus metrics served at /metrics, see utils/metrics.py
+metrics = MetricsRegistry()
+live_stages = stage_metrics(metrics, 'live', tracer)
+video_stages = stage_metrics(metrics, 'video')
+video_jobs_total = metrics.counter('fitness_video_jobs_total', 'Finished video analysis jobs', labels=('status',))
+
+exercise_engine = ExerciseEngine(stages=live_stages)  # NEW: Global exercise engine
 current_exercise_type = None
 exercise_goal = 0
 sets_completed = 0
@@ -84,19 +136,83 @@ current_fps = 0
 UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 video_analyses = {}  # Store ongoing video analyses
+video_processes = {}  # video_id -> (pid, results JSON path) of running analysis subprocesses
 
 # Video upload limits
 MAX_VIDEO_SIZE_MB = 50  # Max 50MB video
 MAX_VIDEO_DURATION_SEC = 120  # Max 2 minutes
 
+# Pose inference resolution (frames wider than this are downscaled first)
+POSE_INFERENCE_WIDTH = int(os.environ.get('POSE_INFERENCE_WIDTH', 640))
+
+# MediaPipe model: 0=Lite, 1=Full, 2=Heavy, or "auto" to pick one per session/job
+# from the latency budget and switch when measured latency drifts
+POSE_MODEL_COMPLEXITY = os.environ.get('POSE_MODEL_COMPLEXITY', '1')
+POSE_LATENCY_BUDGET_MS = float(os.environ.get('POSE_LATENCY_BUDGET_MS', 40))
+POSE_BENCHMARK_CACHE = os.path.join(UPLOAD_FOLDER, 'pose_benchmark.json')
+
+# Skip live inference while nothing moves or nobody is in view
+POSE_INFERENCE_GATE = os.environ.get('POSE_INFERENCE_GATE', '1') != '0'
+inference_gate = InferenceGate()
+
+# Opt-in recording of live landmark streams for reproducing miscounts
+# (replay with: python -m pose_estimation.landmark_recorder <file>)
+POSE_RECORD_SESSIONS = os.environ.get('POSE_RECORD_SESSIONS', '0') == '1'
+RECORDINGS_FOLDER = os.environ.get('POSE_RECORDINGS_FOLDER', 'recordings')
+session_recorder = None
+
+# Client-side pose mode: the browser runs pose detection and posts only landmarks,
+# each browser session gets its own ExerciseSession here
+CLIENT_SESSION_TIMEOUT_SEC = int(os.environ.get('CLIENT_SESSION_TIMEOUT_SEC', 300))
+MAX_CLIENT_SESSIONS = int(os.environ.get('MAX_CLIENT_SESSIONS', 200))
+
+# With shared state the worker that claims the camera runs the live session: other
+# workers forward start/stop to it and relay the frames and status it publishes
+SHARED_STATE_PATH = os.environ.get('SHARED_STATE_PATH', os.path.join('data', 'shared_state.db'))
+LIVE_FRAME_PATH = os.path.join(os.path.dirname(SHARED_STATE_PATH), 'live_frame.part')
+LIVE_COMMAND_TIMEOUT_SEC = 3.0
+LIVE_PUBLISH_INTERVAL_SEC = 0.2
+CAMERA_IDLE_TIMEOUT_SEC = 10
+# Capture device index, stream URL, video file, landmark log (.plmk) or
+# synthetic:<exercise>; files and synthetic frames play at CAMERA_SOURCE_SPEED
+# times real time (0 = unpaced), see utils/frame_source.py
+CAMERA_SOURCE = os.environ.get('CAMERA_SOURCE', '0')
+CAMERA_SOURCE_SPEED = float(os.environ.get('CAMERA_SOURCE_SPEED', 1.0))
+# Extra cameras, one exercise station each: "front=0,back=rtsp://..." (same source
+# specs as CAMERA_SOURCE), served under /api/stations, see utils/capture_manager.py.
+# Stations run in one process: every worker would open the same devices and keep
+# its own station state, so they are not available with SHARED_STATE
+CAMERA_STATIONS = os.environ.get('CAMERA_STATIONS', '')
+if CAMERA_STATIONS and SHARED_STATE:
+    raise RuntimeError("CAMERA_STATIONS needs a single server process; unset SHARED_STATE "
+                       "and run without multiple gunicorn workers (e.g. python asgi.py)")
+state_store = SharedStateStore(SHARED_STATE_PATH) if SHARED_STATE else None
+camera_loop_thread = None
+camera_loop_stop = threading.Event()
+
+client_sessions = SharedSessionRegistry(state_store, 'client_pose') if state_store else SessionRegistry()
+
+metrics.gauge('fitness_video_jobs_in_progress', 'Uploaded videos being analyzed by this worker',
+              lambda: sum(1 for a in list(video_analyses.values()) if a.get('status') == 'processing'))
+metrics.gauge('fitness_active_sessions', 'Exercise sessions in progress', lambda: {
+    ('live',): 1 if exercise_running else 0,
+    ('client',): len(client_sessions),
+    ('station',): sum(1 for s in _capture_manager if s.exercise_running) if _capture_manager is not None else 0,
+}, labels=('kind',))
+metrics.gauge('fitness_station_fps', 'Frames per second of each camera station', lambda: {
+    (s.station_id,): s.fps for s in (_capture_manager if _capture_manager is not None else [])
+}, labels=('station',))
+metrics.gauge('fitness_inference_sessions', 'Sessions with an estimator on the pose inference service',
+              lambda: _inference_service.get_stats()['sessions'] if _inference_service is not None else None)
+metrics.gauge('fitness_live_fps', 'Frames per second of the live camera loop', lambda: current_fps)
+metrics.gauge('process_resident_memory_bytes', 'Resident memory of this worker process', process_rss_bytes)
+metrics.callback_counter('process_cpu_seconds_total', 'CPU time (user + system) used by this worker process',
+                         lambda: sum(os.times()[:2]))
+
 def initialize_camera():
     global camera
     if camera is None:
-        camera = cv2.VideoCapture(0)
-        # Optimize camera settings
-        camera.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        camera.set(cv2.CAP_PROP_FPS, 30)
+        camera = open_frame_source(CAMERA_SOURCE, speed=CAMERA_SOURCE_SPEED)
     return camera
 
 def release_camera():
@@ -105,28 +221,115 @@ def release_camera():
         camera.release()
         camera = None
 
-# Global pose estimator - ONLY ONE instance, created lazily when needed
-_pose_estimator = None
-_pose_estimator_lock = threading.Lock()
+# Pose inference is shared by all live sessions: a pool of worker threads sized to
+# the CPU count, each session pinned to one worker that owns its PoseEstimator
+POSE_INFERENCE_WORKERS = int(os.environ.get('POSE_INFERENCE_WORKERS', 0)) or None
+LIVE_CAMERA_SESSION = 'camera'
+# Run each session's MediaPipe graph in its own process, exchanging frames and
+# landmarks over shared memory so inference never holds the web process' GIL
+POSE_WORKER_PROCESS = os.environ.get('POSE_WORKER_PROCESS', '0') == '1'
+_inference_service = None
+_inference_service_lock = threading.Lock()
+_capture_manager = None
+_capture_manager_lock = threading.Lock()
+
+def create_pose_estimator(session_id, sample_frame=None):
+    """PoseEstimator for one session, created on its inference worker"""
+    model_complexity = POSE_MODEL_COMPLEXITY
+    if model_complexity != 'auto':
+        model_complexity = int(model_complexity)
+    estimator_class = ProcessPoseEstimator if POSE_WORKER_PROCESS else PoseEstimator
+    estimator = estimator_class(
+        model_complexity=model_complexity,
+        inference_width=POSE_INFERENCE_WIDTH,
+        track_roi=True,
+        latency_budget_ms=POSE_LATENCY_BUDGET_MS,
+        benchmark_frames=[sample_frame] * 10 if sample_frame is not None else None,
+        benchmark_cache=POSE_BENCHMARK_CACHE
+    )
+    logger.info(f"Pose model for {session_id}: {estimator.get_model_info()['model']}")
+    return estimator
+
+def get_inference_service():
+    """Get or create the shared PoseInferenceService"""
+    global _inference_service
+    with _inference_service_lock:
+        if _inference_service is None:
+            _inference_service = PoseInferenceService(create_pose_estimator, num_workers=POSE_INFERENCE_WORKERS)
+            logger.info(f"Pose inference service started with {_inference_service.get_stats()['workers']} workers")
+        return _inference_service
+
+def get_capture_manager():
+    """Get or create the CaptureManager, opening the CAMERA_STATIONS on first use"""
+    global _capture_manager
+    with _capture_manager_lock:
+        if _capture_manager is None:
+            manager = CaptureManager(get_inference_service(),
+                                     lambda station_id: stage_metrics(metrics, f'station:{station_id}', tracer),
+                                     rep_sink=save_station_reps)
+            for station_id, source in parse_stations(CAMERA_STATIONS).items():
+                try:
+                    manager.add(station_id, source, speed=CAMERA_SOURCE_SPEED)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Could not open station {station_id}: {e}")
+            _capture_manager = manager
+        return _capture_manager
 
-def get_pose_estimator():
-    """Get or create the single PoseEstimator instance"""
-    global _pose_estimator
-    with _pose_estimator_lock:
-        if _pose_estimator is None:
-            _pose_estimator = PoseEstimator()
-        return _pose_estimator
+def start_session_recording(exercise_type):
+    """Start a new landmark recording for this exercise session if recording is enabled"""
+    global session_recorder
+    stop_session_recording()
+    if not POSE_RECORD_SESSIONS:
+        return
+    os.makedirs(RECORDINGS_FOLDER, exist_ok=True)
+    filename = f"{time.strftime('%Y%m%d_%H%M%S')}_{exercise_type}.plmk"
+    session_recorder = LandmarkRecorder(os.path.join(RECORDINGS_FOLDER, filename), exercise_type)
+    logger.info(f"Recording landmarks to {session_recorder.path}")
+
+def stop_session_recording():
+    global session_recorder
+    if session_recorder is not None:
+        recorder, session_recorder = session_recorder, None
+        recorder.close()
+        logger.info(f"Landmark recording saved: {recorder.get_stats()}")
+
+def save_rep_telemetry(flush=False):
+    """Move reps completed since the last call from the engine into the telemetry store"""
+    if rep_telemetry is None or not current_exercise_type:
+        return
+    try:
+        rep_telemetry.append_reps(current_exercise_type, exercise_engine.drain_rep_telemetry())
+        if flush:
+            rep_telemetry.flush()
+    except OSError as e:
+        logger.error(f"Error saving rep telemetry: {e}")
+
+def save_station_reps(exercise_type, reps, flush):
+    """rep_sink of the camera stations: same telemetry store as the live camera"""
+    if rep_telemetry is None:
+        return
+    rep_telemetry.append_reps(exercise_type, reps)
+    if flush:
+        rep_telemetry.flush()
+
+def next_camera_buffer():
+    """Shared-memory slot of the camera session's pose worker process to capture into, if any"""
+    if not POSE_WORKER_PROCESS or live_frame_shape is None or _inference_service is None:
+        return None
+    estimator = _inference_service.get_estimator(LIVE_CAMERA_SESSION)
+    if not isinstance(estimator, ProcessPoseEstimator):
+        return None
+    return estimator.frame_buffer(live_frame_shape)
 
 def generate_frames():
     global output_frame, lock, exercise_running, exercise_engine
     global exercise_goal, sets_completed, sets_goal
-    global fps_counter, fps_start_time, current_fps
-
-    # NO PoseEstimator here - only create when exercise starts
-    pose_estimator = None
+    global fps_counter, fps_start_time, current_fps, live_frame_shape
 
     # Initialize camera when video feed starts
     initialize_camera()
+    # Landmarks of the last inferred frame, reused while the inference gate skips frames
+    last_results = None
 
     while True:
         if camera is None:
@@ -134,9 +337,13 @@ def generate_frames():
             time.sleep(0.1)
             continue
             
-        success, frame = camera.read()
-        if not success:
+        frame_start = time.perf_counter()
+        with live_stages.time('capture'):
+            captured = camera.read_frame(next_camera_buffer())
+        if captured is None:
             continue
+        frame = captured.image
+        live_frame_shape = frame.shape
         
         # FPS calculation
         fps_counter += 1
@@ -148,33 +355,55 @@ def generate_frames():
         
         # Only process frames if an exercise is running
         if exercise_running and exercise_engine.exercise:
-            # Lazy load pose estimator only when needed
-            if pose_estimator is None:
-                pose_estimator = get_pose_estimator()
-            
-            # Process with pose estimation
-            results = pose_estimator.estimate_pose(frame, exercise_engine.exercise_name)
+            # Process with pose estimation unless the frame is idle; a still frame keeps
+            # the previous landmarks so the skeleton, hold timer and feedback go on
+            if POSE_INFERENCE_GATE and not inference_gate.should_infer(frame):
+                results = last_results
+                if results is None or not results.pose_landmarks:
+                    with live_stages.time('status_overlay'):
+                        exercise_engine.draw_status_overlay(frame, exercise_goal, sets_goal, sets_completed)
+                        exercise_engine.draw_form_score(frame)
+            else:
+                try:
+                    with live_stages.time('estimate_pose'):
+                        results = get_inference_service().estimate_pose(LIVE_CAMERA_SESSION, frame,
+                                                                        exercise_engine.exercise_name)
+                except CancelledError:
+                    # /stop_camera closed the session while this frame was queued: no landmarks
+                    results = None
+                last_results = results
+                if results is not None:
+                    inference_gate.record_result(results.pose_landmarks is not None)
+                    recorder = session_recorder
+                    if recorder is not None:
+                        recorder.record(results.pose_landmarks.landmark if results.pose_landmarks else None,
+                                        frame.shape)
             
-            if results.pose_landmarks:
+            if results is not None and results.pose_landmarks:
                 # NEW: Use Exercise Engine to process frame
                 result = exercise_engine.process_frame(frame, results.pose_landmarks.landmark)
                 
                 if result["success"]:
-                    # Draw status overlay
-                    exercise_engine.draw_status_overlay(frame, exercise_goal, sets_goal, sets_completed)
-                    
-                    # Draw Form Score
-                    exercise_engine.draw_form_score(frame)
+                    with live_stages.time('status_overlay'):
+                        # Draw status overlay
+                        exercise_engine.draw_status_overlay(frame, exercise_goal, sets_goal, sets_completed)
+                        
+                        # Draw Form Score
+                        exercise_engine.draw_form_score(frame)
                     
                     # Check if rep goal is reached for current set
                     current_counter = exercise_engine.get_counter()
                     if current_counter >= exercise_goal:
                         sets_completed += 1
+                        if sets_completed >= sets_goal:
+                            exercise_running = False
+                        publish_live_status()
                         exercise_engine.reset()
                         
                         # Check if all sets are completed
-                        if sets_completed >= sets_goal:
-                            exercise_running = False
+                        if not exercise_running:
+                            save_rep_telemetry(flush=True)
+                            stop_session_recording()
                             # Final form score display
                             avg_score = exercise_engine.exercise.avg_form_score if exercise_engine.exercise else 0
                             draw_text_with_background(frame, f"WORKOUT COMPLETE! Avg Score: {avg_score}", 
@@ -198,16 +427,105 @@ def generate_frames():
         cv2.putText(frame, f"FPS: {current_fps:.1f}", (frame.shape[1] - 100, 30),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
                 
-        # Encode the frame in JPEG format
+        # Encode the frame in JPEG format. Capture buffers stay valid for a few
+        # frames (frame source pool), so the drawn frame is kept without a copy
         with lock:
-            output_frame = frame.copy()
+            output_frame = frame
             
         # Yield the frame in byte format
-        ret, buffer = cv2.imencode('.jpg', output_frame)
+        with live_stages.time('jpeg_encode'):
+            ret, buffer = cv2.imencode('.jpg', output_frame)
         frame = buffer.tobytes()
+        frame_end = time.perf_counter()
+        live_stages.observe('capture_to_jpeg', frame_end - captured.timestamp)
+        tracer.add('frame', frame_start, frame_end, 'live')
         yield (b'--frame\r\n'
                b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
 
+def worker_id():
+    return str(os.getpid())
+
+def start_camera_loop():
+    """Claim the camera for this worker and capture in the background (shared state only)"""
+    global camera_loop_thread
+    if not state_store.claim('camera', worker_id()):
+        return False
+    if camera_loop_thread is None or not camera_loop_thread.is_alive():
+        camera_loop_stop.clear()
+        camera_loop_thread = threading.Thread(target=camera_loop, name='camera-loop', daemon=True)
+        camera_loop_thread.start()
+    return True
+
+def camera_loop():
+    """Camera owner: publish frames and status for all workers and run their forwarded commands"""
+    me = worker_id()
+    frames = generate_frames()
+    last_publish = 0
+    try:
+        for chunk in frames:
+            if camera_loop_stop.is_set():
+                break
+            write_live_frame(chunk)
+            now = time.time()
+            if now - last_publish < LIVE_PUBLISH_INTERVAL_SEC:
+                continue
+            last_publish = now
+            
+            if not state_store.claim('camera', me):
+                break
+            for command in state_store.take_commands(me):
+                handler = LIVE_COMMANDS.get(command['name'])
+                result = handler(command['payload']) if handler else {'success': False, 'error': 'Unknown command'}
+                state_store.complete_command(command['id'], result)
+            state_store.put('live', 'status', build_status())
+            
+            # Keep the camera while someone watches or a workout is running
+            viewer_seen = state_store.get('live', 'viewer_seen') or 0
+            if not exercise_running and now - viewer_seen > CAMERA_IDLE_TIMEOUT_SEC:
+                break
+    except Exception as e:
+        logger.error(f"Camera loop stopped: {e}")
+    finally:
+        frames.close()
+        release_camera()
+        state_store.release('camera', me)
+        logger.info("Camera released by this worker")
+
+def write_live_frame(chunk):
+    tmp_path = f"{LIVE_FRAME_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(chunk)
+    os.replace(tmp_path, LIVE_FRAME_PATH)
+
+def relay_live_frames():
+    """Stream the frames published by the camera owner, taking the camera over if nobody owns it"""
+    last_version = None
+    last_check = 0
+    while True:
+        now = time.time()
+        if now - last_check >= 1.0:
+            last_check = now
+            state_store.put('live', 'viewer_seen', now)
+            if state_store.owner('camera') is None:
+                start_camera_loop()
+        
+        try:
+            stat = os.stat(LIVE_FRAME_PATH)
+            version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if version != last_version:
+                with open(LIVE_FRAME_PATH, 'rb') as f:
+                    chunk = f.read()
+                last_version = version
+                yield chunk
+                continue
+        except OSError:
+            pass
+        time.sleep(0.01)
+
+def live_frames():
+    """MJPEG chunks for /video_feed (also served by asgi.py)"""
+    return relay_live_frames() if state_store is not None else generate_frames()
+
 @app.route('/')
 def index():
     """Home page with exercise selection"""
@@ -223,11 +541,9 @@ def dashboard():
     """Dashboard page with workout statistics"""
     logger.info("Rendering dashboard page")
     try:
-        # Get data for the dashboard
+        # Get data for the dashboard (aggregates are precomputed)
         recent_workouts = workout_logger.get_recent_workouts(5)
-        weekly_stats = workout_logger.get_weekly_stats()
-        exercise_distribution = workout_logger.get_exercise_distribution()
-        user_stats = workout_logger.get_user_stats()
+        stats = workout_logger.get_cached_stats()
         
         # Format workouts for display
         formatted_workouts = []
@@ -240,43 +556,77 @@ def dashboard():
                 'duration': f"{workout['duration_seconds'] // 60}:{workout['duration_seconds'] % 60:02d}"
             })
         
-        # Calculate total workouts this week
-        weekly_workout_count = sum(day['workout_count'] for day in weekly_stats.values())
-        
         return render_template('dashboard.html',
                               recent_workouts=formatted_workouts,
-                              weekly_workouts=weekly_workout_count,
-                              total_workouts=user_stats['total_workouts'],
-                              total_exercises=user_stats['total_exercises'],
-                              streak_days=user_stats['streak_days'])
+                              weekly_workouts=stats['weekly_workouts'],
+                              total_workouts=stats['total_workouts'],
+                              total_exercises=stats['total_exercises'],
+                              streak_days=stats['streak_days'],
+                              chart_data=get_dashboard_chart_data(stats))
     except Exception as e:
         logger.error(f"Error in dashboard: {e}")
         traceback.print_exc()
         return f"Error loading dashboard: {str(e)}", 500
 
+def get_dashboard_chart_data(stats):
+    """Chart.js-ready weekly activity and exercise distribution"""
+    distribution = stats.get('exercise_distribution', {})
+    return {
+        'weekly_activity': {
+            'labels': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+            'values': stats.get('weekly_minutes', [0] * 7)
+        },
+        'exercise_distribution': {
+            'labels': [name.replace('_', ' ').title() for name in distribution],
+            'values': list(distribution.values())
+        }
+    }
+
+@app.route('/dashboard_data')
+def dashboard_data():
+    """Chart data for the dashboard, served from the precomputed aggregates"""
+    try:
+        stats = workout_logger.get_cached_stats()
+        data = get_dashboard_chart_data(stats)
+        data.update({
+            'success': True,
+            'total_workouts': stats['total_workouts'],
+            'weekly_workouts': stats['weekly_workouts'],
+            'streak_days': stats['streak_days']
+        })
+        return jsonify(data)
+    except Exception as e:
+        logger.error(f"Error in dashboard_data: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/video_feed')
 def video_feed():
     """Video streaming route"""
-    return Response(generate_frames(),
-                   mimetype='multipart/x-mixed-replace; boundary=frame')
+    return Response(live_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
-@app.route('/stop_camera', methods=['POST'])
-def stop_camera():
+def stop_live_camera(data=None):
     """Stop and release camera"""
     global exercise_running
     exercise_running = False
+    publish_live_status()
+    camera_loop_stop.set()
     release_camera()
+    if _inference_service is not None:
+        _inference_service.close_session(LIVE_CAMERA_SESSION)
     logger.info("Camera stopped and released")
-    return jsonify({'success': True})
+    return {'success': True}
 
-@app.route('/start_exercise', methods=['POST'])
-def start_exercise():
+@app.route('/stop_camera', methods=['POST'])
+def stop_camera():
+    return jsonify(run_live_command('stop_camera'))
+
+def start_live_exercise(data):
     """Start a new exercise based on user selection"""
     global exercise_running, exercise_engine, current_exercise_type
     global exercise_goal, sets_completed, sets_goal
     global workout_start_time
     
-    data = request.json
+    data = data or {}
     exercise_type = data.get('exercise_type')
     sets_goal = int(data.get('sets', 3))
     exercise_goal = int(data.get('reps', 10))
@@ -287,31 +637,40 @@ def start_exercise():
     # Reset counters
     sets_completed = 0
     workout_start_time = time.time()
+    inference_gate.reset()
     
     # NEW: Use Exercise Engine to load exercise from YAML
     available = get_available_exercises()
     if exercise_type not in available:
-        return jsonify({'success': False, 'error': f'Invalid exercise type. Available: {available}'})
+        return {'success': False, 'error': f'Invalid exercise type. Available: {available}'}
+    
+    # Keep reps of a previous exercise that finished without /stop_exercise
+    save_rep_telemetry(flush=True)
     
     # Load exercise
     if not exercise_engine.set_exercise(exercise_type):
-        return jsonify({'success': False, 'error': f'Failed to load exercise: {exercise_type}'})
+        return {'success': False, 'error': f'Failed to load exercise: {exercise_type}'}
     
     current_exercise_type = exercise_type
+    start_session_recording(exercise_type)
     
     # Start the exercise
     exercise_running = True
+    publish_live_status()
     
     logger.info(f"Started exercise: {exercise_type}, goal: {exercise_goal} reps x {sets_goal} sets")
     
-    return jsonify({
+    return {
         'success': True,
         'exercise': exercise_type,
         'info': get_exercise_info(exercise_type)
-    })
+    }
 
-@app.route('/stop_exercise', methods=['POST'])
-def stop_exercise():
+@app.route('/start_exercise', methods=['POST'])
+def start_exercise():
+    return jsonify(run_live_command('start_exercise', request.json))
+
+def stop_live_exercise(data=None):
     """Stop the current exercise and log the workout"""
     global exercise_running, exercise_engine, current_exercise_type
     global workout_start_time, sets_completed, exercise_goal, sets_goal
@@ -329,36 +688,284 @@ def stop_exercise():
             exercise_type=current_exercise_type,
             sets=sets_completed + (1 if current_counter > 0 else 0),
             reps=exercise_goal,
-            duration_seconds=duration
+            duration_seconds=duration,
+            form_score=avg_form_score
         )
+        save_rep_telemetry(flush=True)
         
         logger.info(f"Workout stopped. Avg form score: {avg_form_score}")
     
     exercise_running = False
-    return jsonify({'success': True})
+    publish_live_status()
+    stop_session_recording()
+    return {'success': True}
 
-@app.route('/get_status', methods=['GET'])
-def get_status():
-    """Return current exercise status"""
-    global exercise_engine, sets_completed, exercise_goal, sets_goal, exercise_running
-    
-    status = {
+@app.route('/stop_exercise', methods=['POST'])
+def stop_exercise():
+    return jsonify(run_live_command('stop_exercise'))
+
+LIVE_COMMANDS = {
+    'start_exercise': start_live_exercise,
+    'stop_exercise': stop_live_exercise,
+    'stop_camera': stop_live_camera,
+}
+
+def run_live_command(name, data=None):
+    """Run a live session command here, or on the worker that owns the camera"""
+    if state_store is not None:
+        owner = state_store.owner('camera')
+        if owner is None and name == 'start_exercise' and start_camera_loop():
+            owner = worker_id()
+        if owner is not None and owner != worker_id():
+            result = state_store.call(owner, name, data, timeout=LIVE_COMMAND_TIMEOUT_SEC)
+            return result if result is not None else {'success': False, 'error': 'Camera worker did not respond'}
+    return LIVE_COMMANDS[name](data)
+
+def publish_live_status():
+    """Publish the live session fields with the engine's next status snapshot"""
+    exercise_engine.publish_status({
         'exercise_running': exercise_running,
-        'current_reps': exercise_engine.get_counter() if exercise_engine.exercise else 0,
         'current_set': sets_completed + 1 if exercise_running else 0,
         'total_sets': sets_goal,
         'rep_goal': exercise_goal
+    })
+
+def build_status():
+    """Current live exercise status (served by /get_status and pushed by asgi.py)"""
+    if state_store is not None and state_store.owner('camera') not in (None, worker_id()):
+        status = state_store.get('live', 'status')
+        if status is not None:
+            return status
+    
+    # One snapshot read: the frame loop swaps in a new one after every frame
+    snapshot = exercise_engine.get_snapshot()
+    status = {
+        'exercise_running': snapshot.session.get('exercise_running', False),
+        'current_reps': snapshot.counter,
+        'current_set': snapshot.session.get('current_set', 0),
+        'total_sets': snapshot.session.get('total_sets', 0),
+        'rep_goal': snapshot.session.get('rep_goal', 0),
+        'version': snapshot.version
     }
     
     # Add form score if exercise is running
-    if exercise_running and exercise_engine.exercise:
-        ex_status = exercise_engine.get_status()
-        status['form_score'] = ex_status.get('form_score', 100)
-        status['avg_form_score'] = ex_status.get('avg_form_score', 100)
-        status['form_grade'] = ex_status.get('form_grade', 'A')
+    if status['exercise_running'] and snapshot.status:
+        status['form_score'] = snapshot.status.get('form_score', 100)
+        status['avg_form_score'] = snapshot.status.get('avg_form_score', 100)
+        status['form_grade'] = snapshot.status.get('form_grade', 'A')
     
+    if _inference_service is not None:
+        status['pose_model'] = _inference_service.get_model_info(LIVE_CAMERA_SESSION)
+        status['inference_service'] = _inference_service.get_stats()
+    if POSE_INFERENCE_GATE:
+        status['inference_gate'] = inference_gate.get_stats()
+    return status
+
+@app.route('/get_status', methods=['GET'])
+def get_status():
+    """Return current exercise status (204 if unchanged since the ?since= version)"""
+    status = build_status()
+    since = request.args.get('since', type=int)
+    if since is not None and status.get('version') == since:
+        return '', 204
     return jsonify(status)
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus metrics of this worker process"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/admin/profile', methods=['GET'])
+def profile_server():
+    """
+    Sample this worker and its video analysis subprocesses for ?seconds= (default 5).
+    
+    Admin only: send PROFILER_TOKEN in the X-Admin-Token header. Returns
+    collapsed stacks (flamegraph.pl / speedscope), prefixed with web; or video:<id>;
+    
+    Needs a server that handles requests concurrently (asgi.py, gunicorn, or
+    `python app.py`, which runs threaded when PROFILER_TOKEN is set); otherwise
+    an open /video_feed blocks it.
+    """
+    token = request.headers.get('X-Admin-Token', '')
+    if not PROFILER_TOKEN:
+        return jsonify({'error': 'Profiler is disabled (set PROFILER_TOKEN)'}), 404
+    if not hmac.compare_digest(token.encode(), PROFILER_TOKEN.encode()):
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    seconds = min(max(request.args.get('seconds', 5, type=float), 0.1), PROFILER_MAX_SECONDS)
+    interval = max(request.args.get('interval', 0.005, type=float), 0.001)
+    if not profiler_lock.acquire(blocking=False):
+        return jsonify({'error': 'A profile is already running'}), 409
+    try:
+        videos = {video_id: path for video_id, (pid, path) in list(video_processes.items())
+                  if profiler.request_subprocess_profile(pid, path, seconds)}
+        output = profiler.collapsed(profiler.sample(seconds, interval), prefix='web;')
+        for video_id, path in videos.items():
+            stacks = profiler.collect_subprocess_profile(path, timeout=2.0)
+            if stacks is None:
+                logger.warning(f"No profile from video job {video_id}")
+                continue
+            output += profiler.collapsed(stacks, prefix=f'video:{video_id};')
+    finally:
+        profiler_lock.release()
+    
+    logger.info(f"Profiled for {seconds}s ({len(videos)} video jobs)")
+    return Response(output, mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename=profile_{int(time.time())}.collapsed'})
+
+@app.route('/api/trace', methods=['GET'])
+def get_trace():
+    """Live frame spans of the last ?seconds= (default 10) as Chrome trace-event JSON"""
+    if not tracer.enabled:
+        return jsonify({'error': 'Tracing is disabled (set POSE_TRACE=1)'}), 404
+    seconds = request.args.get('seconds', 10, type=float)
+    response = jsonify(tracer.export(seconds))
+    response.headers['Content-Disposition'] = f'attachment; filename=live_trace_{int(time.time())}.json'
+    return response
+
+def log_client_session(exercise_session):
+    """Log a finished client-side session like /stop_exercise does for the server camera"""
+    summary = exercise_session.finish()
+    if summary['sets'] > 0:
+        workout_logger.log_workout(
+            exercise_type=summary['exercise_type'],
+            sets=summary['sets'],
+            reps=summary['reps'],
+            duration_seconds=summary['duration_seconds'],
+            form_score=summary['form_score']
+        )
+    if rep_telemetry is not None:
+        try:
+            rep_telemetry.append_reps(summary['exercise_type'], summary['rep_telemetry'])
+            rep_telemetry.flush()
+        except OSError as e:
+            logger.error(f"Error saving rep telemetry: {e}")
+    return summary
+
+def expire_client_sessions():
+    """Finish client sessions that stopped sending landmarks"""
+    cutoff = time.time() - CLIENT_SESSION_TIMEOUT_SEC
+    for exercise_session in client_sessions.pop_stale(cutoff):
+        logger.info(f"Client pose session expired: {exercise_session.exercise_name}")
+        log_client_session(exercise_session)
+
+def parse_client_landmarks(data):
+    """Landmark list from a client payload, None when no person was detected"""
+    raw = data.get('landmarks')
+    if raw is None:
+        return None
+    landmarks = np.asarray(raw, dtype=np.float32)
+    if landmarks.shape != (NUM_LANDMARKS, 4) or not np.isfinite(landmarks).all():
+        raise ValueError(f'landmarks must be {NUM_LANDMARKS} finite [x, y, z, visibility] rows')
+    return landmarks_from_array(landmarks)
+
+@app.route('/api/client_pose/start', methods=['POST'])
+def start_client_pose():
+    """Start an exercise session fed by landmarks detected in the browser"""
+    data = request.json or {}
+    exercise_type = data.get('exercise_type')
+    if exercise_type not in get_available_exercises():
+        return jsonify({'success': False, 'error': f'Invalid exercise type: {exercise_type}'}), 400
+    
+    expire_client_sessions()
+    if len(client_sessions) >= MAX_CLIENT_SESSIONS:
+        return jsonify({'success': False, 'error': 'Too many active sessions'}), 503
+    
+    try:
+        exercise_session = ExerciseSession(exercise_type, int(data.get('sets', 3)), int(data.get('reps', 10)))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    session_id = str(uuid.uuid4())
+    client_sessions.add(session_id, exercise_session)
+    
+    logger.info(f"Started client pose session {session_id}: {exercise_type}")
+    return jsonify({
+        'success': True,
+        'session_id': session_id,
+        'exercise': exercise_type,
+        'info': get_exercise_info(exercise_type)
+    })
+
+@app.route('/api/client_pose/<session_id>/landmarks', methods=['POST'])
+def client_pose_landmarks(session_id):
+    """Score one frame of browser-side landmarks: {landmarks, width, height, timestamp}"""
+    data = request.json or {}
+    try:
+        landmarks = parse_client_landmarks(data)
+        frame_shape = (int(data['height']), int(data['width']))
+        timestamp = float(data['timestamp']) if data.get('timestamp') is not None else None
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid landmark payload: {e}'}), 400
+    
+    status = client_sessions.update(
+        session_id, lambda exercise_session: exercise_session.process_landmarks(landmarks, frame_shape, timestamp))
+    if status is None:
+        return jsonify({'success': False, 'error': 'Session not found'}), 404
+    status['success'] = True
+    return jsonify(status)
+
+@app.route('/api/client_pose/<session_id>/frames', methods=['POST'])
+def client_pose_frames(session_id):
+    """Score a batch of frames sent in the binary landmark wire format"""
+    if (request.content_length or 0) > wire_protocol.batch_size(wire_protocol.MAX_BATCH_FRAMES, NUM_LANDMARKS):
+        return jsonify({'success': False, 'error': 'Batch too large'}), 413
+    try:
+        batch = wire_protocol.decode_batch(request.get_data(cache=False))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid landmark batch: {e}'}), 400
+    if batch.coords.shape[1] != NUM_LANDMARKS:
+        return jsonify({'success': False, 'error': f'Expected {NUM_LANDMARKS} landmarks per frame'}), 400
+    
+    processed = client_sessions.update(session_id, lambda exercise_session: exercise_session.process_batch(batch))
+    if processed is None:
+        return jsonify({'success': False, 'error': 'Session not found'}), 404
+    results, status = processed
+    return jsonify({'success': True, 'results': results, 'status': status})
+
+@app.route('/api/client_pose/<session_id>/status', methods=['GET'])
+def client_pose_status(session_id):
+    # Read only: a status poll does not rewrite the session or keep it alive
+    exercise_session = client_sessions.get(session_id)
+    if exercise_session is None:
+        return jsonify({'success': False, 'error': 'Session not found'}), 404
+    status = exercise_session.get_status()
+    status['success'] = True
+    return jsonify(status)
+
+@app.route('/api/client_pose/<session_id>/stop', methods=['POST'])
+def stop_client_pose(session_id):
+    """Finish a client-side session and log the workout"""
+    exercise_session = client_sessions.pop(session_id)
+    if exercise_session is None:
+        return jsonify({'success': False, 'error': 'Session not found'}), 404
+    
+    summary = log_client_session(exercise_session)
+    logger.info(f"Client pose session {session_id} stopped. Avg form score: {summary['form_score']}")
+    return jsonify({'success': True, 'sets': summary['sets'], 'form_score': summary['form_score']})
+
+@app.route('/api/telemetry/form_trend', methods=['GET'])
+def form_trend():
+    """Average per-rep form score per time bucket for one exercise"""
+    if rep_telemetry is None:
+        return jsonify({'success': False, 'error': 'Rep telemetry is not available'}), 503
+    
+    exercise_type = request.args.get('exercise')
+    if not exercise_type:
+        return jsonify({'success': False, 'error': 'exercise is required'}), 400
+    try:
+        days = int(request.args.get('days', 180))
+        bucket_days = int(request.args.get('bucket_days', 7))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'days and bucket_days must be integers'}), 400
+    
+    return jsonify({
+        'success': True,
+        'exercise': exercise_type,
+        'trend': rep_telemetry.form_score_trend(exercise_type, days=days, bucket_days=max(bucket_days, 1))
+    })
+
 @app.route('/exercises', methods=['GET'])
 def list_exercises():
     """Return list of all available exercises"""
@@ -396,30 +1003,26 @@ def profile():
         'avg_form_score': 85
     }
     
-    # Try to get stats from workout logger
-    try:
-        workout_stats = workout_logger.get_dashboard_stats()
-        stats['total_workouts'] = workout_stats.get('total_workouts', 0)
-        stats['streak'] = workout_stats.get('streak_days', 0)
-        stats['weekly_workouts'] = workout_stats.get('weekly_workouts', 0)
-        
-        # Get total reps from recent workouts
-        recent = workout_logger.get_recent_workouts(100)
-        stats['total_reps'] = sum(w.get('reps', 0) for w in recent)
-        stats['total_minutes'] = sum(w.get('duration', 0) for w in recent)
-    except Exception as e:
-        logger.warning(f"Could not load workout stats: {e}")
-    
-    # Get favorite exercises
+    # Precomputed aggregates from the workout logger
     favorites = []
     try:
-        exercise_stats = workout_logger.get_exercise_stats()
+        workout_stats = workout_logger.get_cached_stats()
+        stats['total_workouts'] = workout_stats['total_workouts']
+        stats['total_reps'] = workout_stats['total_reps']
+        stats['total_minutes'] = workout_stats['total_minutes']
+        stats['streak'] = workout_stats['streak_days']
+        stats['weekly_workouts'] = workout_stats['weekly_workouts']
+        stats['today_reps'] = workout_stats['today_reps']
+        if workout_stats['avg_form_score'] is not None:
+            stats['avg_form_score'] = workout_stats['avg_form_score']
+        
+        # Favorite exercises
         favorites = [
-            {'name': ex['exercise'].replace('_', ' ').title(), 'count': ex['count']}
-            for ex in exercise_stats[:5]
+            {'name': name.replace('_', ' ').title(), 'count': count}
+            for name, count in list(workout_stats['exercise_distribution'].items())[:5]
         ]
     except Exception as e:
-        logger.warning(f"Could not load favorites: {e}")
+        logger.warning(f"Could not load workout stats: {e}")
     
     # Settings defaults
     settings = {
@@ -451,6 +1054,63 @@ def update_profile():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+# ============================================
+# CAMERA STATION ROUTES (CAMERA_STATIONS)
+# ============================================
+
+def station_not_found(station_id):
+    return jsonify({'success': False, 'error': f'Unknown station: {station_id}'}), 404
+
+@app.route('/api/stations', methods=['GET'])
+def list_stations():
+    """Camera stations with their source, fps, latency and viewers"""
+    manager = get_capture_manager()
+    return jsonify({
+        'stations': manager.get_stats(),
+        'inference_service': get_inference_service().get_stats()
+    })
+
+@app.route('/api/stations/<station_id>/video_feed')
+def station_video_feed(station_id):
+    """MJPEG stream of one station"""
+    station = get_capture_manager().get(station_id)
+    if station is None:
+        return station_not_found(station_id)
+    return Response(station.frames_mjpeg(), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/api/stations/<station_id>/status', methods=['GET'])
+def station_status(station_id):
+    """Exercise status of one station (204 if unchanged since the ?since= version)"""
+    station = get_capture_manager().get(station_id)
+    if station is None:
+        return station_not_found(station_id)
+    status = station.get_status()
+    since = request.args.get('since', type=int)
+    if since is not None and status['version'] == since:
+        return '', 204
+    return jsonify(status)
+
+@app.route('/api/stations/<station_id>/start_exercise', methods=['POST'])
+def station_start_exercise(station_id):
+    station = get_capture_manager().get(station_id)
+    if station is None:
+        return station_not_found(station_id)
+    data = request.json or {}
+    return jsonify(station.start_exercise(data.get('exercise_type'),
+                                          sets=int(data.get('sets', 3)),
+                                          reps=int(data.get('reps', 10))))
+
+@app.route('/api/stations/<station_id>/stop_exercise', methods=['POST'])
+def station_stop_exercise(station_id):
+    """Stop the station's exercise and log the workout"""
+    station = get_capture_manager().get(station_id)
+    if station is None:
+        return station_not_found(station_id)
+    workout = station.stop_exercise()
+    if workout is not None:
+        workout_logger.log_workout(**workout)
+    return jsonify({'success': True})
+
 # ============================================
 # VIDEO ANALYSIS ROUTES
 # ============================================
@@ -468,6 +1128,8 @@ def upload_video():
     
     video_file = request.files['video']
     exercise_type = request.form.get('exercise_type')
+    # render=0 skips the skeleton overlay video and analyzes at ~8 fps only
+    render_output = request.form.get('render', '1') not in ('0', 'false')
     
     if not exercise_type:
         return jsonify({'success': False, 'error': 'No exercise type specified'})
@@ -524,11 +1186,13 @@ def upload_video():
         'feedback': '',
         'engine': ExerciseEngine(),
         'total_frames': 0,
-        'processed_frames': 0
+        'processed_frames': 0,
+        'render_output': render_output
     }
     
     # Load exercise into engine (not used in subprocess mode, but keep for status)
     video_analyses[video_id]['engine'].set_exercise(exercise_type)
+    publish_video_analysis(video_id)
     
     # Start background processing using subprocess
     thread = threading.Thread(target=process_video_subprocess, args=(video_id,))
@@ -541,6 +1205,23 @@ def upload_video():
         'message': 'Video uploaded, processing started'
     })
 
+def publish_video_analysis(video_id):
+    """Make a video job's state visible to every worker (shared state only)"""
+    analysis = video_analyses.get(video_id)
+    if state_store is None or analysis is None:
+        return
+    try:
+        state_store.put('video', video_id, {k: v for k, v in analysis.items() if k != 'engine'})
+    except Exception as e:
+        logger.warning(f"Could not publish video analysis {video_id}: {e}")
+
+def get_video_analysis(video_id):
+    """Video job state from this worker, or as published by the worker running it"""
+    analysis = video_analyses.get(video_id)
+    if analysis is None and state_store is not None:
+        analysis = state_store.get('video', video_id)
+    return analysis
+
 def process_video_subprocess(video_id):
     """Process video in a separate subprocess to avoid memory issues"""
     import subprocess
@@ -566,9 +1247,19 @@ def process_video_subprocess(video_id):
             'video_processor.py',
             analysis['filepath'],
             analysis['exercise_type'],
-            output_json_path,
-            output_video_path  # NEW: Output video with skeleton overlay
+            output_json_path
         ]
+        if analysis.get('render_output', True):
+            cmd.append(output_video_path)  # Output video with skeleton overlay
+        cmd.extend([
+            f'--inference-width={POSE_INFERENCE_WIDTH}',
+            f'--model-complexity={POSE_MODEL_COMPLEXITY}',
+            f'--latency-budget-ms={POSE_LATENCY_BUDGET_MS}',
+            f'--benchmark-cache={POSE_BENCHMARK_CACHE}'
+        ])
+        if POSE_TRACE:
+            analysis['trace'] = os.path.join(UPLOAD_FOLDER, f"{video_id}_trace.json")
+            cmd.append(f"--trace={analysis['trace']}")
         
         logger.info(f"Running subprocess: {' '.join(cmd)}")
         
@@ -584,6 +1275,9 @@ def process_video_subprocess(video_id):
         
         # Monitor progress by reading output JSON periodically
         while process.poll() is None:
+            # Profilable once it installed its signal handler (the signal kills it before)
+            if video_id not in video_processes and profiler.subprocess_ready(output_json_path):
+                video_processes[video_id] = (process.pid, output_json_path)
             # Read any available output
             try:
                 line = process.stdout.readline()
@@ -604,11 +1298,15 @@ def process_video_subprocess(video_id):
                     analysis['grade'] = results.get('grade', 'A')
                     analysis['state'] = results.get('state', 'UNKNOWN')
                     analysis['feedback'] = results.get('feedback', '')
+                    analysis['pose_model'] = results.get('pose_model')
+                    analysis['active_segment'] = results.get('active_segment')
+                    publish_video_analysis(video_id)
             except:
                 pass
         
         # Process finished - read final results
         stdout, stderr = process.communicate()
+        video_processes.pop(video_id, None)
         
         if process.returncode == 0 and os.path.exists(output_json_path):
             with open(output_json_path, 'r') as f:
@@ -622,6 +1320,9 @@ def process_video_subprocess(video_id):
             analysis['grade'] = results.get('grade', 'A')
             analysis['state'] = results.get('state', 'COMPLETED')
             analysis['feedback'] = results.get('feedback', '')
+            analysis['pose_model'] = results.get('pose_model')
+            analysis['active_segment'] = results.get('active_segment')
+            video_stages.merge(results.get('stage_metrics'))
             
             # Get actual output video path from results (extension may have changed)
             actual_output_video = results.get('output_video', output_video_path)
@@ -661,13 +1362,17 @@ def process_video_subprocess(video_id):
         logger.error(f"Subprocess error: {e}")
         analysis['status'] = 'error'
         analysis['error'] = str(e)
+    video_processes.pop(video_id, None)
+    profiler.remove_subprocess_files(output_json_path)
+    video_jobs_total.inc(analysis['status'])
+    publish_video_analysis(video_id)
 
 @app.route('/api/video/processed/<video_id>', methods=['GET'])
 def get_processed_video(video_id):
     """Serve the processed video with skeleton overlay"""
     from flask import send_file
     
-    analysis = video_analyses.get(video_id)
+    analysis = get_video_analysis(video_id)
     
     if not analysis:
         return jsonify({'error': 'Video ID not found'}), 404
@@ -686,20 +1391,34 @@ def get_processed_video(video_id):
     
     return send_file(processed_video, mimetype=mimetype, as_attachment=False)
 
-@app.route('/api/video/status/<video_id>', methods=['GET'])
-def get_video_status(video_id):
-    """Get video analysis status"""
-    analysis = video_analyses.get(video_id)
+@app.route('/api/video/trace/<video_id>', methods=['GET'])
+def get_video_trace(video_id):
+    """Chrome trace-event JSON of a video job (written when POSE_TRACE=1)"""
+    from flask import send_file
     
+    analysis = get_video_analysis(video_id)
     if not analysis:
-        return jsonify({'status': 'not_found', 'error': 'Video ID not found'})
+        return jsonify({'error': 'Video ID not found'}), 404
+    
+    trace_path = analysis.get('trace')
+    if not trace_path or not os.path.exists(trace_path):
+        return jsonify({'error': 'No trace for this video'}), 404
+    
+    return send_file(os.path.abspath(trace_path), mimetype='application/json', as_attachment=True,
+                     download_name=f'{video_id}_trace.json')
+
+def build_video_status(video_id):
+    """Video analysis status, or None for an unknown video ID"""
+    analysis = get_video_analysis(video_id)
+    if not analysis:
+        return None
     
     # Check if processed video is ready
     has_processed_video = False
     if analysis.get('processed_video') and os.path.exists(analysis.get('processed_video', '')):
         has_processed_video = True
     
-    return jsonify({
+    return {
         'status': analysis['status'],
         'progress': analysis['progress'],
         'reps': analysis['reps'],
@@ -709,8 +1428,18 @@ def get_video_status(video_id):
         'state': analysis['state'],
         'feedback': analysis['feedback'],
         'has_processed_video': has_processed_video,
-        'processed_video_url': f'/api/video/processed/{video_id}' if has_processed_video else None
-    })
+        'processed_video_url': f'/api/video/processed/{video_id}' if has_processed_video else None,
+        'pose_model': analysis.get('pose_model'),
+        'active_segment': analysis.get('active_segment')
+    }
+
+@app.route('/api/video/status/<video_id>', methods=['GET'])
+def get_video_status(video_id):
+    """Get video analysis status"""
+    status = build_video_status(video_id)
+    if status is None:
+        return jsonify({'status': 'not_found', 'error': 'Video ID not found'})
+    return jsonify(status)
 
 @app.route('/api/video/analyze_frame', methods=['POST'])
 def analyze_video_frame():
@@ -719,7 +1448,7 @@ def analyze_video_frame():
         return jsonify({'success': False, 'error': 'No frame provided'})
     
     video_id = request.form.get('video_id')
-    analysis = video_analyses.get(video_id)
+    analysis = get_video_analysis(video_id)
     
     if not analysis:
         return jsonify({'success': False, 'error': 'Video ID not found'})
@@ -752,7 +1481,8 @@ if __name__ == '__main__':
         print("-" * 50)
         print("🌐 Open http://127.0.0.1:5000 in your browser")
         print("=" * 50)
-        app.run(debug=False, threaded=False, use_reloader=False)
+        # The profiler has to answer while /video_feed holds a request open
+        app.run(debug=False, threaded=bool(PROFILER_TOKEN), use_reloader=False)
     except Exception as e:
         logger.error(f"Failed to start application: {e}")
         traceback.print_exc()
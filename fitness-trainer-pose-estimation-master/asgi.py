@@ -0,0 +1,46 @@
+"""
+Asyncio serving mode: the Flask app behind an ASGI server.
+
+    python asgi.py [--host 127.0.0.1] [--port 5000]
+    uvicorn asgi:app
+
+The live video stream, status push (/events/status) and video analysis
+progress (/events/video/<id>) run as cooperative tasks; all other routes
+are served by the Flask app (see utils/async_server.py). Pages only open
+event streams when SERVER_SENT_EVENTS is set; the Flask and gunicorn
+servers are polled.
+"""
+
+import argparse
+import sys
+
+from app import app as flask_app, build_status, build_video_status, live_frames, logger
+from utils.async_server import AsyncServer
+
+app = AsyncServer(
+    flask_app,
+    frame_source=live_frames,
+    status_source=build_status,
+    job_source=build_video_status,
+)
+flask_app.config['SERVER_SENT_EVENTS'] = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the fitness trainer with an ASGI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("The asyncio serving mode needs an ASGI server: pip install uvicorn")
+        sys.exit(1)
+
+    logger.info(f"Starting the asyncio server on http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
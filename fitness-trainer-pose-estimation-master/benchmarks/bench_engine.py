@@ -0,0 +1,224 @@
+"""
+Micro-benchmarks for the exercise engine hot path.
+
+    python benchmarks/bench_engine.py                   # all exercises, compare to baseline
+    python benchmarks/bench_engine.py --exercise squat --frames 1200
+    python benchmarks/bench_engine.py --save-baseline   # store this run as the baseline
+
+Every definition in exercises/definitions/ is fed a synthetic landmark
+sequence (pose_estimation/synthetic.py) and each stage is timed on its own:
+
+    angles       BaseExercise.compute_all_angles
+    context      BaseExercise.get_context
+    fsm          update_state (update_bilateral_state / update_duration)
+    feedback     check_feedback
+    form_score   calculate_form_score
+    engine       ExerciseEngine.process_landmarks (all of the above)
+    engine_draw  ExerciseEngine.process_frame (plus skeleton/feedback drawing)
+
+Results are frames per second, best of --repeat runs. A stage slower than
+the baseline by more than --tolerance is reported as a regression and the
+script exits with status 1, as it does when a repetition exercise counts no
+reps (its stages would only have timed the idle path). Baselines are
+machine specific: regenerate benchmarks/baseline_engine.json on the
+machine the comparison runs on.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pose_estimation.synthetic import FPS, FRAME_SHAPE, exercise_sequence
+from exercises.base_exercise import BilateralExercise, DurationExercise
+from exercises.engine import ExerciseEngine
+from exercises.loader import get_available_exercises, load_exercise
+from pose_estimation.landmarks import landmarks_from_array
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_engine.json')
+STAGES = ('angles', 'context', 'fsm', 'feedback', 'form_score', 'engine', 'engine_draw')
+
+
+class FrameClock:
+    """Timestamps advancing one frame per call to tick(), so rep timing filters behave as live"""
+
+    def __init__(self, fps=FPS):
+        self.fps = fps
+        self.frame = 0
+
+    def tick(self):
+        self.frame += 1
+
+    def __call__(self):
+        return self.frame / self.fps
+
+
+def _best_of(repeat, run):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _contexts(exercise, landmarks):
+    """Contexts as ExerciseEngine builds them for this exercise type"""
+    contexts = []
+    for lm in landmarks:
+        if isinstance(exercise, BilateralExercise):
+            exercise.compute_bilateral_angles(lm, FRAME_SHAPE)
+        else:
+            exercise.compute_all_angles(lm, FRAME_SHAPE)
+        context = exercise.get_context(lm, FRAME_SHAPE)
+        if isinstance(exercise, BilateralExercise):
+            context["left_angle"] = exercise._computed_angles.get("left_angle", 0)
+            context["right_angle"] = exercise._computed_angles.get("right_angle", 0)
+        contexts.append(context)
+    return contexts
+
+
+def bench_exercise(name, frames, repeat):
+    """Frames per second of each stage for one exercise"""
+    exercise = load_exercise(name)
+    clock = FrameClock()
+    exercise.clock = clock
+    landmarks = [landmarks_from_array(pose) for pose in exercise_sequence(exercise, frames)]
+    contexts = _contexts(exercise, landmarks)
+    feedback = [exercise.check_feedback(context) for context in contexts]
+
+    if isinstance(exercise, BilateralExercise):
+        fsm = exercise.update_bilateral_state
+    elif isinstance(exercise, DurationExercise):
+        fsm = exercise.update_duration
+    else:
+        fsm = exercise.update_state
+
+    def run_fsm():
+        exercise.reset()
+        clock.frame = 0
+        for context in contexts:
+            clock.tick()
+            fsm(context)
+
+    def run_engine(draw):
+        engine_clock = FrameClock()
+        engine = ExerciseEngine(clock=engine_clock)
+        engine.set_exercise(name)
+        frame = np.zeros((FRAME_SHAPE[0], FRAME_SHAPE[1], 3), dtype=np.uint8)
+        for lm in landmarks:
+            engine_clock.tick()
+            if draw:
+                engine.process_frame(frame, lm)
+            else:
+                engine.process_landmarks(lm, FRAME_SHAPE)
+        run_engine.reps = engine.get_counter()
+
+    runs = {
+        'angles': lambda: [exercise.compute_all_angles(lm, FRAME_SHAPE) for lm in landmarks],
+        'context': lambda: [exercise.get_context(lm, FRAME_SHAPE) for lm in landmarks],
+        'fsm': run_fsm,
+        'feedback': lambda: [exercise.check_feedback(context) for context in contexts],
+        'form_score': lambda: [exercise.calculate_form_score(c, f) for c, f in zip(contexts, feedback)],
+        'engine': lambda: run_engine(draw=False),
+        'engine_draw': lambda: run_engine(draw=True),
+    }
+    result = {stage: round(frames / _best_of(repeat, runs[stage]), 1) for stage in STAGES}
+    result['reps'] = run_engine.reps
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """(exercise, stage, baseline fps, current fps) for every stage slower than tolerance allows"""
+    regressions = []
+    for name, stages in results.items():
+        for stage in STAGES:
+            before = baseline.get(name, {}).get(stage)
+            if before and stages[stage] < before * (1 - tolerance):
+                regressions.append((name, stage, before, stages[stage]))
+    return regressions
+
+
+def print_table(results, baseline):
+    print(f"\n{'exercise':<18}" + ''.join(f"{stage:>13}" for stage in STAGES) + f"{'reps':>6}")
+    for name, stages in results.items():
+        cells = []
+        for stage in STAGES:
+            before = baseline.get(name, {}).get(stage)
+            change = f"{(stages[stage] / before - 1) * 100:+.0f}%" if before else ''
+            cells.append(f"{stages[stage]:>8.0f}{change:>5}")
+        print(f"{name:<18}" + ''.join(cells) + f"{stages['reps']:>6}")
+    print("(frames/sec, change vs baseline)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the exercise engine hot path")
+    parser.add_argument('--exercise', action='append', help="Exercise to run (repeatable; default: all)")
+    parser.add_argument('--frames', type=int, default=600, help="Synthetic frames per exercise")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage; the fastest is kept")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Write this run to --baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed slowdown before a stage counts as a regression (0.2 = 20%%)")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    names = args.exercise or get_available_exercises()
+    results = {}
+    for name in names:
+        # Condition errors in definitions are printed per frame; keep them out of the report
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            results[name] = bench_exercise(name, args.frames, args.repeat)
+        print(f"{name}: engine {results[name]['engine']:.0f} fps")
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            stored = json.load(f)
+        baseline = stored.get('results', {})
+        if stored.get('frames') != args.frames:
+            print(f"Note: baseline used {stored.get('frames')} frames per exercise, this run {args.frames}")
+
+    print_table(results, baseline)
+
+    report = {
+        'frames': args.frames,
+        'repeat': args.repeat,
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()}",
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    no_reps = [name for name, stages in results.items()
+               if stages['reps'] == 0 and not isinstance(load_exercise(name), DurationExercise)]
+    for name in no_reps:
+        print(f"NO REPS {name}: the synthetic sequence never completed a repetition")
+    if no_reps:
+        sys.exit(1)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved: {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, stage, before, after in regressions:
+        print(f"REGRESSION {name}.{stage}: {before:.0f} -> {after:.0f} fps")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+End-to-end throughput benchmark for video analysis (video_processor.py).
+
+    python benchmarks/bench_video.py
+    python benchmarks/bench_video.py --resolution 1280x720 --resolution 1920x1080 --seconds 20
+    python benchmarks/bench_video.py --no-render --output results/analysis_only.json
+
+Deterministic stick-figure clips (pose_estimation/synthetic.py motions drawn
+with OpenCV) are rendered once per resolution/length and cached. Each clip
+is analyzed the way /api/video/upload does it: video_processor.py in a
+subprocess with the server's pose settings. Per-stage time comes from the
+stage_metrics the job writes into its results JSON (utils/metrics.py):
+
+    decode      waiting for the prefetch thread to decode a frame
+    inference   PoseEstimator.process
+    analysis    angles + FSM + feedback in the exercise engine
+    overlay     skeleton, engine and stats drawing
+    encode      H.264 (imageio) or OpenCV video writing
+
+For each group the report gives the frames that went through it (the most
+calls of any of its stages, since one frame records several of them),
+total seconds and frames/sec, next to wall time, end-to-end fps, counted
+reps and the job's peak RSS. The JSON output records
+the host (CPU count, Python/OpenCV versions, git commit) so runs can be
+compared across versions and machines.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pose_estimation.synthetic import exercise_sequence
+from exercises.loader import load_exercise
+from utils.frame_source import draw_stick_figure
+
+# Stage names recorded by video_processor.py, grouped for the report
+STAGE_GROUPS = {
+    'decode': ('decode',),
+    'inference': ('estimate_pose',),
+    'analysis': ('compute_angles', 'fsm_update', 'feedback'),
+    'overlay': ('overlay', 'skeleton_overlay', 'status_overlay'),
+    'encode': ('h264_encode', 'video_encode'),
+}
+
+
+def render_clip(path, exercise_name, width, height, seconds, fps):
+    """Write a deterministic synthetic clip (mp4v) unless it is already cached"""
+    if os.path.exists(path):
+        return path
+    exercise = load_exercise(exercise_name)
+    poses = exercise_sequence(exercise, int(seconds * fps), fps=fps, frame_shape=(height, width))
+    tmp_path = path + '.tmp.mp4'
+    writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open a video writer for {path}")
+    for pose in poses:
+        writer.write(draw_stick_figure(pose, width, height))
+    writer.release()
+    os.replace(tmp_path, path)
+    return path
+
+
+def _wait_with_rusage(process):
+    """Wait for the job; returns (exit code, peak RSS in bytes or None)"""
+    if hasattr(os, 'wait4'):
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return process.returncode, usage.ru_maxrss * scale
+    return process.wait(), None
+
+
+def run_job(clip_path, exercise_name, work_dir, render_output, pose_args):
+    """Analyze one clip in a video_processor.py subprocess, as the upload endpoint does"""
+    json_path = os.path.join(work_dir, 'results.json')
+    video_path = os.path.join(work_dir, 'processed.mp4')
+    cmd = [sys.executable, 'video_processor.py', clip_path, exercise_name, json_path]
+    if render_output:
+        cmd.append(video_path)
+    cmd.extend(pose_args)
+
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = process.stderr.read().decode(errors='replace')
+    returncode, peak_rss = _wait_with_rusage(process)
+    wall = time.perf_counter() - start
+
+    results = {}
+    if os.path.exists(json_path):
+        with open(json_path, 'r') as f:
+            results = json.load(f)
+    for path in (json_path, video_path):
+        if os.path.exists(path):
+            os.remove(path)
+    return {
+        'returncode': returncode,
+        'status': results.get('status', 'failed'),
+        'error': results.get('error') or (stderr.strip().splitlines()[-1] if returncode and stderr.strip() else None),
+        'wall_seconds': round(wall, 3),
+        'peak_rss_bytes': peak_rss,
+        'reps': results.get('reps'),
+        'pose_model': (results.get('pose_model') or {}).get('model'),
+        'stage_metrics': results.get('stage_metrics', {}),
+    }
+
+
+def summarize_stages(stage_metrics):
+    """Per report group: frames, seconds and frames/sec from exported bucket counts"""
+    stages = {}
+    for group, names in STAGE_GROUPS.items():
+        # A frame goes through every stage of its group (angles, FSM and feedback
+        # for one analyzed frame), so the busiest stage is the frame count
+        frames = max(sum(stage_metrics.get(n, {}).get('counts', [])) for n in names)
+        seconds = sum(stage_metrics.get(n, {}).get('sum', 0.0) for n in names)
+        stages[group] = {
+            'frames': frames,
+            'seconds': round(seconds, 4),
+            'per_second': round(frames / seconds, 1) if seconds > 0 else None,
+        }
+    return stages
+
+
+def host_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'git_commit': commit,
+    }
+
+
+def parse_resolution(text):
+    width, height = (int(v) for v in text.lower().split('x'))
+    return width, height
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark video analysis throughput on synthetic clips")
+    parser.add_argument('--exercise', default='squat')
+    parser.add_argument('--resolution', action='append', type=parse_resolution,
+                        help="WIDTHxHEIGHT (repeatable; default 640x360, 1280x720)")
+    parser.add_argument('--seconds', action='append', type=float, help="Clip length (repeatable; default 10)")
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--no-render', action='store_true', help="Analysis only, no skeleton overlay video")
+    parser.add_argument('--inference-width', type=int, default=640)
+    parser.add_argument('--model-complexity', default='1', choices=['0', '1', '2', 'auto'])
+    parser.add_argument('--clip-dir', default=os.path.join(tempfile.gettempdir(), 'fitness_bench_clips'),
+                        help="Cache for rendered clips")
+    parser.add_argument('--output', default=None,
+                        help="Results JSON (default benchmarks/results/video_<timestamp>.json)")
+    args = parser.parse_args()
+
+    resolutions = args.resolution or [(640, 360), (1280, 720)]
+    lengths = args.seconds or [10.0]
+    output = args.output or os.path.join(PROJECT_ROOT, 'benchmarks', 'results',
+                                         f"video_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    pose_args = [f'--inference-width={args.inference_width}', f'--model-complexity={args.model_complexity}']
+    os.makedirs(args.clip_dir, exist_ok=True)
+
+    runs = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for width, height in resolutions:
+            for seconds in lengths:
+                name = f"{args.exercise}_{width}x{height}_{seconds:g}s_{args.fps}fps.mp4"
+                clip = render_clip(os.path.join(args.clip_dir, name), args.exercise, width, height,
+                                   seconds, args.fps)
+                job = run_job(clip, args.exercise, work_dir, not args.no_render, pose_args)
+                frames = int(seconds * args.fps)
+                job.update({
+                    'clip': name,
+                    'width': width,
+                    'height': height,
+                    'seconds': seconds,
+                    'frames': frames,
+                    'fps_end_to_end': round(frames / job['wall_seconds'], 1) if job['wall_seconds'] else None,
+                    'stages': summarize_stages(job.pop('stage_metrics')),
+                })
+                runs.append(job)
+
+                rss = f"{job['peak_rss_bytes'] / 2**20:.0f} MB" if job['peak_rss_bytes'] else 'n/a'
+                print(f"\n{name}: {job['status']} in {job['wall_seconds']:.1f}s "
+                      f"({job['fps_end_to_end']} fps), {job['reps']} reps, peak RSS {rss}")
+                if job['error']:
+                    print(f"  error: {job['error']}")
+                for group, stage in job['stages'].items():
+                    rate = f"{stage['per_second']:.0f}/s" if stage['per_second'] else '-'
+                    print(f"  {group:<10} {stage['frames']:>6} frames {stage['seconds']:>8.2f}s {rate:>10}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'host': host_info(),
+            'settings': {
+                'exercise': args.exercise,
+                'fps': args.fps,
+                'render_output': not args.no_render,
+                'inference_width': args.inference_width,
+                'model_complexity': args.model_complexity,
+            },
+            'runs': runs,
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+    if any(run['status'] != 'completed' for run in runs):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+"""
+Concurrent-session load generator for the Flask service.
+
+    CAMERA_SOURCE=/tmp/fitness_bench_clips/squat_640x360_10s_30fps.mp4 python app.py
+    python benchmarks/load_test.py --users 20 --duration 60
+    python benchmarks/load_test.py --users 50 --upload-share 0.5 --slow-clients 0.3 --output load.json
+
+The server should run with a stand-in camera (CAMERA_SOURCE, see
+utils/frame_source.py): a looped video file, a recorded landmark log or a
+synthetic stick figure. The upload clip defaults to a synthetic clip from
+benchmarks/bench_video.py.
+
+Each simulated user is a thread running one of two scenarios until
+--duration ends:
+
+    live     POST /start_exercise, watch /video_feed while polling
+             /get_status?since= every --poll-interval, POST /stop_exercise
+    upload   POST /api/video/upload, poll /api/video/status/<id> until the
+             job finishes, repeat
+
+A --slow-clients share of the live users reads the MJPEG stream at only
+--slow-rate KB/s, like a viewer on a poor connection. /metrics is scraped
+every --sample-interval for the server's RSS and CPU use over time (one
+worker's view: under gunicorn each scrape reaches whichever worker answers).
+
+The report gives per-endpoint latency percentiles and error rates, stream
+frame rates and time to first frame, video job durations and the server
+timeline; --output writes it all as JSON.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+PERCENTILES = (50, 90, 95, 99)
+STREAM_CHUNK = 16 * 1024
+SERVER_METRICS = ('process_resident_memory_bytes', 'process_cpu_seconds_total',
+                  'fitness_live_fps', 'fitness_video_jobs_in_progress')
+
+
+class Stats:
+    """Latencies and errors per endpoint, shared by all user threads"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+        self.streams = []
+        self.jobs = []
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, error=None):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if error:
+                self.errors[endpoint] += 1
+                self.error_samples.setdefault(endpoint, error)
+
+    def add_stream(self, stream):
+        with self._lock:
+            self.streams.append(stream)
+
+    def add_job(self, job):
+        with self._lock:
+            self.jobs.append(job)
+
+    def summary(self):
+        endpoints = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            ms = np.array(values) * 1000
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'errors': self.errors[endpoint],
+                'error_rate': round(self.errors[endpoint] / len(values), 4),
+                **{f'p{p}_ms': round(float(np.percentile(ms, p)), 1) for p in PERCENTILES},
+                'max_ms': round(float(ms.max()), 1),
+                'first_error': self.error_samples.get(endpoint),
+            }
+        return endpoints
+
+
+class Client:
+    """Minimal HTTP client (stdlib only) that times and classifies every request"""
+
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+
+    def request(self, endpoint, path, data=None, headers=None, method=None):
+        """Returns (status, parsed JSON or None); failures are recorded as errors of `endpoint`"""
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers or {}, method=method)
+        start = time.perf_counter()
+        status, body, error = None, None, None
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                status = response.status
+                raw = response.read()
+            if raw and status != 204:
+                body = json.loads(raw)
+                if isinstance(body, dict) and body.get('success') is False:
+                    error = body.get('error') or 'success: false'
+        except urllib.error.HTTPError as e:
+            status, error = e.code, f'HTTP {e.code}'
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            error = str(getattr(e, 'reason', e))
+        self.stats.record(endpoint, time.perf_counter() - start, error)
+        return status, body
+
+    def post_json(self, endpoint, path, payload):
+        return self.request(endpoint, path, json.dumps(payload).encode(),
+                            {'Content-Type': 'application/json'}, 'POST')
+
+    def post_file(self, endpoint, path, field, filename, content, fields):
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in fields.items():
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n')
+        parts.append(f'--{boundary}--\r\n'.encode())
+        return self.request(endpoint, path, b''.join(parts),
+                            {'Content-Type': f'multipart/form-data; boundary={boundary}'}, 'POST')
+
+
+def watch_stream(client, stop, slow_rate):
+    """Read /video_feed until `stop`; slow_rate (bytes/s) throttles reading like a poor connection"""
+    stream = {'slow': bool(slow_rate), 'frames': 0, 'bytes': 0, 'first_frame_ms': None, 'error': None}
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(client.base_url + '/video_feed', timeout=client.timeout) as response:
+            tail = b''
+            while not stop.is_set():
+                chunk = response.read1(STREAM_CHUNK) if hasattr(response, 'read1') else response.read(STREAM_CHUNK)
+                if not chunk:
+                    break
+                stream['bytes'] += len(chunk)
+                # Boundaries split across reads are found through the kept tail
+                frames = (tail + chunk).count(b'--frame')
+                tail = (tail + chunk)[-6:]
+                if frames and stream['first_frame_ms'] is None:
+                    stream['first_frame_ms'] = round((time.perf_counter() - start) * 1000, 1)
+                stream['frames'] += frames
+                if slow_rate:
+                    time.sleep(len(chunk) / slow_rate)
+    except (urllib.error.URLError, OSError) as e:
+        stream['error'] = str(getattr(e, 'reason', e))
+    stream['seconds'] = round(time.perf_counter() - start, 2)
+    stream['fps'] = round(stream['frames'] / stream['seconds'], 1) if stream['seconds'] else 0.0
+    client.stats.add_stream(stream)
+    client.stats.record('/video_feed', (stream['first_frame_ms'] or 0) / 1000,
+                        stream['error'] or (None if stream['frames'] else 'no frames received'))
+
+
+def live_user(client, deadline, args, slow):
+    client.post_json('/start_exercise', '/start_exercise',
+                     {'exercise_type': args.exercise, 'sets': 3, 'reps': 1000})
+    stop = threading.Event()
+    viewer = threading.Thread(target=watch_stream, args=(client, stop, args.slow_rate * 1024 if slow else 0),
+                              daemon=True)
+    viewer.start()
+
+    version = None
+    while time.monotonic() < deadline:
+        path = '/get_status' if version is None else f'/get_status?since={version}'
+        status, body = client.request('/get_status', path)
+        if status == 200 and body:
+            version = body.get('version')
+        time.sleep(args.poll_interval)
+
+    stop.set()
+    client.post_json('/stop_exercise', '/stop_exercise', {})
+    viewer.join(timeout=client.timeout)
+
+
+def upload_user(client, deadline, args, clip):
+    filename = os.path.basename(args.clip)
+    while time.monotonic() < deadline:
+        submitted = time.perf_counter()
+        _, body = client.post_file('/api/video/upload', '/api/video/upload', 'video', filename, clip,
+                                   {'exercise_type': args.exercise, 'render': '0' if args.no_render else '1'})
+        video_id = (body or {}).get('video_id')
+        if not video_id:
+            time.sleep(1.0)
+            continue
+
+        status = 'processing'
+        while status == 'processing' and time.monotonic() < deadline + args.job_timeout:
+            time.sleep(1.0)
+            _, body = client.request('/api/video/status/<id>', f'/api/video/status/{video_id}')
+            status = (body or {}).get('status', 'processing')
+        seconds = time.perf_counter() - submitted
+        client.stats.add_job({'status': status, 'seconds': round(seconds, 2)})
+        client.stats.record('video job', seconds, None if status == 'completed' else f'job {status}')
+
+
+def parse_metrics(text):
+    values = {}
+    for line in text.splitlines():
+        if line.startswith('#'):
+            continue
+        name, _, value = line.partition(' ')
+        if name in SERVER_METRICS:
+            try:
+                values[name] = float(value)
+            except ValueError:
+                pass
+    return values
+
+
+def sample_server(base_url, stop, interval, timeline):
+    """Scrape /metrics every `interval` seconds into `timeline` (RSS, CPU %, live fps, video jobs)"""
+    start = time.monotonic()
+    previous = None
+    while not stop.wait(interval):
+        try:
+            with urllib.request.urlopen(base_url.rstrip('/') + '/metrics', timeout=interval * 5) as response:
+                values = parse_metrics(response.read().decode())
+        except (urllib.error.URLError, OSError):
+            continue
+        now = time.monotonic()
+        cpu = values.get('process_cpu_seconds_total')
+        cpu_percent = None
+        if previous is not None and cpu is not None:
+            cpu_percent = round((cpu - previous[1]) / (now - previous[0]) * 100, 1)
+        previous = (now, cpu) if cpu is not None else None
+        timeline.append({
+            't': round(now - start, 2),
+            'rss_bytes': values.get('process_resident_memory_bytes'),
+            'cpu_percent': cpu_percent,
+            'live_fps': values.get('fitness_live_fps'),
+            'video_jobs': values.get('fitness_video_jobs_in_progress'),
+        })
+
+
+def default_clip():
+    from benchmarks.bench_video import render_clip
+    clip_dir = os.path.join(tempfile.gettempdir(), 'fitness_bench_clips')
+    os.makedirs(clip_dir, exist_ok=True)
+    return render_clip(os.path.join(clip_dir, 'squat_640x360_10s_30fps.mp4'), 'squat', 640, 360, 10, 30)
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<26}{'requests':>9}{'errors':>8}" + ''.join(f"{f'p{p}':>9}" for p in PERCENTILES)
+          + f"{'max':>9}")
+    for endpoint, s in report['endpoints'].items():
+        print(f"{endpoint:<26}{s['requests']:>9}{s['errors']:>8}"
+              + ''.join(f"{s[f'p{p}_ms']:>9.0f}" for p in PERCENTILES) + f"{s['max_ms']:>9.0f}")
+    print("(latency in ms; /video_feed: time to first frame; video job: upload to final status)")
+
+    for kind in ('normal', 'slow'):
+        streams = [s for s in report['streams'] if s['slow'] == (kind == 'slow')]
+        if streams:
+            print(f"{kind} viewers: {len(streams)}, mean {np.mean([s['fps'] for s in streams]):.1f} fps received")
+
+    timeline = report['server']
+    rss = [t['rss_bytes'] for t in timeline if t['rss_bytes']]
+    cpu = [t['cpu_percent'] for t in timeline if t['cpu_percent'] is not None]
+    if rss:
+        print(f"server RSS: peak {max(rss) / 2**20:.0f} MB")
+    if cpu:
+        print(f"server CPU: mean {np.mean(cpu):.0f}%, peak {max(cpu):.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the Flask service with simulated users")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds of load")
+    parser.add_argument('--ramp', type=float, default=5.0, help="Seconds over which users start")
+    parser.add_argument('--upload-share', type=float, default=0.2, help="Share of users uploading videos")
+    parser.add_argument('--slow-clients', type=float, default=0.0, help="Share of live users on a slow link")
+    parser.add_argument('--slow-rate', type=float, default=64.0, help="Slow link speed in KB/s")
+    parser.add_argument('--poll-interval', type=float, default=0.5, help="Seconds between /get_status polls")
+    parser.add_argument('--exercise', default='squat')
+    parser.add_argument('--clip', help="Video to upload (default: synthetic 640x360 clip)")
+    parser.add_argument('--no-render', action='store_true', help="Upload with render=0 (analysis only)")
+    parser.add_argument('--job-timeout', type=float, default=120.0,
+                        help="Seconds to keep polling a video job after --duration ends")
+    parser.add_argument('--timeout', type=float, default=30.0, help="HTTP timeout in seconds")
+    parser.add_argument('--sample-interval', type=float, default=1.0, help="Seconds between /metrics scrapes")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    uploaders = round(args.users * args.upload_share)
+    clip = None
+    if uploaders:
+        args.clip = args.clip or default_clip()
+        with open(args.clip, 'rb') as f:
+            clip = f.read()
+
+    stats = Stats()
+    timeline = []
+    stop_sampling = threading.Event()
+    sampler = threading.Thread(target=sample_server, args=(args.url, stop_sampling, args.sample_interval, timeline),
+                               daemon=True)
+    sampler.start()
+
+    start = time.monotonic()
+    deadline = start + args.duration
+    users = []
+    for i in range(args.users):
+        client = Client(args.url, stats, args.timeout)
+        if i < uploaders:
+            user = threading.Thread(target=upload_user, args=(client, deadline, args, clip), daemon=True)
+        else:
+            slow = rng.random() < args.slow_clients
+            user = threading.Thread(target=live_user, args=(client, deadline, args, slow), daemon=True)
+        users.append(user)
+    rng.shuffle(users)
+    for i, user in enumerate(users):
+        time.sleep(max(0.0, start + args.ramp * i / max(1, args.users) - time.monotonic()))
+        user.start()
+    print(f"{args.users} users ({uploaders} uploading) against {args.url} for {args.duration:.0f}s")
+
+    for user in users:
+        user.join(timeout=max(1.0, deadline + args.job_timeout + args.timeout - time.monotonic()))
+    stop_sampling.set()
+    sampler.join(timeout=args.sample_interval * 6)
+
+    report = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'settings': {k: v for k, v in vars(args).items() if k != 'output'},
+        'elapsed_seconds': round(time.monotonic() - start, 1),
+        'endpoints': stats.summary(),
+        'streams': stats.streams,
+        'jobs': stats.jobs,
+        'server': timeline,
+    }
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,465 @@
+"""
+Append-only columnar store for per-rep telemetry.
+
+ExerciseEngine throws rep durations, form scores, angle extremes and the
+feedback that fired away on every reset(). This store keeps them, one row
+per rep, for long-term history queries such as "squat form score per week
+over the last six months".
+
+Layout on disk:
+
+    <root>/manifest.json        active segments and their zone maps
+    <root>/dictionary.json      string -> code tables (users, exercises, feedback)
+    <root>/seg-00000001/        one segment = one .npy file per column
+        ts.npy  exercise.npy  form_score.npy  ...
+
+Rows are buffered in memory and written as a new immutable segment on
+flush(). Each segment records its row count, time range and the exercise
+codes it contains, so queries skip segments that cannot match and only
+memory-map the column files they actually read. Merged segments are swapped
+in through the manifest. Flushes merge only segments of a similar size
+(one size tier per factor of compact_threshold), so a row is rewritten once
+per tier instead of on every compaction; compact() merges all small
+segments up to target_segment_rows.
+
+Angle extremes are stored as dynamic float32 columns named
+`min_<angle>` / `max_<angle>`; segments written before an angle existed
+read back as NaN for it. Feedback names are folded into a uint64 bitmask.
+
+With shared=True several processes (multi-worker server) use one store:
+writes and reads take an exclusive file lock and first reload the manifest
+and dictionary, which another process may have changed. Dictionary tables
+only grow, so codes of buffered rows stay valid.
+"""
+
+import atexit
+from contextlib import contextmanager
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'rep_telemetry'
+)
+DEFAULT_USER = 'default'
+
+# Fixed columns; angle extremes are added per exercise as float32 columns
+BASE_COLUMNS = {
+    'ts': np.float64,
+    'user': np.uint16,
+    'exercise': np.uint16,
+    'side': np.int8,            # 0 = none, 1 = left, 2 = right
+    'rep_index': np.int32,
+    'duration': np.float32,
+    'form_score': np.float32,
+    'feedback': np.uint64,
+}
+SIDE_CODES = {None: 0, 'left': 1, 'right': 2}
+MAX_FEEDBACK_BITS = 64
+
+SEGMENT_PREFIX = 'seg-'
+
+
+def _angle_column_dtype(name: str):
+    return BASE_COLUMNS.get(name, np.float32)
+
+
+def _empty_column(name: str, rows: int) -> np.ndarray:
+    dtype = _angle_column_dtype(name)
+    if np.issubdtype(dtype, np.floating):
+        return np.full(rows, np.nan, dtype=dtype)
+    return np.zeros(rows, dtype=dtype)
+
+
+def _write_json(path: str, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class RepTelemetryStore:
+    def __init__(self, root_dir: str = DEFAULT_STORE_PATH, flush_rows: int = 4096,
+                 compact_threshold: int = 8, target_segment_rows: int = 1 << 18, shared: bool = False):
+        """
+        Args:
+            root_dir: Directory holding the manifest, dictionary and segments
+            flush_rows: Buffered rows that trigger writing a new segment
+            compact_threshold: Number of small segments in one size tier that triggers
+                               compaction on flush (also the size factor between tiers)
+            target_segment_rows: Size that compaction merges small segments up to
+            shared: Other processes use the same directory (multi-worker server)
+        """
+        self.root_dir = root_dir
+        self.flush_rows = flush_rows
+        self.compact_threshold = compact_threshold
+        self.target_segment_rows = target_segment_rows
+        self.shared = shared and fcntl is not None
+
+        self._lock = threading.RLock()
+        self._buffer: List[Dict[str, Any]] = []
+
+        os.makedirs(root_dir, exist_ok=True)
+        self._manifest_path = os.path.join(root_dir, 'manifest.json')
+        self._dictionary_path = os.path.join(root_dir, 'dictionary.json')
+        self._lock_path = os.path.join(root_dir, '.lock')
+        self._lock_depth = 0
+        self._lock_file = None
+
+        with self._lock, self._shared_lock():
+            self._load()
+            self._remove_orphan_segments()
+
+        atexit.register(self.flush)
+
+    def _load(self):
+        self._manifest = self._load_json(self._manifest_path, {'next_segment': 1, 'segments': []})
+        self._dictionary = self._load_json(self._dictionary_path,
+                                           {'user': [], 'exercise': [], 'feedback': []})
+        self._codes = {kind: {name: i for i, name in enumerate(names)}
+                       for kind, names in self._dictionary.items()}
+
+    @contextmanager
+    def _shared_lock(self):
+        """Exclusive lock across processes in shared mode (call with self._lock held)"""
+        if not self.shared:
+            yield
+            return
+        if self._lock_depth == 0:
+            self._lock_file = open(self._lock_path, 'a')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._load()
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                self._lock_file.close()
+                self._lock_file = None
+
+    @staticmethod
+    def _load_json(path: str, default):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def _remove_orphan_segments(self):
+        """Drop segment directories left behind by an interrupted flush or compaction"""
+        active = {seg['name'] for seg in self._manifest['segments']}
+        for name in os.listdir(self.root_dir):
+            if name.startswith(SEGMENT_PREFIX) and name not in active:
+                shutil.rmtree(os.path.join(self.root_dir, name), ignore_errors=True)
+
+    # ==================== DICTIONARY ====================
+
+    def _code(self, kind: str, name: str) -> int:
+        codes = self._codes[kind]
+        if name not in codes:
+            if kind == 'feedback' and len(codes) >= MAX_FEEDBACK_BITS:
+                return -1
+            codes[name] = len(codes)
+            self._dictionary[kind].append(name)
+            _write_json(self._dictionary_path, self._dictionary)
+        return codes[name]
+
+    def _feedback_mask(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            bit = self._code('feedback', name)
+            if bit >= 0:
+                mask |= 1 << bit
+        return mask
+
+    def feedback_names(self, mask: int) -> List[str]:
+        """Decode a feedback bitmask back into feedback names"""
+        mask = int(mask)
+        return [name for bit, name in enumerate(self._dictionary['feedback']) if mask >> bit & 1]
+
+    # ==================== WRITE ====================
+
+    def append_reps(self, exercise_type: str, reps: List[Dict[str, Any]], user_id: str = DEFAULT_USER):
+        """
+        Buffer reps as returned by ExerciseEngine.drain_rep_telemetry().
+
+        A segment is written once flush_rows rows are buffered.
+        """
+        if not reps:
+            return
+        with self._lock, self._shared_lock():
+            user = self._code('user', user_id)
+            exercise = self._code('exercise', exercise_type)
+            for rep in reps:
+                row = {
+                    'ts': rep['timestamp'],
+                    'user': user,
+                    'exercise': exercise,
+                    'side': SIDE_CODES.get(rep.get('side'), 0),
+                    'rep_index': rep.get('rep_index', 0),
+                    'duration': rep.get('duration', np.nan),
+                    'form_score': rep.get('form_score', np.nan),
+                    'feedback': self._feedback_mask(rep.get('feedback', ())),
+                }
+                for angle_name, value in rep.get('angle_min', {}).items():
+                    row[f'min_{angle_name}'] = value
+                for angle_name, value in rep.get('angle_max', {}).items():
+                    row[f'max_{angle_name}'] = value
+                self._buffer.append(row)
+
+            if len(self._buffer) >= self.flush_rows:
+                self._flush_locked()
+
+    def flush(self):
+        """Write buffered rows as a new segment"""
+        with self._lock:
+            if not self._buffer:
+                return
+            with self._shared_lock():
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        rows = self._buffer
+        self._buffer = []
+
+        names = list(BASE_COLUMNS)
+        for row in rows:
+            for name in row:
+                if name not in BASE_COLUMNS and name not in names:
+                    names.append(name)
+
+        columns = {}
+        for name in names:
+            column = _empty_column(name, len(rows))
+            for i, row in enumerate(rows):
+                if name in row:
+                    column[i] = row[name]
+            columns[name] = column
+
+        self._add_segment(columns)
+        try:
+            self._maybe_compact()
+        except OSError as e:
+            logger.error(f"Rep telemetry compaction failed: {e}")
+
+    def _write_segment(self, columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        name = f"{SEGMENT_PREFIX}{self._manifest['next_segment']:08d}"
+        self._manifest['next_segment'] += 1
+
+        path = os.path.join(self.root_dir, name)
+        os.makedirs(path, exist_ok=True)
+        for column_name, values in columns.items():
+            np.save(os.path.join(path, f'{column_name}.npy'), values)
+
+        ts = columns['ts']
+        return {
+            'name': name,
+            'rows': int(len(ts)),
+            'ts_min': float(ts.min()),
+            'ts_max': float(ts.max()),
+            'users': sorted(int(c) for c in np.unique(columns['user'])),
+            'exercises': sorted(int(c) for c in np.unique(columns['exercise'])),
+            'columns': list(columns),
+        }
+
+    def _add_segment(self, columns: Dict[str, np.ndarray]):
+        segment = self._write_segment(columns)
+        self._manifest['segments'].append(segment)
+        _write_json(self._manifest_path, self._manifest)
+
+    # ==================== COMPACTION ====================
+
+    def _tier(self, rows: int) -> int:
+        """Size tier of a segment: rows in [factor**tier, factor**(tier + 1))"""
+        factor = max(2, self.compact_threshold)
+        tier = 0
+        while rows >= factor:
+            rows //= factor
+            tier += 1
+        return tier
+
+    def _maybe_compact(self):
+        # A merge can fill the next tier up, so repeat until no tier is full
+        while True:
+            tiers = {}
+            for segment in self._manifest['segments']:
+                if segment['rows'] < self.target_segment_rows:
+                    tier = self._tier(segment['rows'])
+                    tiers[tier] = tiers.get(tier, 0) + 1
+            if not tiers or max(tiers.values()) < self.compact_threshold:
+                return
+            if not self._compact_locked(tiered=True):
+                return
+
+    def compact(self):
+        """Merge runs of small segments into segments of up to target_segment_rows rows"""
+        with self._lock, self._shared_lock():
+            self._flush_locked()
+            self._compact_locked()
+
+    def _compact_locked(self, tiered: bool = False) -> bool:
+        """
+        Merge runs of adjacent small segments. With tiered=True a run only
+        holds segments of one size tier and is merged once it has
+        compact_threshold segments; the result lands in the next tier.
+        Returns whether any segment was merged.
+        """
+        segments = self._manifest['segments']
+        groups, group, group_rows = [], [], 0
+        for segment in segments:
+            if segment['rows'] >= self.target_segment_rows:
+                groups.extend([group, [segment]])
+                group, group_rows = [], 0
+                continue
+            if group_rows + segment['rows'] > self.target_segment_rows or \
+                    (tiered and group and self._tier(segment['rows']) != self._tier(group[0]['rows'])):
+                groups.append(group)
+                group, group_rows = [], 0
+            group.append(segment)
+            group_rows += segment['rows']
+        groups.append(group)
+
+        min_group = self.compact_threshold if tiered else 2
+        merged_segments, retired = [], []
+        for group in groups:
+            if len(group) < max(2, min_group):
+                merged_segments.extend(group)
+                continue
+            names = []
+            for segment in group:
+                names.extend(c for c in segment['columns'] if c not in names)
+            columns = {name: np.concatenate([self._read_column(s, name) for s in group])
+                       for name in names}
+            merged_segments.append(self._write_segment(columns))
+            retired.extend(group)
+
+        if not retired:
+            return False
+
+        # The manifest swap is the commit point; old segments are removed afterwards
+        self._manifest['segments'] = merged_segments
+        _write_json(self._manifest_path, self._manifest)
+        for segment in retired:
+            shutil.rmtree(os.path.join(self.root_dir, segment['name']), ignore_errors=True)
+        logger.info(f"Compacted {len(retired)} rep telemetry segments")
+        return True
+
+    # ==================== READ ====================
+
+    def _read_column(self, segment: Dict[str, Any], name: str) -> np.ndarray:
+        if name not in segment['columns']:
+            return _empty_column(name, segment['rows'])
+        return np.load(os.path.join(self.root_dir, segment['name'], f'{name}.npy'), mmap_mode='r')
+
+    def query(self, columns: List[str], exercise: Optional[str] = None, user_id: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Read selected columns for reps matching the filters.
+
+        Only the requested columns (plus the ones needed for filtering) are
+        memory-mapped, and segments whose zone map rules them out are skipped.
+        Rows still in the write buffer are not visible until flush().
+
+        Args:
+            columns: Column names, e.g. ['ts', 'form_score'] or ['ts', 'min_knee_angle']
+            exercise: Exercise type to keep
+            user_id: User to keep
+            since / until: Unix timestamp bounds (inclusive)
+
+        Returns:
+            Dict of column name -> array, in insertion order
+        """
+        # Held throughout so compaction cannot retire a segment that is being read
+        with self._lock, self._shared_lock():
+            return self._query_locked(columns, exercise, user_id, since, until)
+
+    def _query_locked(self, columns, exercise, user_id, since, until):
+        exercise_code = self._codes['exercise'].get(exercise) if exercise else None
+        user_code = self._codes['user'].get(user_id) if user_id else None
+        if (exercise and exercise_code is None) or (user_id and user_code is None):
+            return {name: _empty_column(name, 0) for name in columns}
+
+        parts = {name: [] for name in columns}
+        for segment in self._manifest['segments']:
+            if since is not None and segment['ts_max'] < since:
+                continue
+            if until is not None and segment['ts_min'] > until:
+                continue
+            if exercise_code is not None and exercise_code not in segment['exercises']:
+                continue
+            if user_code is not None and user_code not in segment['users']:
+                continue
+
+            mask = None
+            if since is not None or until is not None:
+                ts = self._read_column(segment, 'ts')
+                mask = np.ones(segment['rows'], dtype=bool)
+                if since is not None:
+                    mask &= ts >= since
+                if until is not None:
+                    mask &= ts <= until
+            if exercise_code is not None and len(segment['exercises']) > 1:
+                match = self._read_column(segment, 'exercise') == exercise_code
+                mask = match if mask is None else mask & match
+            if user_code is not None and len(segment['users']) > 1:
+                match = self._read_column(segment, 'user') == user_code
+                mask = match if mask is None else mask & match
+
+            for name in columns:
+                values = self._read_column(segment, name)
+                parts[name].append(np.asarray(values[mask] if mask is not None else values))
+
+        return {name: (np.concatenate(chunks) if chunks else _empty_column(name, 0))
+                for name, chunks in parts.items()}
+
+    def form_score_trend(self, exercise: str, days: int = 180, bucket_days: int = 7,
+                         user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Mean form score per time bucket, e.g. weekly squat form over six months.
+
+        Reads only the ts and form_score columns.
+        """
+        now = time.time()
+        since = now - days * 86400
+        data = self.query(['ts', 'form_score'], exercise=exercise, user_id=user_id, since=since)
+        if not len(data['ts']):
+            return []
+
+        bucket_sec = bucket_days * 86400
+        buckets = ((data['ts'] - since) // bucket_sec).astype(np.int64)
+        counts = np.bincount(buckets)
+        sums = np.bincount(buckets, weights=data['form_score'])
+
+        trend = []
+        for i in np.nonzero(counts)[0]:
+            trend.append({
+                'bucket_start': round(since + int(i) * bucket_sec, 3),
+                'reps': int(counts[i]),
+                'avg_form_score': round(float(sums[i] / counts[i]), 1),
+            })
+        return trend
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'segments': len(self._manifest['segments']),
+                'rows': sum(s['rows'] for s in self._manifest['segments']),
+                'buffered_rows': len(self._buffer),
+            }
@@ -0,0 +1,324 @@
+"""
+Session and job state shared by the worker processes of one host.
+
+A single `python app.py` keeps live exercise state, video jobs and client
+pose sessions in module globals. Under a multi-worker WSGI server (see
+gunicorn.conf.py) every worker has its own copy of those globals, so a
+status poll can land on a worker that never saw the session. SharedStateStore
+moves that state into one SQLite database in WAL mode:
+
+    documents  JSON state readable by every worker (video jobs, live status)
+    objects    pickled objects updated with compare-and-swap on a version
+               column (client pose sessions)
+    claims     resources owned by one worker, e.g. the camera, with a
+               heartbeat so a dead worker's claim expires
+    commands   requests for the worker that owns a resource, and their results
+
+Live sessions stay sticky: the worker that claims the camera runs capture
+and inference, and other workers forward commands to it and read the
+status it publishes.
+"""
+
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'shared_state.db'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS objects (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data BLOB NOT NULL,
+    updated_at REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS claims (
+    resource TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    heartbeat REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    target TEXT NOT NULL,
+    name TEXT NOT NULL,
+    payload TEXT,
+    result TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_commands_target ON commands (target, result);
+"""
+
+
+class SharedStateStore:
+    def __init__(self, db_path: str = DEFAULT_STATE_PATH, claim_ttl: float = 5.0):
+        """
+        Args:
+            db_path: SQLite database file (created if missing)
+            claim_ttl: Seconds without a heartbeat after which a claim expires
+        """
+        self.db_path = db_path
+        self.claim_ttl = claim_ttl
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(objects)")}
+        if 'version' not in columns:
+            # Databases created before objects were versioned
+            conn.execute("ALTER TABLE objects ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        conn.close()
+        self._local = threading.local()
+
+    def _connect(self):
+        # Autocommit; transactions are opened explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self):
+        """Per-thread connection (sqlite3 connections are not shared across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that holds the database lock against all workers"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ==================== Documents ====================
+
+    def put(self, namespace: str, key: str, value: Any):
+        """Store a JSON-serializable value"""
+        self._conn().execute(
+            "INSERT INTO documents (namespace, key, value, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (namespace, key, json.dumps(value, default=str), time.time())
+        )
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT value FROM documents WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, namespace: str, key: str):
+        self._conn().execute("DELETE FROM documents WHERE namespace = ? AND key = ?", (namespace, key))
+
+    # ==================== Objects ====================
+
+    def add_object(self, namespace: str, key: str, obj: Any):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO objects (namespace, key, data, updated_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), time.time())
+        )
+
+    def get_object(self, namespace: str, key: str) -> Optional[Any]:
+        """Read-only copy of an object (not written back, updated_at is unchanged)"""
+        row = self._conn().execute(
+            "SELECT data FROM objects WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def update_object(self, namespace: str, key: str, fn: Callable[[Any], Any]) -> Any:
+        """
+        Apply fn to an object and write it back with compare-and-swap.
+
+        fn runs on a freshly loaded copy without any database lock; the write
+        only succeeds if nobody stored a newer version meanwhile, otherwise
+        fn is applied again to the newer object. Only the single UPDATE takes
+        SQLite's write lock, so fn calls for different objects run in parallel
+        across workers, and no update is lost.
+
+        Returns:
+            fn's result, or None when the object does not exist
+        """
+        conn = self._conn()
+        while True:
+            row = conn.execute(
+                "SELECT data, version FROM objects WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            obj = pickle.loads(row[0])
+            result = fn(obj)
+            cursor = conn.execute(
+                "UPDATE objects SET data = ?, updated_at = ?, version = version + 1 "
+                "WHERE namespace = ? AND key = ? AND version = ?",
+                (pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), time.time(), namespace, key, row[1])
+            )
+            if cursor.rowcount == 1:
+                return result
+
+    def pop_object(self, namespace: str, key: str) -> Optional[Any]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT data FROM objects WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            conn.execute("DELETE FROM objects WHERE namespace = ? AND key = ?", (namespace, key))
+        return pickle.loads(row[0]) if row else None
+
+    def pop_stale_objects(self, namespace: str, older_than: float) -> List[Any]:
+        """Remove and return objects not written since `older_than` (unix time)"""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT data FROM objects WHERE namespace = ? AND updated_at < ?", (namespace, older_than)
+            ).fetchall()
+            conn.execute("DELETE FROM objects WHERE namespace = ? AND updated_at < ?", (namespace, older_than))
+        return [pickle.loads(row[0]) for row in rows]
+
+    def count_objects(self, namespace: str) -> int:
+        return self._conn().execute(
+            "SELECT count(*) FROM objects WHERE namespace = ?", (namespace,)
+        ).fetchone()[0]
+
+    # ==================== Claims ====================
+
+    def claim(self, resource: str, owner: str) -> bool:
+        """Claim (or keep claiming) a resource; False while another live owner holds it"""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT owner, heartbeat FROM claims WHERE resource = ?", (resource,)).fetchone()
+            if row and row[0] != owner and now - row[1] < self.claim_ttl:
+                return False
+            conn.execute("INSERT OR REPLACE INTO claims (resource, owner, heartbeat) VALUES (?, ?, ?)",
+                         (resource, owner, now))
+        return True
+
+    def release(self, resource: str, owner: str):
+        self._conn().execute("DELETE FROM claims WHERE resource = ? AND owner = ?", (resource, owner))
+
+    def owner(self, resource: str) -> Optional[str]:
+        """Current owner of a resource, None if unclaimed or expired"""
+        row = self._conn().execute("SELECT owner, heartbeat FROM claims WHERE resource = ?", (resource,)).fetchone()
+        if row is None or time.time() - row[1] >= self.claim_ttl:
+            return None
+        return row[0]
+
+    # ==================== Commands ====================
+
+    def send_command(self, target: str, name: str, payload: Any = None) -> int:
+        cursor = self._conn().execute(
+            "INSERT INTO commands (target, name, payload, created_at) VALUES (?, ?, ?, ?)",
+            (target, name, json.dumps(payload), time.time())
+        )
+        return cursor.lastrowid
+
+    def take_commands(self, target: str) -> List[Dict[str, Any]]:
+        """Pending commands for this worker, oldest first"""
+        rows = self._conn().execute(
+            "SELECT id, name, payload FROM commands WHERE target = ? AND result IS NULL ORDER BY id", (target,)
+        ).fetchall()
+        return [{'id': row[0], 'name': row[1], 'payload': json.loads(row[2])} for row in rows]
+
+    def complete_command(self, command_id: int, result: Any):
+        self._conn().execute("UPDATE commands SET result = ? WHERE id = ?", (json.dumps(result), command_id))
+
+    def call(self, target: str, name: str, payload: Any = None, timeout: float = 3.0,
+             poll_interval: float = 0.02) -> Optional[Any]:
+        """Send a command and wait for its result; None if the target did not answer in time"""
+        command_id = self.send_command(target, name, payload)
+        conn = self._conn()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            row = conn.execute("SELECT result FROM commands WHERE id = ?", (command_id,)).fetchone()
+            if row and row[0] is not None:
+                conn.execute("DELETE FROM commands WHERE id = ?", (command_id,))
+                return json.loads(row[0])
+            time.sleep(poll_interval)
+        conn.execute("DELETE FROM commands WHERE id = ?", (command_id,))
+        logger.warning(f"Command {name} for worker {target} timed out")
+        return None
+
+
+class SessionRegistry:
+    """In-process sessions by id (single worker)"""
+
+    def __init__(self):
+        self._sessions: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, session: Any):
+        with self._lock:
+            self._sessions[session_id] = session
+
+    def get(self, session_id: str) -> Optional[Any]:
+        return self._sessions.get(session_id)
+
+    def update(self, session_id: str, fn: Callable[[Any], Any]) -> Any:
+        """fn(session), or None if the session does not exist"""
+        session = self._sessions.get(session_id)
+        return fn(session) if session is not None else None
+
+    def pop(self, session_id: str) -> Optional[Any]:
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def pop_stale(self, older_than: float) -> List[Any]:
+        """Remove and return sessions whose last_seen is before `older_than`"""
+        with self._lock:
+            stale = [sid for sid, s in self._sessions.items() if s.last_seen < older_than]
+            return [self._sessions.pop(sid) for sid in stale]
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SharedSessionRegistry:
+    """Sessions pickled into a SharedStateStore, usable from any worker"""
+
+    def __init__(self, store: SharedStateStore, namespace: str):
+        self.store = store
+        self.namespace = namespace
+
+    def add(self, session_id: str, session: Any):
+        self.store.add_object(self.namespace, session_id, session)
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Copy of the session for reading; changes to it are not stored"""
+        return self.store.get_object(self.namespace, session_id)
+
+    def update(self, session_id: str, fn: Callable[[Any], Any]) -> Any:
+        """fn(session) written back for all workers (see update_object), None if it does not exist"""
+        return self.store.update_object(self.namespace, session_id, fn)
+
+    def pop(self, session_id: str) -> Optional[Any]:
+        return self.store.pop_object(self.namespace, session_id)
+
+    def pop_stale(self, older_than: float) -> List[Any]:
+        return self.store.pop_stale_objects(self.namespace, older_than)
+
+    def __len__(self):
+        return self.store.count_objects(self.namespace)
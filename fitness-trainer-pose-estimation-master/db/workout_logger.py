@@ -0,0 +1,412 @@
+"""
+Workout history on SQLite.
+
+Every logged workout is stored in the `workouts` table and, in the same
+transaction, folded into rollup tables (per day, per week, per exercise and
+per user). Dashboard and profile reads are primary-key lookups on those
+rollups instead of scans over the history.
+
+The database runs in WAL mode so page views can read while workouts are
+written. Writes are queued and committed in batches by a background thread,
+so `log_workout` never blocks the request thread on disk I/O.
+
+Totals, streak and this week's numbers are additionally kept in memory
+(see db/workout_stats.py) and updated in O(1) on every `log_workout`.
+With several worker processes (shared=True) that cache is reloaded when
+another process has committed workouts, detected via PRAGMA data_version.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from db.workout_stats import WorkoutStats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'workouts.db'
+)
+DEFAULT_USER = 'default'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workouts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    exercise_type TEXT NOT NULL,
+    logged_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    sets INTEGER NOT NULL,
+    reps INTEGER NOT NULL,
+    duration_seconds INTEGER NOT NULL,
+    form_score REAL
+);
+CREATE INDEX IF NOT EXISTS idx_workouts_user_time ON workouts (user_id, logged_at DESC);
+CREATE INDEX IF NOT EXISTS idx_workouts_user_day ON workouts (user_id, day);
+CREATE INDEX IF NOT EXISTS idx_workouts_user_exercise ON workouts (user_id, exercise_type, logged_at DESC);
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    workout_count INTEGER NOT NULL DEFAULT 0,
+    total_sets INTEGER NOT NULL DEFAULT 0,
+    total_reps INTEGER NOT NULL DEFAULT 0,
+    total_seconds INTEGER NOT NULL DEFAULT 0,
+    form_score_sum REAL NOT NULL DEFAULT 0,
+    form_score_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS weekly_stats (
+    user_id TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    workout_count INTEGER NOT NULL DEFAULT 0,
+    total_sets INTEGER NOT NULL DEFAULT 0,
+    total_reps INTEGER NOT NULL DEFAULT 0,
+    total_seconds INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, week_start)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS exercise_stats (
+    user_id TEXT NOT NULL,
+    exercise_type TEXT NOT NULL,
+    workout_count INTEGER NOT NULL DEFAULT 0,
+    total_reps INTEGER NOT NULL DEFAULT 0,
+    total_seconds INTEGER NOT NULL DEFAULT 0,
+    last_logged_at REAL,
+    PRIMARY KEY (user_id, exercise_type)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    total_workouts INTEGER NOT NULL DEFAULT 0,
+    total_sets INTEGER NOT NULL DEFAULT 0,
+    total_reps INTEGER NOT NULL DEFAULT 0,
+    total_seconds INTEGER NOT NULL DEFAULT 0,
+    form_score_sum REAL NOT NULL DEFAULT 0,
+    form_score_count INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+_STOP = object()
+
+
+def week_start(day: date) -> date:
+    """Monday of the ISO week containing day"""
+    return day - timedelta(days=day.weekday())
+
+
+class WorkoutLogger:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, batch_size: int = 100, batch_interval: float = 0.2,
+                 shared: bool = False):
+        """
+        Args:
+            db_path: SQLite database file (created if missing)
+            batch_size: Max workouts committed in one transaction
+            batch_interval: Seconds the writer waits to fill a batch
+            shared: Other processes write to the same database (multi-worker server)
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.shared = shared
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._local = threading.local()
+        self._stats: Dict[str, WorkoutStats] = {}
+        self._stats_lock = threading.Lock()
+        self._data_version = None
+        self._version_conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False) if shared else None
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._writer_loop, name="workout-logger", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        """Per-thread read connection (sqlite3 connections are not shared across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # ==================== Writes ====================
+
+    def log_workout(self, exercise_type: str, sets: int, reps: int, duration_seconds: int,
+                    form_score: Optional[float] = None, user_id: str = DEFAULT_USER,
+                    timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Queue a finished workout for writing.
+
+        Args:
+            exercise_type: Exercise name (e.g. "squat")
+            sets: Sets performed
+            reps: Reps per set
+            duration_seconds: Workout duration
+            form_score: Average form score (0-100), if known
+            user_id: Owner of the workout
+            timestamp: Unix time of the workout (defaults to now)
+
+        Returns:
+            The record as it will be stored
+        """
+        logged_at = timestamp if timestamp is not None else time.time()
+        record = {
+            'user_id': user_id,
+            'exercise_type': exercise_type,
+            'logged_at': logged_at,
+            'day': datetime.fromtimestamp(logged_at).date().isoformat(),
+            'sets': int(sets),
+            'reps': int(reps),
+            'duration_seconds': int(duration_seconds),
+            'form_score': float(form_score) if form_score is not None else None,
+        }
+        if self._closed:
+            logger.warning("WorkoutLogger is closed, dropping workout")
+            return record
+        with self._stats_lock:
+            self._queue.put(record)
+            stats = self._stats.get(user_id)
+        if stats is not None:
+            stats.record(record)
+        return record
+
+    def flush(self):
+        """Block until every queued workout is committed."""
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout=5)
+
+    def _writer_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            records = [item for item in batch if item is not _STOP]
+            if records:
+                try:
+                    with conn:
+                        for record in records:
+                            self._apply(conn, record)
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to write {len(records)} workouts: {e}")
+
+            for _ in batch:
+                self._queue.task_done()
+            if batch[-1] is _STOP:
+                break
+        conn.close()
+
+    @staticmethod
+    def _apply(conn, r):
+        """Insert one workout and fold it into the rollup tables."""
+        conn.execute(
+            "INSERT INTO workouts (user_id, exercise_type, logged_at, day, sets, reps, duration_seconds, form_score) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (r['user_id'], r['exercise_type'], r['logged_at'], r['day'],
+             r['sets'], r['reps'], r['duration_seconds'], r['form_score'])
+        )
+
+        # reps is per set, rollups count reps performed
+        total_reps = r['sets'] * r['reps']
+        score_sum = r['form_score'] or 0
+        score_count = 1 if r['form_score'] is not None else 0
+
+        conn.execute(
+            "INSERT INTO daily_stats (user_id, day, workout_count, total_sets, total_reps, total_seconds, "
+            "form_score_sum, form_score_count) VALUES (?, ?, 1, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (user_id, day) DO UPDATE SET "
+            "workout_count = workout_count + 1, total_sets = total_sets + excluded.total_sets, "
+            "total_reps = total_reps + excluded.total_reps, total_seconds = total_seconds + excluded.total_seconds, "
+            "form_score_sum = form_score_sum + excluded.form_score_sum, "
+            "form_score_count = form_score_count + excluded.form_score_count",
+            (r['user_id'], r['day'], r['sets'], total_reps, r['duration_seconds'], score_sum, score_count)
+        )
+        conn.execute(
+            "INSERT INTO weekly_stats (user_id, week_start, workout_count, total_sets, total_reps, total_seconds) "
+            "VALUES (?, ?, 1, ?, ?, ?) "
+            "ON CONFLICT (user_id, week_start) DO UPDATE SET "
+            "workout_count = workout_count + 1, total_sets = total_sets + excluded.total_sets, "
+            "total_reps = total_reps + excluded.total_reps, total_seconds = total_seconds + excluded.total_seconds",
+            (r['user_id'], week_start(date.fromisoformat(r['day'])).isoformat(),
+             r['sets'], total_reps, r['duration_seconds'])
+        )
+        conn.execute(
+            "INSERT INTO exercise_stats (user_id, exercise_type, workout_count, total_reps, total_seconds, "
+            "last_logged_at) VALUES (?, ?, 1, ?, ?, ?) "
+            "ON CONFLICT (user_id, exercise_type) DO UPDATE SET "
+            "workout_count = workout_count + 1, total_reps = total_reps + excluded.total_reps, "
+            "total_seconds = total_seconds + excluded.total_seconds, "
+            "last_logged_at = max(last_logged_at, excluded.last_logged_at)",
+            (r['user_id'], r['exercise_type'], total_reps, r['duration_seconds'], r['logged_at'])
+        )
+        conn.execute(
+            "INSERT INTO user_stats (user_id, total_workouts, total_sets, total_reps, total_seconds, "
+            "form_score_sum, form_score_count) VALUES (?, 1, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET "
+            "total_workouts = total_workouts + 1, total_sets = total_sets + excluded.total_sets, "
+            "total_reps = total_reps + excluded.total_reps, total_seconds = total_seconds + excluded.total_seconds, "
+            "form_score_sum = form_score_sum + excluded.form_score_sum, "
+            "form_score_count = form_score_count + excluded.form_score_count",
+            (r['user_id'], r['sets'], total_reps, r['duration_seconds'], score_sum, score_count)
+        )
+
+    # ==================== Reads ====================
+
+    def _database_changed(self) -> bool:
+        """True if any other connection (our writer or another process) committed since the last check"""
+        with self._stats_lock:
+            version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+            changed = version != self._data_version
+            self._data_version = version
+        return changed
+
+    def get_cached_stats(self, user_id: str = DEFAULT_USER) -> Dict[str, Any]:
+        """Precomputed totals, streak and weekly numbers (no database access after first load)"""
+        if self.shared and self._database_changed():
+            with self._stats_lock:
+                self._stats.clear()
+        stats = self._stats.get(user_id)
+        if stats is None:
+            with self._stats_lock:
+                stats = self._stats.get(user_id)
+                if stats is None:
+                    # Seed from committed rollups; holding the lock keeps new
+                    # workouts from being counted twice or not at all
+                    self.flush()
+                    stats = WorkoutStats.from_logger(self, user_id)
+                    self._stats[user_id] = stats
+        return stats.snapshot()
+
+    def get_user_stats_row(self, user_id: str = DEFAULT_USER) -> Optional[Dict[str, Any]]:
+        row = self._reader().execute(
+            "SELECT * FROM user_stats WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_last_workout_day(self, user_id: str = DEFAULT_USER) -> Optional[date]:
+        row = self._reader().execute(
+            "SELECT max(day) AS day FROM daily_stats WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return date.fromisoformat(row['day']) if row and row['day'] else None
+
+    def get_recent_workouts(self, limit: int = 10, user_id: str = DEFAULT_USER) -> List[Dict[str, Any]]:
+        rows = self._reader().execute(
+            "SELECT exercise_type, logged_at, sets, reps, duration_seconds, form_score FROM workouts "
+            "WHERE user_id = ? ORDER BY logged_at DESC LIMIT ?",
+            (user_id, limit)
+        ).fetchall()
+        return [{
+            'date': datetime.fromtimestamp(row['logged_at']).strftime('%Y-%m-%d %H:%M'),
+            'exercise_type': row['exercise_type'],
+            'sets': row['sets'],
+            'reps': row['reps'],
+            'duration_seconds': row['duration_seconds'],
+            'form_score': row['form_score'],
+        } for row in rows]
+
+    def get_weekly_stats(self, user_id: str = DEFAULT_USER, today: Optional[date] = None) -> Dict[str, Dict[str, Any]]:
+        """Per-day stats for the current week (Monday..Sunday), keyed by ISO date"""
+        monday = week_start(today or date.today())
+        days = [monday + timedelta(days=i) for i in range(7)]
+        rows = self._reader().execute(
+            "SELECT day, workout_count, total_reps, total_seconds FROM daily_stats "
+            "WHERE user_id = ? AND day BETWEEN ? AND ?",
+            (user_id, days[0].isoformat(), days[-1].isoformat())
+        ).fetchall()
+        by_day = {row['day']: row for row in rows}
+
+        stats = {}
+        for day in days:
+            row = by_day.get(day.isoformat())
+            stats[day.isoformat()] = {
+                'weekday': day.strftime('%a'),
+                'workout_count': row['workout_count'] if row else 0,
+                'total_reps': row['total_reps'] if row else 0,
+                'total_minutes': round(row['total_seconds'] / 60, 1) if row else 0,
+            }
+        return stats
+
+    def get_exercise_distribution(self, user_id: str = DEFAULT_USER) -> Dict[str, int]:
+        rows = self._reader().execute(
+            "SELECT exercise_type, workout_count FROM exercise_stats WHERE user_id = ? "
+            "ORDER BY workout_count DESC",
+            (user_id,)
+        ).fetchall()
+        return {row['exercise_type']: row['workout_count'] for row in rows}
+
+    def get_exercise_stats(self, user_id: str = DEFAULT_USER) -> List[Dict[str, Any]]:
+        rows = self._reader().execute(
+            "SELECT exercise_type, workout_count, total_reps, total_seconds FROM exercise_stats "
+            "WHERE user_id = ? ORDER BY workout_count DESC",
+            (user_id,)
+        ).fetchall()
+        return [{
+            'exercise': row['exercise_type'],
+            'count': row['workout_count'],
+            'total_reps': row['total_reps'],
+            'total_seconds': row['total_seconds'],
+        } for row in rows]
+
+    def get_streak_days(self, user_id: str = DEFAULT_USER, today: Optional[date] = None) -> int:
+        """
+        Consecutive days with a workout, ending today (or yesterday if not
+        trained yet today). Walks the daily rollup; used to seed the cache.
+        """
+        day = today or date.today()
+        conn = self._reader()
+
+        def has_workout(d):
+            return conn.execute(
+                "SELECT 1 FROM daily_stats WHERE user_id = ? AND day = ?", (user_id, d.isoformat())
+            ).fetchone() is not None
+
+        if not has_workout(day):
+            day -= timedelta(days=1)
+        streak = 0
+        while has_workout(day):
+            streak += 1
+            day -= timedelta(days=1)
+        return streak
+
+    def get_user_stats(self, user_id: str = DEFAULT_USER) -> Dict[str, Any]:
+        stats = self.get_cached_stats(user_id)
+        return {key: stats[key] for key in ('total_workouts', 'total_exercises', 'total_reps',
+                                           'total_minutes', 'avg_form_score', 'streak_days')}
+
+    def get_dashboard_stats(self, user_id: str = DEFAULT_USER) -> Dict[str, Any]:
+        return self.get_cached_stats(user_id)
@@ -0,0 +1,132 @@
+"""
+In-memory workout aggregates for dashboard and profile pages.
+
+Loaded once per user from the SQLite rollups, then updated in O(1) for every
+logged workout. Page views and /dashboard_data read the precomputed values
+without touching the database.
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+WEEKDAY_LABELS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+class WorkoutStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        self.total_workouts = 0
+        self.total_sets = 0
+        self.total_reps = 0
+        self.total_seconds = 0
+        self.form_score_sum = 0.0
+        self.form_score_count = 0
+        self.exercise_counts: Dict[str, int] = {}
+
+        # Streak ends on last_day; it is broken once a whole day passes without training
+        self.streak_days = 0
+        self.last_day: Optional[date] = None
+
+        # Current week / day, rolled over lazily on the next read or write
+        self.week_start: date = _week_start(date.today())
+        self.week_workouts = 0
+        self.week_minutes = [0.0] * 7
+        self.today: date = date.today()
+        self.today_reps = 0
+
+    @classmethod
+    def from_logger(cls, workout_logger, user_id: str) -> "WorkoutStats":
+        """Seed the aggregates from the logger's rollup tables"""
+        stats = cls()
+        user = workout_logger.get_user_stats_row(user_id)
+        if user:
+            stats.total_workouts = user['total_workouts']
+            stats.total_sets = user['total_sets']
+            stats.total_reps = user['total_reps']
+            stats.total_seconds = user['total_seconds']
+            stats.form_score_sum = user['form_score_sum']
+            stats.form_score_count = user['form_score_count']
+        stats.exercise_counts = workout_logger.get_exercise_distribution(user_id)
+
+        for day_key, day in workout_logger.get_weekly_stats(user_id, stats.today).items():
+            weekday = date.fromisoformat(day_key).weekday()
+            stats.week_workouts += day['workout_count']
+            stats.week_minutes[weekday] = day['total_minutes']
+            if day_key == stats.today.isoformat():
+                stats.today_reps = day['total_reps']
+
+        stats.last_day = workout_logger.get_last_workout_day(user_id)
+        if stats.last_day:
+            stats.streak_days = workout_logger.get_streak_days(user_id, stats.last_day)
+        return stats
+
+    def _roll_over(self, now: date):
+        if _week_start(now) != self.week_start:
+            self.week_start = _week_start(now)
+            self.week_workouts = 0
+            self.week_minutes = [0.0] * 7
+        if now != self.today:
+            self.today = now
+            self.today_reps = 0
+
+    def record(self, record: Dict[str, Any]):
+        """Fold one logged workout (as returned by WorkoutLogger.log_workout) into the aggregates."""
+        day = date.fromisoformat(record['day'])
+        reps = record['sets'] * record['reps']
+
+        with self._lock:
+            self._roll_over(date.today())
+
+            self.total_workouts += 1
+            self.total_sets += record['sets']
+            self.total_reps += reps
+            self.total_seconds += record['duration_seconds']
+            if record.get('form_score') is not None:
+                self.form_score_sum += record['form_score']
+                self.form_score_count += 1
+            name = record['exercise_type']
+            self.exercise_counts[name] = self.exercise_counts.get(name, 0) + 1
+
+            # Streak only moves forward; back-filled older days do not change it
+            if self.last_day is None or day > self.last_day + timedelta(days=1):
+                self.streak_days = 1
+                self.last_day = day
+            elif day == self.last_day + timedelta(days=1):
+                self.streak_days += 1
+                self.last_day = day
+
+            if _week_start(day) == self.week_start:
+                self.week_workouts += 1
+                self.week_minutes[day.weekday()] += record['duration_seconds'] / 60
+            if day == self.today:
+                self.today_reps += reps
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current aggregates as a plain dict"""
+        now = date.today()
+        with self._lock:
+            self._roll_over(now)
+            streak = self.streak_days
+            if self.last_day is None or self.last_day < now - timedelta(days=1):
+                streak = 0
+            distribution = sorted(self.exercise_counts.items(), key=lambda item: item[1], reverse=True)
+            return {
+                'total_workouts': self.total_workouts,
+                'total_exercises': self.total_sets,
+                'total_reps': self.total_reps,
+                'total_minutes': self.total_seconds // 60,
+                'avg_form_score': (round(self.form_score_sum / self.form_score_count)
+                                   if self.form_score_count else None),
+                'streak_days': streak,
+                'weekly_workouts': self.week_workouts,
+                'weekly_minutes': [round(m, 1) for m in self.week_minutes],
+                'today_reps': self.today_reps,
+                'exercise_distribution': dict(distribution),
+                'updated_at': datetime.now().isoformat(timespec='seconds'),
+            }
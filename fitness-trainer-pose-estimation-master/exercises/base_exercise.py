@@ -54,6 +54,9 @@ class BaseExercise:
         Args:
             config: YAML'dan yüklenen egzersiz konfigürasyonu
         """
+        # Zaman kaynağı (kayıt tekrarında kaydedilmiş zaman damgaları kullanılır)
+        self.clock = time.time
+        
         # Temel bilgiler
         self.name = config["name"]
         self.display_name = config.get("display_name", self.name.replace("_", " ").title())
@@ -116,6 +119,10 @@ class BaseExercise:
         # Feedback penalty tracking
         self.active_feedback_count = 0
         
+        # Per-rep telemetry (açı uç değerleri, tetiklenen feedback'ler)
+        self.completed_reps = []
+        self._reset_rep_sample()
+        
     def get_landmark_coords(self, landmarks, point_name: str, frame_shape: Tuple[int, int]) -> Tuple[int, int]:
         """
         Landmark adından piksel koordinatlarını al.
@@ -254,7 +261,7 @@ class BaseExercise:
             from_valid = self.prev_state == from_state
         
         # Zaman filtresi
-        current_time = time.time()
+        current_time = self.clock()
         time_valid = (current_time - self.last_count_time) >= self.min_rep_duration
         
         if state_changed and reached_trigger and from_valid and time_valid:
@@ -383,12 +390,12 @@ class BaseExercise:
     
     def start_rep_tracking(self):
         """Rep başlangıç zamanını kaydet."""
-        self.rep_start_time = time.time()
+        self.rep_start_time = self.clock()
     
     def end_rep_tracking(self):
         """Rep süresini kaydet ve form score'u güncelle."""
         if self.rep_start_time:
-            duration = time.time() - self.rep_start_time
+            duration = self.clock() - self.rep_start_time
             self.rep_durations.append(duration)
             self.rep_start_time = None
             
@@ -399,6 +406,61 @@ class BaseExercise:
             if self.rep_form_scores:
                 self.avg_form_score = int(sum(self.rep_form_scores) / len(self.rep_form_scores))
     
+    # ==================== PER-REP TELEMETRY ====================
+    
+    def _reset_rep_sample(self):
+        self._rep_sample_start = None
+        self._rep_angle_min = {}
+        self._rep_angle_max = {}
+        self._rep_feedback = set()
+    
+    def record_rep_sample(self, feedback_list: List[Dict]):
+        """
+        Devam eden rep için açı uç değerlerini ve feedback'leri biriktir.
+        
+        Args:
+            feedback_list: Bu frame'de tetiklenen feedback mesajları
+        """
+        if self._rep_sample_start is None:
+            self._rep_sample_start = self.clock()
+        
+        for angle_name, value in self._computed_angles.items():
+            value = float(value)
+            if value < self._rep_angle_min.get(angle_name, float("inf")):
+                self._rep_angle_min[angle_name] = value
+            if value > self._rep_angle_max.get(angle_name, float("-inf")):
+                self._rep_angle_max[angle_name] = value
+        
+        for fb in feedback_list:
+            self._rep_feedback.add(fb["name"])
+    
+    def finish_rep_sample(self, side: str = None):
+        """
+        Sayılan rep'in telemetrisini completed_reps listesine ekle.
+        
+        Args:
+            side: Bilateral egzersizlerde "left" / "right"
+        """
+        now = self.clock()
+        start = self._rep_sample_start or now
+        self.completed_reps.append({
+            "timestamp": now,
+            "rep_index": self.counter,
+            "side": side,
+            "duration": now - start,
+            "form_score": self.current_form_score,
+            "angle_min": dict(self._rep_angle_min),
+            "angle_max": dict(self._rep_angle_max),
+            "feedback": sorted(self._rep_feedback),
+        })
+        self._reset_rep_sample()
+    
+    def drain_completed_reps(self) -> List[Dict[str, Any]]:
+        """Biriken rep telemetrisini döndür ve listeyi boşalt."""
+        reps = self.completed_reps
+        self.completed_reps = []
+        return reps
+    
     def get_form_score_grade(self, score: int = None) -> str:
         """Form score'dan harf notu al."""
         if score is None:
@@ -448,6 +510,8 @@ class BaseExercise:
         self.current_form_score = 100
         self.avg_form_score = 100
         self.active_feedback_count = 0
+        self.completed_reps = []
+        self._reset_rep_sample()
     
     def get_status(self) -> Dict[str, Any]:
         """Mevcut durumu döndür."""
@@ -618,7 +682,7 @@ class BilateralExercise(BaseExercise):
     def update_bilateral_counter(self) -> Tuple[bool, bool]:
         """Her iki taraf için sayacı güncelle."""
         trigger_state = self.counter_rule.get("trigger_state")
-        current_time = time.time()
+        current_time = self.clock()
         
         left_counted = False
         right_counted = False
@@ -688,10 +752,10 @@ class DurationExercise(BaseExercise):
         
         if self.current_state == self.hold_state:
             if not self.is_holding:
-                self.hold_start_time = time.time()
+                self.hold_start_time = self.clock()
                 self.is_holding = True
             else:
-                self.current_duration = time.time() - self.hold_start_time
+                self.current_duration = self.clock() - self.hold_start_time
         else:
             self.is_holding = False
             # Süre hedefine ulaşıldıysa sayacı artır
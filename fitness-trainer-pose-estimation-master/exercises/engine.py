@@ -5,13 +5,29 @@ Bu modül, BaseExercise sınıfını frame işleme döngüsünde
 kolayca kullanılabilir hale getirir.
 """
 
+import itertools
+
 import cv2
 import numpy as np
-from typing import Dict, Optional, Tuple, List, Any
+from typing import Dict, NamedTuple, Optional, Tuple, List, Any
 
 from exercises.base_exercise import BaseExercise, BilateralExercise, DurationExercise
 from exercises.loader import load_exercise, get_exercise_info, get_available_exercises
 from utils.draw_text_with_background import draw_text_with_background
+from utils.metrics import NULL_STAGES
+
+
+class StatusSnapshot(NamedTuple):
+    """
+    Yayınlanmış durumun değişmez kopyası.
+    
+    Yayınlandıktan sonra hiçbir alanı değiştirilmez; okuyucular kilit
+    almadan tutarlı bir görüntü alır.
+    """
+    version: int
+    counter: int
+    status: Dict[str, Any]
+    session: Dict[str, Any]
 
 
 class ExerciseEngine:
@@ -26,10 +42,25 @@ class ExerciseEngine:
         result = engine.process_frame(frame, landmarks)
     """
     
-    def __init__(self):
+    def __init__(self, clock=None, stages=None):
+        """
+        Args:
+            clock: Zaman kaynağı (varsayılan time.time); kayıt tekrarında
+                   kaydedilmiş zaman damgalarını döndüren bir fonksiyon verilir
+            stages: Aşama süreleri için StageMetrics (utils/metrics.py);
+                    verilmezse süre ölçülmez
+        """
+        self.clock = clock
+        self.stages = stages or NULL_STAGES
         self.exercise: Optional[BaseExercise] = None
         self.exercise_name: str = None
         self._exercise_info: Dict = {}
+        # reset() sonrası kaybolmaması için bekleyen rep telemetrisi
+        self._pending_reps: List[Dict[str, Any]] = []
+        # Frame döngüsü her frame sonunda yeni bir snapshot yayınlar; istek
+        # thread'leri sadece referansı okur (atama GIL altında atomik)
+        self._versions = itertools.count(1)
+        self._snapshot = StatusSnapshot(0, 0, {}, {})
         
     def set_exercise(self, exercise_name: str) -> bool:
         """
@@ -43,17 +74,36 @@ class ExerciseEngine:
         """
         try:
             self.exercise = load_exercise(exercise_name)
+            if self.clock is not None:
+                self.exercise.clock = self.clock
             self.exercise_name = exercise_name
+            self._pending_reps = []
             self._exercise_info = get_exercise_info(exercise_name)
+            self.publish_status()
             return True
         except Exception as e:
             print(f"Failed to load exercise '{exercise_name}': {e}")
             return False
     
     def reset(self):
-        """Mevcut egzersizi sıfırla."""
+        """Mevcut egzersizi sıfırla (rep telemetrisi drain_rep_telemetry için saklanır)."""
         if self.exercise:
+            self._pending_reps.extend(self.exercise.drain_completed_reps())
             self.exercise.reset()
+            self.publish_status()
+    
+    def drain_rep_telemetry(self) -> List[Dict[str, Any]]:
+        """
+        Son çağrıdan bu yana tamamlanan rep'lerin telemetrisini al.
+        
+        Returns:
+            Her rep için süre, form skoru, açı uç değerleri ve feedback'ler
+        """
+        reps = self._pending_reps
+        self._pending_reps = []
+        if self.exercise:
+            reps.extend(self.exercise.drain_completed_reps())
+        return reps
     
     def process_frame(self, frame: np.ndarray, landmarks) -> Dict[str, Any]:
         """
@@ -63,14 +113,40 @@ class ExerciseEngine:
             frame: OpenCV frame (BGR)
             landmarks: MediaPipe pose landmarks
             
+        Returns:
+            İşlem sonuçları dict'i
+        """
+        result = self.process_landmarks(landmarks, frame.shape[:2])
+        if not result["success"]:
+            return result
+        
+        try:
+            # Görselleştirme
+            with self.stages.time("overlay"):
+                self._draw_visualization(frame, landmarks, frame.shape[:2])
+                self._draw_feedback(frame, result["feedback"])
+        except Exception as e:
+            result["success"] = False
+            result["error"] = str(e)
+            print(f"Exercise processing error: {e}")
+        
+        return result
+    
+    def process_landmarks(self, landmarks, frame_shape: Tuple[int, int]) -> Dict[str, Any]:
+        """
+        Landmark'ları çizim yapmadan işle (ör. tarayıcıda hesaplanmış pose).
+        
+        Args:
+            landmarks: x, y, z, visibility alanları olan landmark listesi
+            frame_shape: Landmark'ların ait olduğu frame boyutu (height, width)
+            
         Returns:
             İşlem sonuçları dict'i
         """
         if not self.exercise or not landmarks:
             return {"success": False, "error": "No exercise or landmarks"}
         
-        frame_shape = frame.shape[:2]  # (height, width)
-        
+        frame = None
         result = {
             "success": True,
             "exercise_name": self.exercise_name,
@@ -94,45 +170,47 @@ class ExerciseEngine:
             else:
                 result = self._process_standard(frame, landmarks, frame_shape, result)
             
-            # Görselleştirme
-            self._draw_visualization(frame, landmarks, frame_shape)
-            self._draw_feedback(frame, result["feedback"])
-            
         except Exception as e:
             result["success"] = False
             result["error"] = str(e)
             print(f"Exercise processing error: {e}")
         
+        self.publish_status()
         return result
     
     def _process_standard(self, frame, landmarks, frame_shape, result):
         """Standart tekrar bazlı egzersiz işleme."""
         # Tüm açıları hesapla
-        self.exercise.compute_all_angles(landmarks, frame_shape)
-        
-        # Context oluştur
-        context = self.exercise.get_context(landmarks, frame_shape)
-        
-        # State güncelle
-        prev_state = self.exercise.current_state
-        self.exercise.update_state(context)
-        
-        # Rep tracking başlat (descent başladığında)
-        if prev_state == "start" and self.exercise.current_state == "descent":
-            self.exercise.start_rep_tracking()
-        
-        # Sayacı güncelle
-        counted = self.exercise.update_counter()
+        with self.stages.time("compute_angles"):
+            self.exercise.compute_all_angles(landmarks, frame_shape)
+            
+            # Context oluştur
+            context = self.exercise.get_context(landmarks, frame_shape)
         
-        # Feedback kontrol
-        feedback = self.exercise.check_feedback(context)
+        with self.stages.time("fsm_update"):
+            # State güncelle
+            prev_state = self.exercise.current_state
+            self.exercise.update_state(context)
+            
+            # Rep tracking başlat (descent başladığında)
+            if prev_state == "start" and self.exercise.current_state == "descent":
+                self.exercise.start_rep_tracking()
+            
+            # Sayacı güncelle
+            counted = self.exercise.update_counter()
         
-        # FORM SCORE hesapla
-        form_score = self.exercise.calculate_form_score(context, feedback)
+        with self.stages.time("feedback"):
+            # Feedback kontrol
+            feedback = self.exercise.check_feedback(context)
+            
+            # FORM SCORE hesapla
+            form_score = self.exercise.calculate_form_score(context, feedback)
+            self.exercise.record_rep_sample(feedback)
         
         # Rep tamamlandıysa tracking bitir
         if counted:
             self.exercise.end_rep_tracking()
+            self.exercise.finish_rep_sample()
         
         # Sonuçları doldur
         result.update({
@@ -153,23 +231,32 @@ class ExerciseEngine:
         exercise: BilateralExercise = self.exercise
         
         # Her iki taraf için açıları hesapla
-        exercise.compute_bilateral_angles(landmarks, frame_shape)
-        
-        # Context oluştur
-        context = exercise.get_context(landmarks, frame_shape)
-        context["left_angle"] = exercise._computed_angles.get("left_angle", 0)
-        context["right_angle"] = exercise._computed_angles.get("right_angle", 0)
-        
-        # Her iki taraf için state güncelle
-        exercise.update_bilateral_state(context)
-        
-        # Sayaçları güncelle
-        left_counted, right_counted = exercise.update_bilateral_counter()
-        
-        # Feedback kontrol
-        context["counter_left"] = exercise.counter_left
-        context["counter_right"] = exercise.counter_right
-        feedback = exercise.check_feedback(context)
+        with self.stages.time("compute_angles"):
+            exercise.compute_bilateral_angles(landmarks, frame_shape)
+            
+            # Context oluştur
+            context = exercise.get_context(landmarks, frame_shape)
+            context["left_angle"] = exercise._computed_angles.get("left_angle", 0)
+            context["right_angle"] = exercise._computed_angles.get("right_angle", 0)
+        
+        with self.stages.time("fsm_update"):
+            # Her iki taraf için state güncelle
+            exercise.update_bilateral_state(context)
+            
+            # Sayaçları güncelle
+            left_counted, right_counted = exercise.update_bilateral_counter()
+        
+        with self.stages.time("feedback"):
+            # Feedback kontrol
+            context["counter_left"] = exercise.counter_left
+            context["counter_right"] = exercise.counter_right
+            feedback = exercise.check_feedback(context)
+            
+            exercise.record_rep_sample(feedback)
+        if left_counted:
+            exercise.finish_rep_sample("left")
+        if right_counted:
+            exercise.finish_rep_sample("right")
         
         # Sonuçları doldur
         result.update({
@@ -190,16 +277,19 @@ class ExerciseEngine:
         exercise: DurationExercise = self.exercise
         
         # Açıları hesapla
-        exercise.compute_all_angles(landmarks, frame_shape)
-        
-        # Context oluştur
-        context = exercise.get_context(landmarks, frame_shape)
+        with self.stages.time("compute_angles"):
+            exercise.compute_all_angles(landmarks, frame_shape)
+            
+            # Context oluştur
+            context = exercise.get_context(landmarks, frame_shape)
         
         # Süreyi güncelle (bu aynı zamanda state'i de günceller)
-        current_duration = exercise.update_duration(context)
+        with self.stages.time("fsm_update"):
+            current_duration = exercise.update_duration(context)
         
         # Feedback kontrol
-        feedback = exercise.check_feedback(context)
+        with self.stages.time("feedback"):
+            feedback = exercise.check_feedback(context)
         
         # Sonuçları doldur
         result.update({
@@ -428,6 +518,38 @@ class ExerciseEngine:
             return self.exercise.get_status()
         return {}
     
+    def publish_status(self, session: Optional[Dict[str, Any]] = None):
+        """
+        Mevcut durumun yeni bir snapshot'ını yayınla.
+        
+        Versiyon sadece sayaç, durum veya oturum son snapshot'tan farklıysa
+        artar; böylece ?since= ile soran istemciler değişiklik yokken 204 alır.
+        
+        Args:
+            session: Egzersiz dışındaki oturum alanları (set, hedef vs);
+                     verilmezse son yayınlanan değerler korunur
+        """
+        last = self._snapshot
+        session = last.session if session is None else dict(session)
+        counter = self.get_counter()
+        status = self.get_status()
+        if (counter, status, session) == (last.counter, last.status, last.session):
+            return
+        self._snapshot = StatusSnapshot(
+            version=next(self._versions),
+            counter=counter,
+            status=status,
+            session=session
+        )
+    
+    def get_snapshot(self) -> StatusSnapshot:
+        """
+        Son yayınlanan snapshot'ı al (herhangi bir thread'den, kilitsiz).
+        
+        Dönen snapshot ve içindeki dict'ler değiştirilmemelidir.
+        """
+        return self._snapshot
+    
     @staticmethod
     def list_exercises() -> List[str]:
         """Mevcut egzersizleri listele."""
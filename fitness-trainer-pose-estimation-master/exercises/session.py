@@ -0,0 +1,181 @@
+"""
+Exercise Session - Tek bir kullanıcının antrenman oturumu.
+
+Sunucu kamerasından bağımsız çalışan oturumlar için (ör. pose tespitini
+tarayıcıda yapan istemciler) her kullanıcıya ayrı bir ExerciseEngine,
+set/tekrar hedefleri ve set geçiş mantığı sağlar. Sunucu yalnızca FSM
+işlemlerini yapar; görüntü işleme istemcide kalır.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from exercises.engine import ExerciseEngine
+from pose_estimation.landmarks import landmarks_from_array
+
+
+class ExerciseSession:
+    """
+    Landmark akışıyla beslenen antrenman oturumu.
+
+    Kullanım:
+        session = ExerciseSession("squat", sets_goal=3, rep_goal=10)
+        status = session.process_landmarks(landmarks, (720, 1280), timestamp)
+    """
+
+    def __init__(self, exercise_name: str, sets_goal: int, rep_goal: int):
+        """
+        Args:
+            exercise_name: Egzersiz adı (örn: "squat")
+            sets_goal: Hedef set sayısı
+            rep_goal: Set başına hedef tekrar
+
+        Raises:
+            ValueError: Egzersiz yüklenemezse
+        """
+        self.exercise_name = exercise_name
+        self.sets_goal = sets_goal
+        self.rep_goal = rep_goal
+        self.sets_completed = 0
+        self.running = True
+
+        self.started_at = time.time()
+        self.last_seen = self.started_at
+        self.frames = 0
+
+        # İstemci zaman damgaları sunucu saatine bu fark ile taşınır
+        self._clock_offset: Optional[float] = None
+        self._now = self.started_at
+        self.lock = threading.Lock()
+
+        self.engine = ExerciseEngine(clock=self._clock)
+        if not self.engine.set_exercise(exercise_name):
+            raise ValueError(f"Failed to load exercise: {exercise_name}")
+
+    def _clock(self) -> float:
+        return self._now
+
+    def __getstate__(self):
+        # Çok worker'lı kurulumda oturum paylaşılan depoda pickle ile saklanır
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def _advance_clock(self, timestamp: Optional[float]):
+        now = time.time()
+        self.last_seen = now
+        if timestamp is None:
+            self._now = now
+            return
+        if self._clock_offset is None:
+            self._clock_offset = now - timestamp
+        # Zaman geri gitmez (sıra dışı gelen frame'ler)
+        self._now = max(self._now, timestamp + self._clock_offset)
+
+    def process_landmarks(self, landmarks, frame_shape: Tuple[int, int],
+                          timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Bir frame'in landmark'larını işle ve güncel durumu döndür.
+
+        Args:
+            landmarks: Landmark listesi (kişi bulunamadıysa None)
+            frame_shape: İstemcideki video boyutu (height, width)
+            timestamp: İstemcinin yakalama zamanı (saniye), rep süreleri için
+
+        Returns:
+            get_status() çıktısı ve bu frame'in feedback/counted bilgisi
+        """
+        with self.lock:
+            self._advance_clock(timestamp)
+            self.frames += 1
+
+            result = None
+            if self.running and landmarks:
+                result = self.engine.process_landmarks(landmarks, frame_shape)
+                if result["success"] and self.engine.get_counter() >= self.rep_goal:
+                    self.sets_completed += 1
+                    self.engine.reset()
+                    if self.sets_completed >= self.sets_goal:
+                        self.running = False
+
+            status = self._status_locked()
+            if result and result["success"]:
+                status["counted"] = result["counted"]
+                status["feedback"] = [fb["message"] for fb in result["feedback"]]
+            return status
+
+    def process_batch(self, batch) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Binary wire protocol batch'ini sırayla işle.
+
+        Args:
+            batch: pose_estimation.wire_protocol.LandmarkBatch
+
+        Returns:
+            (frame başına kısa sonuçlar, son frame'den sonraki durum)
+        """
+        present = batch.present
+        results = []
+        status = None
+        for i in range(len(batch)):
+            landmarks = landmarks_from_array(batch.landmarks(i)) if present[i] else None
+            status = self.process_landmarks(landmarks, batch.frame_shape, float(batch.timestamps[i]))
+            results.append({
+                'counter': status['current_reps'],
+                'set': status['current_set'],
+                'state': status['state'],
+                'counted': status.get('counted', False),
+                'form_score': status['form_score'],
+                'feedback': status.get('feedback', []),
+            })
+        return results, status or self.get_status()
+
+    def get_status(self) -> Dict[str, Any]:
+        """/get_status ile aynı alanlarda oturum durumu."""
+        with self.lock:
+            return self._status_locked()
+
+    def _status_locked(self) -> Dict[str, Any]:
+        ex_status = self.engine.get_status()
+        status = {
+            'exercise': self.exercise_name,
+            'exercise_running': self.running,
+            'current_reps': ex_status.get('counter', 0),
+            'current_set': min(self.sets_completed + 1, self.sets_goal) if self.running else self.sets_completed,
+            'sets_completed': self.sets_completed,
+            'total_sets': self.sets_goal,
+            'rep_goal': self.rep_goal,
+            'state': ex_status.get('current_state'),
+            'form_score': ex_status.get('form_score', 100),
+            'avg_form_score': ex_status.get('avg_form_score', 100),
+            'form_grade': ex_status.get('form_grade', 'A'),
+        }
+        if 'counter_left' in ex_status:
+            status['counter_left'] = ex_status['counter_left']
+            status['counter_right'] = ex_status['counter_right']
+        return status
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Oturumu kapat ve antrenman kaydı için özet döndür.
+
+        Returns:
+            sets, duration_seconds, form_score ve rep telemetrisi
+        """
+        with self.lock:
+            self.running = False
+            current_reps = self.engine.get_counter()
+            exercise = self.engine.exercise
+            return {
+                'exercise_type': self.exercise_name,
+                'sets': self.sets_completed + (1 if current_reps > 0 else 0),
+                'reps': self.rep_goal,
+                'duration_seconds': int(self.last_seen - self.started_at),
+                'form_score': exercise.avg_form_score if exercise else None,
+                'rep_telemetry': self.engine.drain_rep_telemetry(),
+            }
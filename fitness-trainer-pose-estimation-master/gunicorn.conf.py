@@ -0,0 +1,23 @@
+"""
+Multi-worker deployment: gunicorn -c gunicorn.conf.py app:app
+
+Each worker imports app.py on its own (no preload), so every worker has its
+own camera handle, pose models and SQLite connections. SHARED_STATE=1 makes
+the workers keep session and job state in data/shared_state.db (see
+db/state_store.py): the worker that claims the camera runs the live session
+and the others forward commands to it and relay its frames and status.
+"""
+
+import multiprocessing
+import os
+
+os.environ.setdefault('SHARED_STATE', '1')
+
+bind = os.environ.get('BIND', '127.0.0.1:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+
+# Threads per worker: MJPEG streams and event streams each hold one open request
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = 120
+preload_app = False
@@ -1,37 +1,227 @@
+import logging
+import threading
+import time
+
 import cv2
 import mediapipe as mp
+import numpy as np
+
+from pose_estimation.roi_tracker import PersonRoiTracker
+from pose_estimation.model_selection import (
+    MODEL_NAMES, LatencyGovernor, get_host_benchmark, load_host_benchmark, select_complexity
+)
+
+logger = logging.getLogger(__name__)
+
+# MediaPipe Pose downsizes to 256x256 internally, so feeding it more than a
+# few hundred pixels only costs colour conversion and copying.
+DEFAULT_INFERENCE_WIDTH = 640
+
 
 class PoseEstimator:
-    def __init__(self, static_mode=False, model_complexity=1):
+    def __init__(self, static_mode=False, model_complexity=1, inference_width=DEFAULT_INFERENCE_WIDTH,
+                 track_roi=False, latency_budget_ms=None, benchmark_frames=None, benchmark_cache=None):
         """
         Initialize PoseEstimator
         
         Args:
             static_mode: True for image/video analysis (less memory), False for real-time
-            model_complexity: 0=Lite, 1=Full, 2=Heavy (0 uses least memory)
+            model_complexity: 0=Lite, 1=Full, 2=Heavy (0 uses least memory), or "auto"
+                to pick one from latency_budget_ms and switch at runtime on drift
+            inference_width: Frames wider than this are downscaled before inference
+                (None or 0 = use the source resolution)
+            track_roi: Run inference on a padded crop around the person found in
+                the previous frame, falling back to the full frame on loss
+            latency_budget_ms: Target per-frame inference latency for "auto"
+            benchmark_frames: Sample BGR frames (ideally with a person) used to
+                benchmark the models on this host for "auto". Without a fresh
+                cached benchmark this runs on a background thread; the Full
+                model serves frames until it finishes.
+            benchmark_cache: JSON file where host benchmarks are shared between processes
         """
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=static_mode,
+        self.mp_drawing = mp.solutions.drawing_utils
+        self.static_mode = static_mode
+        self.inference_width = inference_width
+        
+        self.governor = None
+        self._benchmark_thread = None
+        self._benchmark_latencies = None
+        if model_complexity == "auto":
+            budget = latency_budget_ms or 40.0
+            latencies = load_host_benchmark(benchmark_cache, inference_width) if benchmark_cache else None
+            if latencies:
+                model_complexity, reason = select_complexity(latencies, budget), "benchmark"
+            elif benchmark_frames:
+                model_complexity, reason = 1, "default (benchmark running)"
+                self._start_benchmark(benchmark_frames, inference_width, benchmark_cache)
+            else:
+                model_complexity, reason = 1, "default (no benchmark frames)"
+            self.governor = LatencyGovernor(budget, model_complexity, latencies)
+            self.governor.record_choice(model_complexity, reason)
+        
+        self.model_complexity = int(model_complexity)
+        self.pose = self._create_pose(self.model_complexity)
+        self.last_latency_ms = None
+        
+        # Reused between frames so per-frame cost does not allocate
+        self._resized_buffer = None
+        self._rgb_buffer = None
+        
+        self.roi_tracker = PersonRoiTracker() if track_roi and not static_mode else None
+        self.roi_stats = {'roi_frames': 0, 'full_frames': 0, 'roi_misses': 0}
+    
+    def _create_pose(self, model_complexity):
+        return self.mp_pose.Pose(
+            static_image_mode=self.static_mode,
             model_complexity=model_complexity,
             enable_segmentation=False,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        self.mp_drawing = mp.solutions.drawing_utils
-    
+
+    def _start_benchmark(self, frames, inference_width, cache_path):
+        """Measure the models on a background thread so the first frames are not held up"""
+        def run():
+            try:
+                self._benchmark_latencies = get_host_benchmark(frames, inference_width, cache_path)
+            except Exception as e:
+                logger.error(f"Pose model benchmark failed: {e}")
+
+        self._benchmark_thread = threading.Thread(target=run, name='pose-benchmark', daemon=True)
+        self._benchmark_thread.start()
+
+    def _apply_benchmark(self):
+        """Switch to the benchmarked model (on the thread that runs inference)"""
+        self._benchmark_thread = None
+        latencies = self._benchmark_latencies
+        if not latencies:
+            return
+        self.governor.host_latencies = latencies
+        complexity = select_complexity(latencies, self.governor.budget_ms)
+        if complexity == self.model_complexity:
+            self.governor.record_choice(complexity, "benchmark")
+        else:
+            self.set_model_complexity(complexity, "benchmark")
+
+    def set_model_complexity(self, model_complexity, reason="manual"):
+        """Swap the MediaPipe graph for another model (tracking restarts)"""
+        if model_complexity == self.model_complexity:
+            return
+        old_pose = self.pose
+        self.pose = self._create_pose(model_complexity)
+        self.model_complexity = model_complexity
+        if old_pose:
+            old_pose.close()
+        if self.roi_tracker:
+            self.roi_tracker.reset()
+        if self.governor:
+            self.governor.record_choice(model_complexity, reason)
+
+    def get_model_info(self):
+        """Current model choice and measured latency, for status reporting"""
+        info = {
+            'model_complexity': self.model_complexity,
+            'model': MODEL_NAMES.get(self.model_complexity),
+            'auto': self.governor is not None,
+            'latency_ms': round(self.last_latency_ms, 2) if self.last_latency_ms is not None else None,
+        }
+        if self.governor:
+            info['budget_ms'] = self.governor.budget_ms
+            info['avg_latency_ms'] = round(self.governor.ewma_ms, 2) if self.governor.ewma_ms is not None else None
+            info['host_latencies_ms'] = {MODEL_NAMES[c]: ms for c, ms in self.governor.host_latencies.items()}
+            info['history'] = list(self.governor.history)
+        return info
+
     def close(self):
         """Release resources"""
         if self.pose:
             self.pose.close()
             self.pose = None
 
-    def estimate_pose(self, frame, exercise_type):
-        # BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def get_inference_size(self, frame_shape):
+        """(width, height) the model is fed for a frame of the given shape"""
+        h, w = frame_shape[:2]
+        if not self.inference_width or w <= self.inference_width:
+            return w, h
+        return self.inference_width, max(1, round(h * self.inference_width / w))
 
-        # Pose estimate
-        results = self.pose.process(rgb_frame)
+    def prepare_input(self, frame):
+        """
+        Downscale a BGR frame to the inference size and convert it to RGB.
+        
+        Resizing happens first so the colour conversion only touches the
+        small image; both steps write into preallocated buffers.
+        """
+        h, w = frame.shape[:2]
+        target_w, target_h = self.get_inference_size(frame.shape)
+        shape = (target_h, target_w, 3)
+        
+        if self._rgb_buffer is None or self._rgb_buffer.shape != shape:
+            self._rgb_buffer = np.empty(shape, dtype=np.uint8)
+            self._resized_buffer = np.empty(shape, dtype=np.uint8)
+        
+        if (target_w, target_h) != (w, h):
+            cv2.resize(frame, (target_w, target_h), dst=self._resized_buffer,
+                       interpolation=cv2.INTER_AREA)
+            source = self._resized_buffer
+        else:
+            source = frame
+        
+        cv2.cvtColor(source, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+        return self._rgb_buffer
+
+    def process(self, frame):
+        """
+        Run pose inference on a BGR frame without drawing anything.
+        
+        Landmarks are normalized to [0, 1] of the full frame and the aspect
+        ratio is preserved when downscaling, so they map directly onto the
+        display frame (x * frame_width, y * frame_height).
+        """
+        if self._benchmark_thread is not None and not self._benchmark_thread.is_alive():
+            self._apply_benchmark()
+        start = time.perf_counter()
+        results = self._process(frame)
+        self.last_latency_ms = (time.perf_counter() - start) * 1000
+        
+        if self.governor:
+            new_complexity = self.governor.observe(self.last_latency_ms)
+            if new_complexity is not None:
+                reason = "latency drift" if new_complexity < self.model_complexity else "latency headroom"
+                self.set_model_complexity(new_complexity, reason)
+        return results
+
+    def _process(self, frame):
+        if self.roi_tracker is None:
+            return self.pose.process(self.prepare_input(frame))
+        
+        results = None
+        rect = self.roi_tracker.crop_rect(frame.shape)
+        if rect is not None:
+            x0, y0, x1, y1 = rect
+            results = self.pose.process(self.prepare_input(frame[y0:y1, x0:x1]))
+            if results.pose_landmarks:
+                self.roi_tracker.map_to_frame(results.pose_landmarks.landmark, rect, frame.shape)
+                self.roi_stats['roi_frames'] += 1
+            else:
+                # Lost the person inside the crop - search the whole frame
+                self.roi_stats['roi_misses'] += 1
+                results = None
+        
+        if results is None:
+            results = self.pose.process(self.prepare_input(frame))
+            self.roi_stats['full_frames'] += 1
+        
+        if results.pose_landmarks:
+            self.roi_tracker.update(results.pose_landmarks.landmark)
+        else:
+            self.roi_tracker.reset()
+        return results
+
+    def estimate_pose(self, frame, exercise_type):
+        # Pose estimate at inference resolution
+        results = self.process(frame)
 
         # Draw landmarks and specific connections based on exercise type
         if results.pose_landmarks:
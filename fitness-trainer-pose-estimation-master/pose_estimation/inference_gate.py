@@ -0,0 +1,100 @@
+"""
+Motion- and presence-gated pose inference for the live loop.
+
+A tiny grayscale thumbnail of each frame is compared with the thumbnail of
+the last frame that went through MediaPipe. While nothing moves, inference
+is skipped and the caller reuses the previous landmarks (a plank or wall
+sit keeps its skeleton, timer and feedback). While nobody is in view,
+detection attempts back off exponentially (1, 2, 4, ... frames) until
+motion shows up again, so idle periods cost little more than capture.
+"""
+
+import cv2
+import numpy as np
+
+
+class InferenceGate:
+    def __init__(self, thumb_size=(64, 36), pixel_threshold=15, motion_ratio=0.005,
+                 max_static_frames=15, max_backoff_frames=32):
+        """
+        Args:
+            thumb_size: (width, height) of the motion thumbnail
+            pixel_threshold: Gray-level change that counts a thumbnail pixel as moved
+            motion_ratio: Fraction of moved pixels that counts as motion
+            max_static_frames: Re-run inference at least this often while a person is present
+            max_backoff_frames: Upper bound for the no-person detection backoff
+        """
+        self.thumb_size = thumb_size
+        self.pixel_threshold = pixel_threshold
+        self.motion_ratio = motion_ratio
+        self.max_static_frames = max_static_frames
+        self.max_backoff_frames = max_backoff_frames
+
+        self._thumb = np.empty((thumb_size[1], thumb_size[0], 3), dtype=np.uint8)
+        self._gray = np.empty((thumb_size[1], thumb_size[0]), dtype=np.uint8)
+        self._diff = np.empty_like(self._gray)
+        self.reset()
+
+    def reset(self):
+        self._reference = None
+        self._person_present = False
+        self._frames_since_inference = 0
+        self._backoff = 1
+        self.processed_frames = 0
+        self.gated_static_frames = 0
+        self.gated_absent_frames = 0
+
+    def _has_motion(self):
+        if self._reference is None:
+            return True
+        cv2.absdiff(self._gray, self._reference, dst=self._diff)
+        moved = np.count_nonzero(self._diff > self.pixel_threshold)
+        return moved > self.motion_ratio * self._diff.size
+
+    def should_infer(self, frame) -> bool:
+        """Decide whether this frame needs pose inference."""
+        cv2.resize(frame, self.thumb_size, dst=self._thumb, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._thumb, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        motion = self._has_motion()
+        self._frames_since_inference += 1
+
+        if self._person_present:
+            infer = motion or self._frames_since_inference >= self.max_static_frames
+        else:
+            # Motion may be someone walking in - try right away
+            infer = motion or self._frames_since_inference >= self._backoff
+
+        if infer:
+            self.processed_frames += 1
+        elif self._person_present:
+            self.gated_static_frames += 1
+        else:
+            self.gated_absent_frames += 1
+        return infer
+
+    def record_result(self, person_found: bool):
+        """Report the outcome of an inference that should_infer allowed."""
+        if self._reference is None:
+            self._reference = self._gray.copy()
+        else:
+            self._reference[...] = self._gray
+        self._frames_since_inference = 0
+        self._person_present = person_found
+
+        if person_found:
+            self._backoff = 1
+        else:
+            self._backoff = min(self._backoff * 2, self.max_backoff_frames)
+
+    def get_stats(self):
+        gated = self.gated_static_frames + self.gated_absent_frames
+        total = gated + self.processed_frames
+        return {
+            'processed_frames': self.processed_frames,
+            'gated_frames': gated,
+            'gated_static_frames': self.gated_static_frames,
+            'gated_absent_frames': self.gated_absent_frames,
+            'gated_ratio': round(gated / total, 3) if total else 0.0,
+            'person_present': self._person_present,
+        }
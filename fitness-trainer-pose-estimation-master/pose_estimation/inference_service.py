@@ -0,0 +1,209 @@
+"""
+Shared pose inference for many concurrent sessions.
+
+Callers (live camera loops, later more cameras or sessions) submit frames
+and get a Future back. Frames are handled by a pool of worker threads
+sized to the CPU count. MediaPipe releases the GIL while the graph runs,
+so throughput scales with cores instead of queueing behind one graph.
+
+MediaPipe's Pose graph takes one image per call and, in video mode, keeps
+tracking state per stream. Each session is therefore pinned to one worker
+(the least loaded one when it opens), and that worker owns the session's
+estimator. There is no cross-session batching: every frame is its own graph
+run. A worker takes whatever frames are pending as soon as it is free and
+serves up to max_round sessions in round-robin order, so a busy session
+can't starve the others on the same worker. Only the newest frame per
+session is kept. A frame that is replaced before it runs has its Future
+cancelled, so a slow session can't build up a backlog and tail latency
+stays bounded.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+
+class _Request:
+    __slots__ = ("session_id", "frame", "exercise_name", "future", "submitted_at")
+
+    def __init__(self, session_id, frame, exercise_name):
+        self.session_id = session_id
+        self.frame = frame
+        self.exercise_name = exercise_name
+        self.future = Future()
+        self.submitted_at = time.perf_counter()
+
+
+class _Worker(threading.Thread):
+    def __init__(self, index: int, estimator_factory: Callable, max_round: int):
+        super().__init__(name=f"pose-worker-{index}", daemon=True)
+        self.estimator_factory = estimator_factory
+        self.max_round = max_round
+
+        self.cond = threading.Condition()
+        self.pending: "OrderedDict[str, _Request]" = OrderedDict()
+        self.sessions = set()
+        self.estimators: Dict[str, object] = {}
+        self._closing = set()
+        self._stopping = False
+
+        self.frames = 0
+        self.rounds = 0
+        self.dropped_frames = 0
+        self.queue_ms_max = 0.0
+
+    def submit(self, request: _Request):
+        with self.cond:
+            previous = self.pending.pop(request.session_id, None)
+            if previous is not None and previous.future.cancel():
+                self.dropped_frames += 1
+            # Re-inserted at the end: sessions are served in round-robin order
+            self.pending[request.session_id] = request
+            self.cond.notify()
+
+    def close_session(self, session_id: str):
+        with self.cond:
+            self.sessions.discard(session_id)
+            request = self.pending.pop(session_id, None)
+            if request is not None:
+                request.future.cancel()
+            self._closing.add(session_id)
+            self.cond.notify()
+
+    def stop(self):
+        with self.cond:
+            self._stopping = True
+            self.cond.notify()
+
+    def _next_round(self):
+        with self.cond:
+            while not self.pending and not self._closing and not self._stopping:
+                self.cond.wait()
+
+            requests = [self.pending.pop(sid) for sid in list(self.pending)[:self.max_round]]
+            closing, self._closing = self._closing, set()
+            return requests, closing
+
+    def run(self):
+        while True:
+            requests, closing = self._next_round()
+
+            for session_id in closing:
+                estimator = self.estimators.pop(session_id, None)
+                if estimator is not None:
+                    estimator.close()
+
+            if not requests:
+                if self._stopping:
+                    break
+                continue
+
+            self.rounds += 1
+            now = time.perf_counter()
+            for request in requests:
+                if not request.future.set_running_or_notify_cancel():
+                    continue
+                self.queue_ms_max = max(self.queue_ms_max, (now - request.submitted_at) * 1000)
+                try:
+                    estimator = self.estimators.get(request.session_id)
+                    if estimator is None:
+                        estimator = self.estimator_factory(request.session_id, request.frame)
+                        self.estimators[request.session_id] = estimator
+                    result = estimator.estimate_pose(request.frame, request.exercise_name)
+                    self.frames += 1
+                    request.future.set_result(result)
+                except Exception as e:
+                    request.future.set_exception(e)
+
+        for estimator in self.estimators.values():
+            estimator.close()
+        self.estimators.clear()
+
+
+class PoseInferenceService:
+    def __init__(self, estimator_factory: Callable, num_workers: Optional[int] = None,
+                 max_round: int = 8):
+        """
+        Args:
+            estimator_factory: (session_id, first_frame) -> object with estimate_pose(frame, exercise)
+                               and close(); called on the worker the session is pinned to
+            num_workers: Worker threads, defaults to the CPU count
+            max_round: Sessions served per round-robin round on one worker
+        """
+        num_workers = max(1, num_workers or os.cpu_count() or 1)
+        self._lock = threading.Lock()
+        self._assignment: Dict[str, _Worker] = {}
+        self._workers = [_Worker(i, estimator_factory, max_round)
+                         for i in range(num_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def open_session(self, session_id: str):
+        """Pin a session to the worker with the fewest sessions"""
+        with self._lock:
+            worker = self._assignment.get(session_id)
+            if worker is None:
+                worker = min(self._workers, key=lambda w: len(w.sessions))
+                with worker.cond:
+                    worker.sessions.add(session_id)
+                self._assignment[session_id] = worker
+            return worker
+
+    def close_session(self, session_id: str):
+        """Drop the session's pending frame and release its estimator"""
+        with self._lock:
+            worker = self._assignment.pop(session_id, None)
+        if worker is not None:
+            worker.close_session(session_id)
+
+    def submit(self, session_id: str, frame, exercise_name: str = None) -> Future:
+        """
+        Queue a frame for pose inference.
+
+        The Future resolves to the MediaPipe results (landmarks are drawn on
+        the frame like PoseEstimator.estimate_pose does). It is cancelled if
+        the same session submits a newer frame before this one runs.
+        """
+        worker = self._assignment.get(session_id) or self.open_session(session_id)
+        request = _Request(session_id, frame, exercise_name)
+        worker.submit(request)
+        return request.future
+
+    def estimate_pose(self, session_id: str, frame, exercise_name: str = None, timeout: float = None):
+        """Blocking submit for callers that handle one frame at a time"""
+        return self.submit(session_id, frame, exercise_name).result(timeout)
+
+    def get_estimator(self, session_id: str):
+        """The session's estimator once its worker has created it, else None"""
+        worker = self._assignment.get(session_id)
+        return worker.estimators.get(session_id) if worker else None
+
+    def get_model_info(self, session_id: str):
+        estimator = self.get_estimator(session_id)
+        return estimator.get_model_info() if estimator is not None else None
+
+    def get_stats(self):
+        workers = []
+        for worker in self._workers:
+            workers.append({
+                "sessions": len(worker.sessions),
+                "frames": worker.frames,
+                "rounds": worker.rounds,
+                "avg_round": round(worker.frames / worker.rounds, 2) if worker.rounds else 0.0,
+                "dropped_frames": worker.dropped_frames,
+                "queue_ms_max": round(worker.queue_ms_max, 2),
+            })
+        return {
+            "workers": len(self._workers),
+            "sessions": len(self._assignment),
+            "per_worker": workers,
+        }
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.stop()
+        for worker in self._workers:
+            worker.join()
@@ -0,0 +1,297 @@
+"""
+Compact binary recording of live landmark streams, and replay.
+
+Live sessions drop every landmark once the frame is drawn, which makes
+user-reported miscounts impossible to reproduce. LandmarkRecorder appends
+each inferred frame to an append-only log; LandmarkLogReader reads it back
+as NumPy arrays, and replay_log() feeds it through ExerciseEngine.
+
+File layout (little endian):
+
+    header   magic "PLMK", version, landmark count, frame width/height,
+             coordinate scale, keyframe interval, start time, exercise name
+    records  kind (u8), milliseconds since start (u32), payload
+
+    kind 0   no person in the frame, no payload
+    kind 1   keyframe: int16 x/y/z per landmark, uint8 visibility
+    kind 2   delta:    int8 x/y/z change against the previous frame, uint8 visibility
+
+Coordinates are quantized to int16 at COORD_SCALE steps per unit (about
+0.1 px on a 1280 px frame). Frame-to-frame motion is small, so most frames
+fit the one-byte delta form; a keyframe is forced every keyframe_interval
+frames or when a delta overflows. A 33-landmark frame takes 137 bytes as a
+delta and 236 as a keyframe, roughly 4-5 KB/s at 30 fps.
+
+Encoding and file I/O run on a background thread. record() only copies
+the landmarks into an array and enqueues it; when the queue is full the
+frame is dropped and counted instead of blocking the capture loop.
+"""
+
+import argparse
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from pose_estimation.landmarks import NUM_LANDMARKS, landmarks_from_array, landmarks_to_array
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PLMK"
+VERSION = 1
+COORD_SCALE = 8192          # int16 covers -4..4, enough for off-frame landmarks
+VISIBILITY_SCALE = 255
+
+HEADER = struct.Struct("<4sHHHHHHdH")
+RECORD = struct.Struct("<BI")
+
+KIND_EMPTY = 0
+KIND_KEYFRAME = 1
+KIND_DELTA = 2
+
+_STOP = object()
+
+
+class LandmarkRecorder:
+    def __init__(self, path: str, exercise_name: str = "", keyframe_interval: int = 30,
+                 queue_size: int = 1024, flush_interval: float = 1.0):
+        """
+        Args:
+            path: Output file, created (or truncated) by the writer thread
+            exercise_name: Stored in the header for replay
+            keyframe_interval: Force a keyframe at least this often
+            queue_size: Frames buffered for the writer before dropping
+            flush_interval: Seconds between file flushes
+        """
+        self.path = path
+        self.exercise_name = exercise_name
+        self.keyframe_interval = keyframe_interval
+        self.flush_interval = flush_interval
+
+        self.frames = 0
+        self.dropped_frames = 0
+        self.bytes_written = 0
+        self.start_time = time.time()
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="landmark-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, landmarks, frame_shape: Tuple[int, int], timestamp: float = None):
+        """
+        Queue one frame's landmarks (None when no person was detected).
+
+        Args:
+            landmarks: MediaPipe landmark list
+            frame_shape: (height, width) of the frame the landmarks belong to
+            timestamp: Capture time, defaults to now
+        """
+        array = landmarks_to_array(landmarks) if landmarks is not None else None
+        try:
+            self._queue.put_nowait((timestamp or time.time(), array, frame_shape[:2]))
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def close(self):
+        """Write out queued frames and close the file"""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def get_stats(self):
+        return {
+            "path": self.path,
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "bytes_written": self.bytes_written,
+        }
+
+    # ==================== WRITER THREAD ====================
+
+    def _run(self):
+        previous = None
+        since_keyframe = 0
+        last_flush = time.time()
+        f = None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                timestamp, array, frame_shape = item
+
+                if f is None:
+                    f = open(self.path, "wb")
+                    name = self.exercise_name.encode("utf-8")
+                    num_landmarks = len(array) if array is not None else NUM_LANDMARKS
+                    self._write(f, HEADER.pack(MAGIC, VERSION, num_landmarks, frame_shape[1],
+                                               frame_shape[0], COORD_SCALE, self.keyframe_interval,
+                                               self.start_time, len(name)) + name)
+
+                offset_ms = max(0, int((timestamp - self.start_time) * 1000))
+                if array is None:
+                    self._write(f, RECORD.pack(KIND_EMPTY, offset_ms))
+                    previous = None
+                else:
+                    coords = np.clip(np.rint(array[:, :3] * COORD_SCALE), -32768, 32767).astype(np.int16)
+                    visibility = np.clip(np.rint(array[:, 3] * VISIBILITY_SCALE), 0, 255).astype(np.uint8)
+
+                    delta = None
+                    if previous is not None and since_keyframe < self.keyframe_interval:
+                        delta = coords.astype(np.int32) - previous
+                        if np.abs(delta).max() > 127:
+                            delta = None
+
+                    if delta is None:
+                        self._write(f, RECORD.pack(KIND_KEYFRAME, offset_ms) + coords.tobytes() +
+                                    visibility.tobytes())
+                        since_keyframe = 1
+                    else:
+                        self._write(f, RECORD.pack(KIND_DELTA, offset_ms) + delta.astype(np.int8).tobytes() +
+                                    visibility.tobytes())
+                        since_keyframe += 1
+                    previous = coords.astype(np.int32)
+                self.frames += 1
+
+                if time.time() - last_flush >= self.flush_interval:
+                    f.flush()
+                    last_flush = time.time()
+        except OSError as e:
+            logger.error(f"Landmark recorder stopped: {e}")
+        finally:
+            if f is not None:
+                f.close()
+
+    def _write(self, f, data: bytes):
+        f.write(data)
+        self.bytes_written += len(data)
+
+
+class LandmarkLogReader:
+    """Reads a landmark log written by LandmarkRecorder"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._data = f.read()
+
+        if len(self._data) < HEADER.size:
+            raise ValueError(f"Not a landmark log: {path}")
+        (magic, version, self.num_landmarks, self.width, self.height, self.coord_scale,
+         self.keyframe_interval, self.start_time, name_len) = HEADER.unpack_from(self._data)
+        if magic != MAGIC:
+            raise ValueError(f"Not a landmark log: {path}")
+        if version > VERSION:
+            raise ValueError(f"Unsupported landmark log version {version}")
+
+        self._offset = HEADER.size + name_len
+        self.exercise_name = self._data[HEADER.size:self._offset].decode("utf-8")
+
+    @property
+    def frame_shape(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    def __iter__(self) -> Iterator[Tuple[float, Optional[np.ndarray]]]:
+        """Yield (timestamp, (N, 4) float32 landmarks or None) per recorded frame"""
+        data = self._data
+        n = self.num_landmarks
+        coords = None
+        offset = self._offset
+
+        while offset + RECORD.size <= len(data):
+            kind, offset_ms = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            timestamp = self.start_time + offset_ms / 1000
+
+            if kind == KIND_EMPTY:
+                coords = None
+                yield timestamp, None
+                continue
+
+            coord_bytes = n * 3 * (2 if kind == KIND_KEYFRAME else 1)
+            if offset + coord_bytes + n > len(data):
+                break  # Truncated tail of an interrupted recording
+            if kind == KIND_KEYFRAME:
+                coords = np.frombuffer(data, np.int16, n * 3, offset).reshape(n, 3).astype(np.int32)
+            elif kind == KIND_DELTA and coords is not None:
+                coords = coords + np.frombuffer(data, np.int8, n * 3, offset).reshape(n, 3)
+            else:
+                raise ValueError(f"Corrupt landmark log record at byte {offset - RECORD.size}")
+            offset += coord_bytes
+            visibility = np.frombuffer(data, np.uint8, n, offset)
+            offset += n
+
+            landmarks = np.empty((n, 4), dtype=np.float32)
+            landmarks[:, :3] = coords / self.coord_scale
+            landmarks[:, 3] = visibility / VISIBILITY_SCALE
+            yield timestamp, landmarks
+
+    def read_all(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            timestamps (F,) float64 and landmarks (F, N, 4) float32, NaN where no person was found
+        """
+        frames = list(self)
+        timestamps = np.array([t for t, _ in frames], dtype=np.float64)
+        landmarks = np.full((len(frames), self.num_landmarks, 4), np.nan, dtype=np.float32)
+        for i, (_, array) in enumerate(frames):
+            if array is not None:
+                landmarks[i] = array
+        return timestamps, landmarks
+
+
+def replay_log(path: str, exercise_name: str = None, engine=None):
+    """
+    Feed a recorded session through ExerciseEngine.
+
+    Args:
+        path: Landmark log
+        exercise_name: Exercise to count, defaults to the one stored in the log
+        engine: Existing ExerciseEngine to reuse
+
+    Returns:
+        (engine, list of per-frame process_frame results)
+    """
+    from exercises.engine import ExerciseEngine
+
+    reader = LandmarkLogReader(path)
+    # Rep duration filters and tempo run on the recorded timestamps
+    now = [reader.start_time]
+    if engine is None:
+        engine = ExerciseEngine()
+    engine.clock = lambda: now[0]
+    if not engine.set_exercise(exercise_name or reader.exercise_name):
+        raise ValueError(f"Unknown exercise: {exercise_name or reader.exercise_name}")
+
+    results = []
+    for timestamp, landmarks in reader:
+        if landmarks is None:
+            continue
+        now[0] = timestamp
+        result = engine.process_landmarks(landmarks_from_array(landmarks), reader.frame_shape)
+        result["timestamp"] = timestamp
+        results.append(result)
+    return engine, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded landmark log through ExerciseEngine")
+    parser.add_argument("path", help="Landmark log (.plmk)")
+    parser.add_argument("--exercise", help="Exercise to count (defaults to the recorded one)")
+    args = parser.parse_args()
+
+    engine, results = replay_log(args.path, args.exercise)
+    size_kb = os.path.getsize(args.path) / 1024
+    print(f"Exercise: {engine.exercise_name}")
+    print(f"Frames with landmarks: {len(results)} ({size_kb:.1f} KB)")
+    print(f"Counter: {engine.get_counter()}")
+    for result in results:
+        if result.get("counted"):
+            print(f"  rep at +{result['timestamp'] - results[0]['timestamp']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
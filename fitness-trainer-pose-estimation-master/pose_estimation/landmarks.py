@@ -0,0 +1,32 @@
+"""
+Conversions between MediaPipe landmark lists and NumPy arrays.
+
+ExerciseEngine only reads `.x`, `.y`, `.z` and `.visibility` from each
+landmark, so landmarks that were recorded, or received from elsewhere as
+plain numbers, can be replayed through it as lightweight named tuples.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+Landmark = namedtuple("Landmark", ["x", "y", "z", "visibility"])
+
+
+def landmarks_to_array(landmarks, out=None) -> np.ndarray:
+    """(N, 4) float32 array of x, y, z, visibility"""
+    if out is None:
+        out = np.empty((len(landmarks), 4), dtype=np.float32)
+    for i, lm in enumerate(landmarks):
+        out[i, 0] = lm.x
+        out[i, 1] = lm.y
+        out[i, 2] = lm.z
+        out[i, 3] = lm.visibility
+    return out
+
+
+def landmarks_from_array(array) -> list:
+    """Landmark list usable by ExerciseEngine from an (N, 4) array"""
+    return [Landmark(*row) for row in np.asarray(array, dtype=np.float64).tolist()]
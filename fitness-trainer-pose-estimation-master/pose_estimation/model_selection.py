@@ -0,0 +1,173 @@
+"""
+Latency-budgeted model_complexity selection for MediaPipe Pose.
+
+MediaPipe ships three pose landmark models (0=Lite, 1=Full, 2=Heavy). This
+module measures each of them on the host, picks the most accurate one that
+fits a per-frame latency budget, and steps down (or back up) at runtime when
+the measured latency drifts, e.g. while several uploads are being processed.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+MODEL_NAMES = {0: "lite", 1: "full", 2: "heavy"}
+COMPLEXITIES = (0, 1, 2)
+
+# Host benchmarks are reused for a day before being measured again
+BENCHMARK_MAX_AGE_SEC = 24 * 3600
+
+_benchmark_lock = threading.Lock()
+
+
+def benchmark_complexities(frames: List, inference_width=None, complexities=COMPLEXITIES,
+                           repeats=3) -> Dict[int, float]:
+    """
+    Measure median per-frame latency (ms) of each model on this host.
+
+    Frames are fed in video mode, so after the first detection the landmark
+    model (the part that differs between complexities) dominates the cost.
+    Frames should contain a person for the numbers to be meaningful.
+    """
+    import statistics
+    from pose_estimation.estimation import PoseEstimator
+
+    latencies = {}
+    for complexity in complexities:
+        estimator = PoseEstimator(model_complexity=complexity, inference_width=inference_width)
+        try:
+            samples = []
+            for i in range(repeats):
+                for frame in frames:
+                    start = time.perf_counter()
+                    estimator.process(frame)
+                    samples.append((time.perf_counter() - start) * 1000)
+            # First call includes graph warm-up and detection
+            latencies[complexity] = round(statistics.median(samples[1:] or samples), 2)
+        finally:
+            estimator.close()
+    return latencies
+
+
+def load_host_benchmark(cache_path: str, inference_width=None) -> Optional[Dict[int, float]]:
+    """Cached host latencies for this inference width, if still fresh"""
+    try:
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    entry = cached.get(str(inference_width))
+    if not entry or time.time() - entry.get("measured_at", 0) > BENCHMARK_MAX_AGE_SEC:
+        return None
+    return {int(k): v for k, v in entry["latencies_ms"].items()}
+
+
+def get_host_benchmark(frames: List, inference_width=None, cache_path: str = None) -> Dict[int, float]:
+    """Load host latencies from the cache, benchmarking and storing them if missing"""
+    with _benchmark_lock:
+        if cache_path:
+            latencies = load_host_benchmark(cache_path, inference_width)
+            if latencies:
+                return latencies
+
+        latencies = benchmark_complexities(frames, inference_width)
+
+        if cache_path:
+            try:
+                with open(cache_path, "r") as f:
+                    cached = json.load(f)
+            except (OSError, ValueError):
+                cached = {}
+            cached[str(inference_width)] = {"measured_at": time.time(), "latencies_ms": latencies}
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cached, f)
+            os.replace(tmp_path, cache_path)
+
+        return latencies
+
+
+def select_complexity(latencies: Dict[int, float], budget_ms: float) -> int:
+    """Most accurate model whose measured latency fits the budget (Lite if none do)"""
+    fitting = [c for c, ms in latencies.items() if ms <= budget_ms]
+    return max(fitting) if fitting else min(latencies, default=0)
+
+
+class LatencyGovernor:
+    """
+    Watches per-frame latency and suggests a different model when it drifts.
+
+    Steps down one level when the smoothed latency stays above the budget,
+    and back up when there is clear headroom and the next model is expected
+    to fit (its host latency scaled by the current load factor).
+    """
+
+    def __init__(self, budget_ms: float, complexity: int, host_latencies: Dict[int, float] = None,
+                 alpha=0.1, patience=30, cooldown=90):
+        self.budget_ms = budget_ms
+        self.complexity = complexity
+        self.host_latencies = host_latencies or {}
+        self.alpha = alpha
+        self.patience = patience
+        self.cooldown = cooldown
+
+        self.ewma_ms = None
+        self._over_budget = 0
+        self._under_budget = 0
+        self._frames_since_switch = 0
+        self.history = []
+
+    def record_choice(self, complexity: int, reason: str):
+        self.complexity = complexity
+        self._over_budget = 0
+        self._under_budget = 0
+        self._frames_since_switch = 0
+        self.history.append({
+            "time": round(time.time(), 3),
+            "model_complexity": complexity,
+            "model": MODEL_NAMES.get(complexity),
+            "reason": reason,
+            "latency_ms": round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+        })
+        del self.history[:-20]
+
+    def observe(self, latency_ms: float) -> Optional[int]:
+        """Record a frame latency; returns a new complexity when a switch is due"""
+        if self.ewma_ms is None:
+            self.ewma_ms = latency_ms
+        else:
+            self.ewma_ms = self.alpha * latency_ms + (1 - self.alpha) * self.ewma_ms
+
+        self._frames_since_switch += 1
+        if self._frames_since_switch < self.cooldown:
+            return None
+
+        if self.ewma_ms > self.budget_ms * 1.2 and self.complexity > min(COMPLEXITIES):
+            self._over_budget += 1
+        else:
+            self._over_budget = 0
+
+        if self.ewma_ms < self.budget_ms * 0.5 and self._next_fits():
+            self._under_budget += 1
+        else:
+            self._under_budget = 0
+
+        if self._over_budget >= self.patience:
+            return self.complexity - 1
+        if self._under_budget >= self.patience * 4:
+            return self.complexity + 1
+        return None
+
+    def _next_fits(self) -> bool:
+        upper = self.complexity + 1
+        if upper not in COMPLEXITIES:
+            return False
+        current_ms = self.host_latencies.get(self.complexity)
+        upper_ms = self.host_latencies.get(upper)
+        if not current_ms or not upper_ms:
+            return True
+        load_factor = self.ewma_ms / current_ms
+        return upper_ms * load_factor <= self.budget_ms
@@ -0,0 +1,299 @@
+"""
+Live pose inference in a separate process over shared memory.
+
+MediaPipe, OpenCV drawing, JPEG encoding and Flask request handling
+otherwise share one interpreter, so heavy inference delays page and status
+requests. ProcessPoseEstimator keeps the PoseEstimator interface but runs
+the graph in a dedicated worker process:
+
+    frames   shared_memory ring of `slots` frame buffers (max_frame_shape each)
+    control  shared int64 array per slot: state, sequence, height, width
+    results  shared float32 array per slot: found, latency, model, 33 x 4 landmarks
+
+A slot moves FREE -> FILLING -> SUBMITTED -> PROCESSING -> DONE -> FREE.
+The web process fills a slot and releases the `submitted` semaphore. The
+worker processes the oldest submitted slot in place, writes the landmarks
+into the slot's result row and releases that slot's `done` semaphore.
+Nothing is pickled per frame. Callers that capture straight into
+frame_buffer() avoid even the one copy into the ring.
+
+The worker is spawned without the parent's __main__: spawn would otherwise
+re-run the server script (app.py) as __mp_main__ in every worker, with all
+of its module-level setup (loggers, stores, background threads).
+"""
+
+from contextlib import contextmanager
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+from pose_estimation.estimation import PoseEstimator
+from pose_estimation.landmarks import NUM_LANDMARKS, landmarks_from_array, landmarks_to_array
+from pose_estimation.model_selection import MODEL_NAMES
+
+logger = logging.getLogger(__name__)
+
+FREE, FILLING, SUBMITTED, PROCESSING, DONE = range(5)
+
+STATE, SEQ, HEIGHT, WIDTH = range(4)
+RESULT_FOUND, RESULT_LATENCY, RESULT_MODEL = range(3)
+RESULT_HEADER = 3
+RESULT_SIZE = RESULT_HEADER + NUM_LANDMARKS * 4
+
+DEFAULT_MAX_FRAME_SHAPE = (1080, 1920, 3)
+
+
+_main_swap_lock = threading.Lock()
+
+
+@contextmanager
+def _without_main_module():
+    """Start processes with an empty __main__ so spawn does not import the server script"""
+    with _main_swap_lock:
+        main = sys.modules['__main__']
+        sys.modules['__main__'] = types.ModuleType('__main__')
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = main
+
+
+def _worker_main(names, slots, frame_bytes, estimator_class, estimator_kwargs, submitted, done, ready, stop):
+    # Spawned workers share the parent's resource tracker, which unlinks the blocks once
+    frames_shm, control_shm, results_shm = (shared_memory.SharedMemory(name=name) for name in names)
+    frames = np.ndarray((slots, frame_bytes), dtype=np.uint8, buffer=frames_shm.buf)
+    control = np.ndarray((slots, 4), dtype=np.int64, buffer=control_shm.buf)
+    results = np.ndarray((slots, RESULT_SIZE), dtype=np.float32, buffer=results_shm.buf)
+
+    parent = os.getppid()
+    estimator = estimator_class(**estimator_kwargs)
+    ready.set()
+
+    try:
+        while not stop.is_set():
+            if not submitted.acquire(timeout=0.5):
+                if os.getppid() != parent:
+                    break
+                continue
+
+            waiting = [i for i in range(slots) if control[i, STATE] == SUBMITTED]
+            if not waiting:
+                continue
+            index = min(waiting, key=lambda i: control[i, SEQ])
+            control[index, STATE] = PROCESSING
+
+            h, w = int(control[index, HEIGHT]), int(control[index, WIDTH])
+            frame = frames[index, :h * w * 3].reshape(h, w, 3)
+
+            start = time.perf_counter()
+            pose = estimator.process(frame)
+            row = results[index]
+            row[RESULT_LATENCY] = (time.perf_counter() - start) * 1000
+            row[RESULT_MODEL] = estimator.model_complexity
+            row[RESULT_FOUND] = 1.0 if pose.pose_landmarks else 0.0
+            if pose.pose_landmarks:
+                landmarks_to_array(pose.pose_landmarks.landmark,
+                                   out=row[RESULT_HEADER:].reshape(NUM_LANDMARKS, 4))
+
+            control[index, STATE] = DONE
+            done[index].release()
+    finally:
+        estimator.close()
+        del frames, control, results
+        for shm in (frames_shm, control_shm, results_shm):
+            shm.close()
+
+
+class ProcessPoseEstimator(PoseEstimator):
+    """PoseEstimator whose MediaPipe graph runs in a worker process"""
+
+    def __init__(self, slots=4, max_frame_shape=DEFAULT_MAX_FRAME_SHAPE, timeout=5.0,
+                 startup_timeout=120.0, estimator_class=PoseEstimator, **estimator_kwargs):
+        """
+        Args:
+            slots: Frame buffers in the shared ring
+            max_frame_shape: Largest (height, width, 3) frame a slot can hold
+            timeout: Seconds to wait for one frame's landmarks
+            startup_timeout: Seconds to wait for the worker's graph to load
+            estimator_class: Estimator created inside the worker (importable by name)
+            estimator_kwargs: Passed to estimator_class inside the worker
+        """
+        self.static_mode = estimator_kwargs.get("static_mode", False)
+        self.inference_width = estimator_kwargs.get("inference_width")
+        self.slots = slots
+        self.frame_bytes = int(np.prod(max_frame_shape))
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.estimator_class = estimator_class
+        self.estimator_kwargs = estimator_kwargs
+
+        self.model_complexity = None
+        self.last_latency_ms = None
+        self.roi_tracker = None
+        self.timeouts = 0
+
+        self._frames_shm = shared_memory.SharedMemory(create=True, size=slots * self.frame_bytes)
+        self._control_shm = shared_memory.SharedMemory(create=True, size=slots * 4 * 8)
+        self._results_shm = shared_memory.SharedMemory(create=True, size=slots * RESULT_SIZE * 4)
+        self._frames = np.ndarray((slots, self.frame_bytes), dtype=np.uint8, buffer=self._frames_shm.buf)
+        self._control = np.ndarray((slots, 4), dtype=np.int64, buffer=self._control_shm.buf)
+        self._results = np.ndarray((slots, RESULT_SIZE), dtype=np.float32, buffer=self._results_shm.buf)
+        self._control[:] = 0
+
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._held_slot = None
+        self._process = None
+        self._start_worker()
+
+    # ==================== WORKER LIFECYCLE ====================
+
+    def _start_worker(self):
+        # spawn: never fork a process that already runs Flask threads and MediaPipe
+        ctx = multiprocessing.get_context("spawn")
+        self._submitted = ctx.Semaphore(0)
+        self._done = [ctx.Semaphore(0) for _ in range(self.slots)]
+        self._ready = ctx.Event()
+        self._stop = ctx.Event()
+        self._control[:, STATE] = FREE
+        self._held_slot = None
+
+        names = (self._frames_shm.name, self._control_shm.name, self._results_shm.name)
+        self._process = ctx.Process(
+            target=_worker_main, name="pose-worker", daemon=True,
+            args=(names, self.slots, self.frame_bytes, self.estimator_class, self.estimator_kwargs,
+                  self._submitted, self._done, self._ready, self._stop)
+        )
+        if self.estimator_class.__module__ == '__main__':
+            # The worker has to import the script to find the estimator class
+            self._process.start()
+        else:
+            with _without_main_module():
+                self._process.start()
+
+    def _restart_worker(self):
+        logger.warning("Pose worker process is not responding, restarting it")
+        self._stop.set()
+        self._process.join(timeout=2)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._start_worker()
+
+    # ==================== SLOTS ====================
+
+    def _acquire_slot(self):
+        with self._lock:
+            for index in range(self.slots):
+                if self._control[index, STATE] == FREE:
+                    self._control[index, STATE] = FILLING
+                    return index
+        return None
+
+    def _slot_of(self, frame):
+        """Slot index when frame is a view into the shared ring"""
+        base = self._frames.ctypes.data
+        offset = frame.ctypes.data - base
+        if 0 <= offset < self.slots * self.frame_bytes and offset % self.frame_bytes == 0:
+            return offset // self.frame_bytes
+        return None
+
+    def frame_buffer(self, shape):
+        """
+        Shared slot to capture the next frame into, so it reaches the worker without a copy.
+
+        The buffer stays valid until the next frame_buffer() call; the
+        previous buffer is released then. Returns None if the shape does
+        not fit a slot or all slots are busy.
+        """
+        with self._lock:
+            if self._held_slot is not None:
+                self._control[self._held_slot, STATE] = FREE
+                self._held_slot = None
+        if int(np.prod(shape)) > self.frame_bytes or len(shape) != 3 or shape[2] != 3:
+            return None
+        index = self._acquire_slot()
+        if index is None:
+            return None
+        self._held_slot = index
+        return self._frames[index, :int(np.prod(shape))].reshape(shape)
+
+    # ==================== INFERENCE ====================
+
+    def process(self, frame):
+        """Pose inference on a BGR frame in the worker; returns an object with pose_landmarks"""
+        if not self._ready.wait(self.startup_timeout):
+            raise TimeoutError("Pose worker process did not start")
+
+        index = self._slot_of(frame) if frame.flags.c_contiguous else None
+        held = index is not None
+        if not held:
+            index = self._acquire_slot()
+            if index is None:
+                raise RuntimeError("No free shared frame slot")
+            h, w = frame.shape[:2]
+            if frame.nbytes > self.frame_bytes:
+                self._control[index, STATE] = FREE
+                raise ValueError(f"Frame {frame.shape} is larger than the shared slot size")
+            self._frames[index, :frame.nbytes].reshape(frame.shape)[...] = frame
+
+        h, w = frame.shape[:2]
+        with self._lock:
+            self._seq += 1
+            self._control[index, SEQ] = self._seq
+            self._control[index, HEIGHT] = h
+            self._control[index, WIDTH] = w
+            self._control[index, STATE] = SUBMITTED
+        self._submitted.release()
+
+        if not self._done[index].acquire(timeout=self.timeout):
+            self.timeouts += 1
+            self._restart_worker()
+            return SimpleNamespace(pose_landmarks=None)
+
+        row = self._results[index]
+        self.last_latency_ms = float(row[RESULT_LATENCY])
+        self.model_complexity = int(row[RESULT_MODEL])
+        landmarks = None
+        if row[RESULT_FOUND]:
+            landmarks = SimpleNamespace(
+                landmark=landmarks_from_array(row[RESULT_HEADER:].reshape(NUM_LANDMARKS, 4))
+            )
+
+        with self._lock:
+            # A frame_buffer() slot stays with the caller for drawing and encoding
+            self._control[index, STATE] = FILLING if held else FREE
+        return SimpleNamespace(pose_landmarks=landmarks)
+
+    def get_model_info(self):
+        return {
+            'model_complexity': self.model_complexity,
+            'model': MODEL_NAMES.get(self.model_complexity),
+            'auto': self.estimator_kwargs.get('model_complexity') == 'auto',
+            'latency_ms': round(self.last_latency_ms, 2) if self.last_latency_ms is not None else None,
+            'process': self._process.pid if self._process else None,
+            'timeouts': self.timeouts,
+        }
+
+    def close(self):
+        """Stop the worker and free the shared memory"""
+        if self._process is None:
+            return
+        self._stop.set()
+        self._submitted.release()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+
+        del self._frames, self._control, self._results
+        for shm in (self._frames_shm, self._control_shm, self._results_shm):
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,96 @@
+"""
+Person ROI tracking for pose inference.
+
+Keeps a bounding box around the person found in the previous frame so the
+next inference can run on a padded crop instead of the whole frame. The crop
+is only moved when the person gets close to its edge, which keeps the input
+stable for MediaPipe's own frame-to-frame tracking.
+"""
+
+from typing import Optional, Tuple
+
+VISIBILITY_THRESHOLD = 0.5
+
+
+class PersonRoiTracker:
+    def __init__(self, padding=0.35, min_size=0.25, min_visible=8):
+        """
+        Args:
+            padding: Crop margin around the person, as a fraction of the box size
+            min_size: Minimum crop width/height as a fraction of the frame
+            min_visible: Landmarks that must be visible to keep tracking
+        """
+        self.padding = padding
+        self.min_size = min_size
+        self.min_visible = min_visible
+
+        # Normalized (x0, y0, x1, y1) of the last person box and current crop
+        self.person_box: Optional[Tuple[float, float, float, float]] = None
+        self.crop_box: Optional[Tuple[float, float, float, float]] = None
+
+    @property
+    def is_tracking(self):
+        return self.crop_box is not None
+
+    def reset(self):
+        self.person_box = None
+        self.crop_box = None
+
+    def crop_rect(self, frame_shape) -> Optional[Tuple[int, int, int, int]]:
+        """Pixel (x0, y0, x1, y1) of the current crop, or None for full frame"""
+        if self.crop_box is None:
+            return None
+        h, w = frame_shape[:2]
+        x0, y0, x1, y1 = self.crop_box
+        rect = (int(x0 * w), int(y0 * h), int(round(x1 * w)), int(round(y1 * h)))
+        if rect[2] - rect[0] < 2 or rect[3] - rect[1] < 2:
+            return None
+        return rect
+
+    def update(self, landmarks):
+        """Update the tracked box from full-frame normalized landmarks."""
+        xs, ys = [], []
+        for lm in landmarks:
+            if lm.visibility > VISIBILITY_THRESHOLD:
+                xs.append(lm.x)
+                ys.append(lm.y)
+
+        if len(xs) < self.min_visible:
+            self.reset()
+            return
+
+        self.person_box = (min(xs), min(ys), max(xs), max(ys))
+
+        # Keep the crop while the person stays well inside it
+        if self.crop_box is None or not self._contains(self.crop_box, self._expand(self.person_box, self.padding / 2)):
+            self.crop_box = self._expand(self.person_box, self.padding)
+
+    @staticmethod
+    def map_to_frame(landmarks, rect, frame_shape):
+        """Convert crop-normalized landmarks to full-frame normalized, in place."""
+        h, w = frame_shape[:2]
+        x0, y0, x1, y1 = rect
+        sx = (x1 - x0) / w
+        sy = (y1 - y0) / h
+        ox = x0 / w
+        oy = y0 / h
+        for lm in landmarks:
+            lm.x = ox + lm.x * sx
+            lm.y = oy + lm.y * sy
+            lm.z = lm.z * sx
+
+    def _expand(self, box, padding):
+        x0, y0, x1, y1 = box
+        bw = max(x1 - x0, self.min_size)
+        bh = max(y1 - y0, self.min_size)
+        cx = (x0 + x1) / 2
+        cy = (y0 + y1) / 2
+        half_w = bw * (1 + 2 * padding) / 2
+        half_h = bh * (1 + 2 * padding) / 2
+        return (max(0.0, cx - half_w), max(0.0, cy - half_h),
+                min(1.0, cx + half_w), min(1.0, cy + half_h))
+
+    @staticmethod
+    def _contains(outer, inner):
+        return (outer[0] <= inner[0] and outer[1] <= inner[1] and
+                outer[2] >= inner[2] and outer[3] >= inner[3])
@@ -0,0 +1,107 @@
+"""
+Synthetic MediaPipe-shaped pose sequences (benchmarks, tests, synthetic camera).
+
+A standing skeleton (33 landmarks, normalized x/y like MediaPipe) is bent
+so that every angle defined in an exercise's YAML sweeps through the range
+its state conditions test. Each repetition therefore walks the exercise's
+FSM like a real recording would, without needing a camera or MediaPipe.
+"""
+
+import math
+import re
+
+import numpy as np
+
+from exercises.base_exercise import BaseExercise, BilateralExercise
+
+FRAME_SHAPE = (480, 640)  # height, width the sequences are generated for
+FPS = 30
+
+# Standing, facing the camera (the person's left side is on the image's right)
+_STANDING = {
+    "nose": (0.50, 0.14),
+    "left_shoulder": (0.58, 0.28), "right_shoulder": (0.42, 0.28),
+    "left_elbow": (0.61, 0.43), "right_elbow": (0.39, 0.43),
+    "left_wrist": (0.62, 0.57), "right_wrist": (0.38, 0.57),
+    "left_hip": (0.55, 0.58), "right_hip": (0.45, 0.58),
+    "left_knee": (0.56, 0.75), "right_knee": (0.44, 0.75),
+    "left_ankle": (0.56, 0.92), "right_ankle": (0.44, 0.92),
+}
+
+# Landmarks that move along when a joint is rotated
+_CHILDREN = {
+    "left_elbow": ["left_wrist"], "right_elbow": ["right_wrist"],
+    "left_knee": ["left_ankle"], "right_knee": ["right_ankle"],
+    "left_hip": ["left_knee", "left_ankle"], "right_hip": ["right_knee", "right_ankle"],
+}
+
+
+def standing_pose() -> np.ndarray:
+    """(33, 4) x, y, z, visibility; unmapped landmarks sit near the nose"""
+    pose = np.zeros((33, 4), dtype=np.float32)
+    pose[:, :2] = _STANDING["nose"]
+    pose[:, 3] = 0.95
+    for name, (x, y) in _STANDING.items():
+        pose[BaseExercise.LANDMARK_MAP[name], :2] = (x, y)
+    return pose
+
+
+def angle_range(exercise: BaseExercise):
+    """Angle sweep (low, high) covering every threshold in the state conditions"""
+    thresholds = []
+    for state in exercise.states.values():
+        thresholds += [float(n) for n in re.findall(r"\d+(?:\.\d+)?", str(state.get("condition", "")))]
+    if not thresholds:
+        return 60.0, 170.0
+    return max(5.0, min(thresholds) - 15), min(178.0, max(thresholds) + 10)
+
+
+def _set_angle(pose, points, target_deg, frame_shape):
+    """Rotate the third point (and its children) about the vertex to reach target_deg"""
+    h, w = frame_shape
+    scale = np.array([w, h], dtype=np.float64)
+    a, b, c = (BaseExercise.LANDMARK_MAP[p] for p in points)
+    pa, pb, pc = (pose[i, :2].astype(np.float64) * scale for i in (a, b, c))
+
+    u = pa - pb
+    v = pc - pb
+    length = np.linalg.norm(v) or 1.0
+    # Bend towards the side the limb is already on
+    sign = 1.0 if (u[0] * v[1] - u[1] * v[0]) >= 0 else -1.0
+    theta = sign * math.radians(target_deg)
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+    direction = np.array([u[0] * cos_t - u[1] * sin_t, u[0] * sin_t + u[1] * cos_t])
+    direction /= np.linalg.norm(direction) or 1.0
+    new_c = pb + direction * length
+
+    shift = (new_c - pc) / scale
+    pose[c, :2] += shift
+    for child in _CHILDREN.get(points[2], []):
+        pose[BaseExercise.LANDMARK_MAP[child], :2] += shift
+
+
+def exercise_sequence(exercise: BaseExercise, frames: int, fps: int = FPS, rep_seconds: float = 2.0,
+                      frame_shape=FRAME_SHAPE, jitter: float = 0.002, seed: int = 0) -> np.ndarray:
+    """
+    (frames, 33, 4) landmark arrays performing the exercise's repetitions.
+
+    Every defined angle follows a cosine between angle_range() bounds, one
+    cycle per rep_seconds; the right side of a bilateral exercise runs half
+    a cycle behind the left. Small Gaussian jitter imitates landmark noise.
+    """
+    rng = np.random.default_rng(seed)
+    low, high = angle_range(exercise)
+    bilateral = isinstance(exercise, BilateralExercise)
+    base = standing_pose()
+    sequence = np.empty((frames, 33, 4), dtype=np.float32)
+
+    for i in range(frames):
+        pose = base.copy()
+        phase = 2 * math.pi * i / (fps * rep_seconds)
+        for name, angle_def in exercise.angles.items():
+            offset = math.pi if bilateral and "right" in name else 0.0
+            target = low + (high - low) * (0.5 + 0.5 * math.cos(phase + offset))
+            _set_angle(pose, angle_def["points"], target, frame_shape)
+        pose[:, :2] += rng.normal(0, jitter, (33, 2))
+        sequence[i] = np.clip(pose, 0.0, 1.0)
+    return sequence
@@ -0,0 +1,164 @@
+"""
+Binary wire format for batches of landmark frames.
+
+Capture clients post N frames per request instead of one JSON document per
+frame. The layout is columnar so the server can view every block in place
+with np.frombuffer, without parsing or copying per frame.
+
+Batch layout (little endian, all blocks naturally aligned):
+
+    offset  size         field
+    0       4            magic "PLWB"
+    4       1            version
+    5       1            coordinate format (1 = float16, 2 = int16 / COORD_SCALE)
+    6       2            landmarks per frame (L)
+    8       2            frame count (N)
+    10      2            frame width
+    12      2            frame height
+    14      2            reserved
+    16      8            base timestamp, float64 seconds
+    24      4 * N        uint32 microseconds since the base timestamp
+    ...     2 * N*L*3    x, y, z per landmark (float16 or int16)
+    ...     N * ceil(L/8)  visibility bitmap per frame (bit i = landmark i visible)
+    ...     ceil(N/8)    presence bitmap (bit n = frame n contains a person)
+
+A 33-landmark frame is 4 + 198 + 5 bytes plus one presence bit, against
+roughly 2.5 KB as JSON.
+"""
+
+import struct
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+MAGIC = b"PLWB"
+VERSION = 1
+
+FORMAT_FLOAT16 = 1
+FORMAT_INT16 = 2
+COORD_SCALE = 8192
+COORD_DTYPES = {FORMAT_FLOAT16: np.float16, FORMAT_INT16: np.int16}
+
+VISIBILITY_THRESHOLD = 0.5
+MAX_BATCH_FRAMES = 1024
+
+HEADER = struct.Struct("<4sBBHHHHHd")
+
+CONTENT_TYPE = "application/x-pose-landmarks"
+
+
+class LandmarkBatch(NamedTuple):
+    """Decoded batch; the array fields are views into the request body"""
+    timestamps: np.ndarray      # (N,) float64 seconds
+    coords: np.ndarray          # (N, L, 3) float16 or int16
+    visibility_bits: np.ndarray  # (N, ceil(L/8)) uint8
+    presence_bits: np.ndarray   # (ceil(N/8),) uint8
+    coord_format: int
+    frame_shape: Tuple[int, int]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def present(self) -> np.ndarray:
+        """(N,) bool, frames with a person"""
+        return np.unpackbits(self.presence_bits, count=len(self), bitorder="little").astype(bool)
+
+    def visible(self) -> np.ndarray:
+        """(N, L) bool visibility"""
+        return np.unpackbits(self.visibility_bits, axis=1, count=self.coords.shape[1],
+                             bitorder="little").astype(bool)
+
+    def landmarks(self, index: int) -> np.ndarray:
+        """(L, 4) float32 landmarks of one frame, visibility as 0.0 / 1.0"""
+        frame = np.empty((self.coords.shape[1], 4), dtype=np.float32)
+        frame[:, :3] = self.coords[index]
+        if self.coord_format == FORMAT_INT16:
+            frame[:, :3] /= COORD_SCALE
+        frame[:, 3] = np.unpackbits(self.visibility_bits[index], count=self.coords.shape[1],
+                                    bitorder="little")
+        return frame
+
+
+def batch_size(num_frames: int, num_landmarks: int) -> int:
+    """Encoded size in bytes"""
+    return (HEADER.size + 4 * num_frames + 6 * num_frames * num_landmarks +
+            num_frames * ((num_landmarks + 7) // 8) + (num_frames + 7) // 8)
+
+
+def encode_batch(timestamps, landmarks, frame_shape: Tuple[int, int],
+                 coord_format: int = FORMAT_FLOAT16) -> bytes:
+    """
+    Args:
+        timestamps: (N,) capture times in seconds
+        landmarks: (N, L, 4) x, y, z, visibility; frames without a person are all-NaN
+        frame_shape: (height, width) of the source frames
+        coord_format: FORMAT_FLOAT16 or FORMAT_INT16
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    num_frames, num_landmarks = landmarks.shape[:2]
+    if len(timestamps) != num_frames:
+        raise ValueError("timestamps and landmarks have different frame counts")
+
+    base = float(timestamps.min()) if num_frames else 0.0
+    present = ~np.isnan(landmarks).all(axis=(1, 2))
+    values = np.nan_to_num(landmarks)
+
+    if coord_format == FORMAT_INT16:
+        coords = np.clip(np.rint(values[:, :, :3] * COORD_SCALE), -32768, 32767).astype("<i2")
+    elif coord_format == FORMAT_FLOAT16:
+        coords = values[:, :, :3].astype("<f2")
+    else:
+        raise ValueError(f"Unknown coordinate format {coord_format}")
+
+    offsets = np.rint((timestamps - base) * 1e6).astype("<u4")
+    visibility = np.packbits(values[:, :, 3] >= VISIBILITY_THRESHOLD, axis=1, bitorder="little")
+    presence = np.packbits(present, bitorder="little")
+
+    header = HEADER.pack(MAGIC, VERSION, coord_format, num_landmarks, num_frames,
+                         frame_shape[1], frame_shape[0], 0, base)
+    return b"".join((header, offsets.tobytes(), coords.tobytes(), visibility.tobytes(), presence.tobytes()))
+
+
+def decode_batch(data) -> LandmarkBatch:
+    """
+    Decode a batch without copying the landmark block.
+
+    Raises:
+        ValueError: Malformed or unsupported batch
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Batch is shorter than its header")
+    (magic, version, coord_format, num_landmarks, num_frames,
+     width, height, _, base) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a landmark batch")
+    if version > VERSION:
+        raise ValueError(f"Unsupported batch version {version}")
+    if coord_format not in COORD_DTYPES:
+        raise ValueError(f"Unknown coordinate format {coord_format}")
+    if num_frames > MAX_BATCH_FRAMES:
+        raise ValueError(f"Batch has more than {MAX_BATCH_FRAMES} frames")
+    if len(data) != batch_size(num_frames, num_landmarks):
+        raise ValueError(f"Batch size {len(data)} does not match its header")
+
+    offset = HEADER.size
+    offsets = np.frombuffer(data, "<u4", num_frames, offset)
+    offset += 4 * num_frames
+    coords = np.frombuffer(data, np.dtype(COORD_DTYPES[coord_format]).newbyteorder("<"),
+                           num_frames * num_landmarks * 3, offset).reshape(num_frames, num_landmarks, 3)
+    offset += 6 * num_frames * num_landmarks
+    vis_bytes = (num_landmarks + 7) // 8
+    visibility = np.frombuffer(data, np.uint8, num_frames * vis_bytes, offset).reshape(num_frames, vis_bytes)
+    offset += num_frames * vis_bytes
+    presence = np.frombuffer(data, np.uint8, (num_frames + 7) // 8, offset)
+
+    return LandmarkBatch(
+        timestamps=base + offsets / 1e6,
+        coords=coords,
+        visibility_bits=visibility,
+        presence_bits=presence,
+        coord_format=coord_format,
+        frame_shape=(height, width),
+    )
@@ -0,0 +1,174 @@
+// Client-side pose mode: MediaPipe Pose runs in the browser and only the
+// 33 landmarks of each frame are sent to the server, which keeps the
+// exercise state machine and returns counter, state, feedback and form score.
+// Frames are sent in small binary batches rather than one request per frame.
+import { FilesetResolver, PoseLandmarker, DrawingUtils } from 'https://cdn.jsdelivr.net/npm/@mediapipe/tasks-vision@0.10.14/vision_bundle.mjs';
+
+const WASM_URL = 'https://cdn.jsdelivr.net/npm/@mediapipe/tasks-vision@0.10.14/wasm';
+const MODEL_URL = 'https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/1/pose_landmarker_lite.task';
+
+// Binary landmark batches (see pose_estimation/wire_protocol.py)
+const NUM_LANDMARKS = 33;
+const COORD_SCALE = 8192;
+const FORMAT_INT16 = 2;
+const BATCH_MAX_FRAMES = 8;
+const BATCH_MAX_DELAY_MS = 150;
+const PENDING_LIMIT = 240;
+
+let landmarker = null;
+let stream = null;
+let sessionId = null;
+let running = false;
+let requestInFlight = false;
+let lastVideoTime = -1;
+let pendingFrames = [];
+let batchStartedAt = 0;
+
+async function getLandmarker() {
+    if (!landmarker) {
+        const vision = await FilesetResolver.forVisionTasks(WASM_URL);
+        landmarker = await PoseLandmarker.createFromOptions(vision, {
+            baseOptions: { modelAssetPath: MODEL_URL, delegate: 'GPU' },
+            runningMode: 'VIDEO',
+            numPoses: 1
+        });
+    }
+    return landmarker;
+}
+
+function encodeBatch(frames, width, height) {
+    const n = frames.length;
+    const visBytes = Math.ceil(NUM_LANDMARKS / 8);
+    const size = 24 + 4 * n + 6 * n * NUM_LANDMARKS + n * visBytes + Math.ceil(n / 8);
+    const view = new DataView(new ArrayBuffer(size));
+    const base = frames[0].timestamp;
+
+    [0x50, 0x4c, 0x57, 0x42].forEach((b, i) => view.setUint8(i, b));  // "PLWB"
+    view.setUint8(4, 1);
+    view.setUint8(5, FORMAT_INT16);
+    view.setUint16(6, NUM_LANDMARKS, true);
+    view.setUint16(8, n, true);
+    view.setUint16(10, width, true);
+    view.setUint16(12, height, true);
+    view.setFloat64(16, base, true);
+
+    let offset = 24;
+    frames.forEach(frame => {
+        view.setUint32(offset, Math.max(0, Math.round((frame.timestamp - base) * 1e6)), true);
+        offset += 4;
+    });
+
+    const clamp = v => Math.max(-32768, Math.min(32767, Math.round(v * COORD_SCALE)));
+    frames.forEach(frame => {
+        for (let i = 0; i < NUM_LANDMARKS; i++) {
+            const lm = frame.pose ? frame.pose[i] : null;
+            view.setInt16(offset, lm ? clamp(lm.x) : 0, true);
+            view.setInt16(offset + 2, lm ? clamp(lm.y) : 0, true);
+            view.setInt16(offset + 4, lm ? clamp(lm.z) : 0, true);
+            offset += 6;
+        }
+    });
+
+    frames.forEach(frame => {
+        for (let i = 0; i < NUM_LANDMARKS; i++) {
+            const lm = frame.pose ? frame.pose[i] : null;
+            if (lm && (lm.visibility ?? 1.0) >= 0.5) {
+                const byte = offset + (i >> 3);
+                view.setUint8(byte, view.getUint8(byte) | (1 << (i & 7)));
+            }
+        }
+        offset += visBytes;
+    });
+
+    frames.forEach((frame, n) => {
+        if (frame.pose) {
+            const byte = offset + (n >> 3);
+            view.setUint8(byte, view.getUint8(byte) | (1 << (n & 7)));
+        }
+    });
+    return view.buffer;
+}
+
+function queueLandmarks(pose, video, onStatus) {
+    if (!sessionId) return;
+    if (!pendingFrames.length) batchStartedAt = performance.now();
+    pendingFrames.push({ pose: pose, timestamp: (performance.timeOrigin + performance.now()) / 1000 });
+    if (pendingFrames.length > PENDING_LIMIT) pendingFrames.shift();
+
+    // One batch in flight; frames detected meanwhile go into the next batch
+    const due = pendingFrames.length >= BATCH_MAX_FRAMES || performance.now() - batchStartedAt >= BATCH_MAX_DELAY_MS;
+    if (requestInFlight || !due) return;
+    requestInFlight = true;
+
+    const frames = pendingFrames;
+    pendingFrames = [];
+    fetch(`/api/client_pose/${sessionId}/frames`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/x-pose-landmarks' },
+        body: encodeBatch(frames, video.videoWidth, video.videoHeight)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) onStatus(data.status);
+    })
+    .catch(error => console.error('Error sending landmarks:', error))
+    .finally(() => { requestInFlight = false; });
+}
+
+async function start(video, canvas, exercise, sets, reps, onStatus) {
+    const response = await fetch('/api/client_pose/start', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ exercise_type: exercise, sets: sets, reps: reps })
+    });
+    const data = await response.json();
+    if (!data.success) throw new Error(data.error || 'Failed to start session');
+    sessionId = data.session_id;
+
+    const poseLandmarker = await getLandmarker();
+    stream = await navigator.mediaDevices.getUserMedia({ video: { width: 1280, height: 720 }, audio: false });
+    video.srcObject = stream;
+    await video.play();
+
+    canvas.width = video.videoWidth;
+    canvas.height = video.videoHeight;
+    const ctx = canvas.getContext('2d');
+    const drawingUtils = new DrawingUtils(ctx);
+
+    running = true;
+    function loop() {
+        if (!running) return;
+        if (video.currentTime !== lastVideoTime) {
+            lastVideoTime = video.currentTime;
+            const result = poseLandmarker.detectForVideo(video, performance.now());
+            const pose = result.landmarks.length ? result.landmarks[0] : null;
+
+            ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
+            if (pose) {
+                drawingUtils.drawConnectors(pose, PoseLandmarker.POSE_CONNECTIONS, { color: '#00FF00', lineWidth: 2 });
+                drawingUtils.drawLandmarks(pose, { color: '#FF0000', radius: 3 });
+            }
+            queueLandmarks(pose, video, onStatus);
+        }
+        requestAnimationFrame(loop);
+    }
+    requestAnimationFrame(loop);
+    return data;
+}
+
+async function stop() {
+    running = false;
+    pendingFrames = [];
+    if (stream) {
+        stream.getTracks().forEach(track => track.stop());
+        stream = null;
+    }
+    if (!sessionId) return null;
+
+    const id = sessionId;
+    sessionId = null;
+    const response = await fetch(`/api/client_pose/${id}/stop`, { method: 'POST' });
+    return response.json();
+}
+
+window.ClientPose = { start, stop, isRunning: () => running };
@@ -22,6 +22,9 @@ document.addEventListener('DOMContentLoaded', function() {
     const videoElement = document.getElementById('video');
     const videoPlaceholder = document.getElementById('video-placeholder');
     const startCameraBtn = document.getElementById('start-camera-btn');
+    const clientPoseCheckbox = document.getElementById('client-pose');
+    const clientVideo = document.getElementById('client-video');
+    const clientCanvas = document.getElementById('client-canvas');
     
     // Camera state
     let cameraStarted = false;
@@ -31,7 +34,12 @@ document.addEventListener('DOMContentLoaded', function() {
     let exercisesData = {};
     let workoutRunning = false;
     let statusCheckInterval = null;
+    let statusEvents = null;
+    // Set on <body> when asgi.py serves /events/status
+    const serverEvents = !!window.EventSource && document.body.hasAttribute('data-server-events');
+    let statusVersion = null;
     let currentCategory = 'all';
+    let clientPoseMode = false;
     
     // ==================== Camera Control Functions ====================
     function startCamera() {
@@ -217,6 +225,12 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
         
+        // Client-side pose mode: the browser detects the pose, the server only counts
+        if (clientPoseCheckbox && clientPoseCheckbox.checked && window.ClientPose) {
+            startClientPose(sets, reps);
+            return;
+        }
+        
         // Start camera first if not started
         startCamera();
         
@@ -248,8 +262,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 formGrade.textContent = 'A';
                 formGrade.className = 'status-value form-grade grade-a';
                 
-                // Start status polling
-                statusCheckInterval = setInterval(checkStatus, 500);
+                // Start status updates
+                startStatusUpdates();
             } else {
                 alert('Failed to start exercise: ' + (data.error || 'Unknown error'));
             }
@@ -260,8 +274,54 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
     
+    // Start a workout with pose detection running in the browser
+    function startClientPose(sets, reps) {
+        stopCamera();
+        if (videoPlaceholder) {
+            videoPlaceholder.style.display = 'none';
+        }
+        clientCanvas.style.display = 'block';
+        
+        window.ClientPose.start(clientVideo, clientCanvas, selectedExercise, sets, reps, updateStatus)
+        .then(() => {
+            clientPoseMode = true;
+            workoutRunning = true;
+            startBtn.disabled = true;
+            stopBtn.disabled = false;
+            
+            const details = exerciseDetails[selectedExercise] || { name: selectedExercise };
+            currentExercise.textContent = details.name;
+            currentSet.textContent = `1 / ${sets}`;
+            currentReps.textContent = `0 / ${reps}`;
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            clientCanvas.style.display = 'none';
+            if (videoPlaceholder) {
+                videoPlaceholder.style.display = 'flex';
+            }
+            alert('Failed to start in-browser pose detection: ' + error.message);
+        });
+    }
+    
+    function stopClientPose() {
+        clientPoseMode = false;
+        clientCanvas.style.display = 'none';
+        if (videoPlaceholder) {
+            videoPlaceholder.style.display = 'flex';
+        }
+        return window.ClientPose.stop();
+    }
+    
     // Stop workout
     stopBtn.addEventListener('click', function() {
+        if (clientPoseMode) {
+            stopClientPose()
+            .then(() => resetWorkoutUI())
+            .catch(error => console.error('Error:', error));
+            return;
+        }
+        
         fetch('/stop_exercise', {
             method: 'POST',
             headers: {
@@ -279,34 +339,78 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
     
+    // Status is pushed over server-sent events by asgi.py; the Flask server is polled
+    function startStatusUpdates() {
+        stopStatusUpdates();
+        statusVersion = null;
+        if (!serverEvents) {
+            statusCheckInterval = setInterval(checkStatus, 500);
+            return;
+        }
+        statusEvents = new EventSource('/events/status');
+        statusEvents.onmessage = event => updateStatus(JSON.parse(event.data));
+        statusEvents.onerror = () => {
+            // EventSource reconnects by itself; poll only once it has given up
+            if (!statusEvents || statusEvents.readyState !== EventSource.CLOSED) return;
+            stopStatusUpdates();
+            if (workoutRunning) {
+                statusCheckInterval = setInterval(checkStatus, 500);
+            }
+        };
+    }
+    
+    function stopStatusUpdates() {
+        if (statusEvents) {
+            statusEvents.close();
+            statusEvents = null;
+        }
+        if (statusCheckInterval) {
+            clearInterval(statusCheckInterval);
+            statusCheckInterval = null;
+        }
+    }
+    
     // Function to check status
     function checkStatus() {
-        fetch('/get_status')
-        .then(response => response.json())
-        .then(data => {
-            if (!data.exercise_running && workoutRunning) {
-                // Workout has ended
-                resetWorkoutUI();
-                return;
-            }
-            
-            // Update status display
-            currentSet.textContent = `${data.current_set} / ${data.total_sets}`;
-            currentReps.textContent = `${data.current_reps} / ${data.rep_goal}`;
-            
-            // Update form score
-            if (data.form_score !== undefined) {
-                formScore.textContent = Math.round(data.avg_form_score || data.form_score);
-                const grade = data.form_grade || getGrade(data.form_score);
-                formGrade.textContent = grade;
-                formGrade.className = `status-value form-grade grade-${grade.toLowerCase()}`;
-            }
+        const since = statusVersion !== null ? `?since=${statusVersion}` : '';
+        fetch(`/get_status${since}`)
+        .then(response => {
+            // 204: the status has not changed since the last poll
+            if (response.status === 204) return;
+            return response.json().then(data => {
+                statusVersion = data.version !== undefined ? data.version : null;
+                updateStatus(data);
+            });
         })
         .catch(error => {
             console.error('Error checking status:', error);
         });
     }
     
+    // Update the status panel from /get_status or a client pose response
+    function updateStatus(data) {
+        if (!data.exercise_running && workoutRunning) {
+            // Workout has ended
+            if (clientPoseMode) {
+                stopClientPose().catch(error => console.error('Error:', error));
+            }
+            resetWorkoutUI();
+            return;
+        }
+        
+        // Update status display
+        currentSet.textContent = `${data.current_set} / ${data.total_sets}`;
+        currentReps.textContent = `${data.current_reps} / ${data.rep_goal}`;
+        
+        // Update form score
+        if (data.form_score !== undefined) {
+            formScore.textContent = Math.round(data.avg_form_score || data.form_score);
+            const grade = data.form_grade || getGrade(data.form_score);
+            formGrade.textContent = grade;
+            formGrade.className = `status-value form-grade grade-${grade.toLowerCase()}`;
+        }
+    }
+    
     // Get grade from score
     function getGrade(score) {
         if (score >= 90) return 'A';
@@ -322,10 +426,7 @@ document.addEventListener('DOMContentLoaded', function() {
         startBtn.disabled = false;
         stopBtn.disabled = true;
         
-        if (statusCheckInterval) {
-            clearInterval(statusCheckInterval);
-            statusCheckInterval = null;
-        }
+        stopStatusUpdates();
         
         currentExercise.textContent = 'None';
         currentSet.textContent = '0 / 0';
@@ -20,6 +20,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const exerciseInfoPanel = document.getElementById('exercise-info-panel');
     const miniType = document.getElementById('mini-type');
     const miniDescription = document.getElementById('mini-description');
+    const renderToggle = document.getElementById('render-toggle');
     
     const statReps = document.getElementById('stat-reps');
     const statScore = document.getElementById('stat-score');
@@ -42,6 +43,7 @@ document.addEventListener('DOMContentLoaded', function() {
     let videoFile = null;
     let isAnalyzing = false;
     let analysisInterval = null;
+    let analysisEvents = null;
     let exercisesData = {};
     let analysisResults = {
         reps: 0,
@@ -259,6 +261,9 @@ document.addEventListener('DOMContentLoaded', function() {
         addLog('Starting video analysis...', 'processing');
         addLog(`Exercise: ${exerciseSelect.options[exerciseSelect.selectedIndex].text}`, 'info');
         addLog(`Video: ${videoFile.name}`, 'info');
+        if (!renderToggle.checked) {
+            addLog('Results only: no skeleton overlay video, analyzed at a reduced frame rate', 'info');
+        }
         
         addFeedback('info', `Starting analysis for ${exerciseSelect.options[exerciseSelect.selectedIndex].text}`);
         
@@ -266,6 +271,8 @@ document.addEventListener('DOMContentLoaded', function() {
         const formData = new FormData();
         formData.append('video', videoFile);
         formData.append('exercise_type', exerciseSelect.value);
+        // render=0: the server skips the overlay video and only analyzes every few frames
+        formData.append('render', renderToggle.checked ? '1' : '0');
         
         addLog('Uploading video to server...', 'processing');
         
@@ -309,89 +316,120 @@ document.addEventListener('DOMContentLoaded', function() {
         videoPlayer.currentTime = 0;
         videoPlayer.play();
         
+        // Progress is pushed over server-sent events by asgi.py; the Flask server is polled
+        if (window.EventSource && document.body.hasAttribute('data-server-events')) {
+            analysisEvents = new EventSource(`/events/video/${videoId}`);
+            analysisEvents.onmessage = event => handleAnalysisStatus(JSON.parse(event.data));
+            analysisEvents.onerror = () => {
+                // EventSource reconnects by itself; poll only once it has given up
+                if (!analysisEvents || analysisEvents.readyState !== EventSource.CLOSED) return;
+                analysisEvents = null;
+                if (isAnalyzing && !analysisInterval) {
+                    pollAnalysisStatus(videoId);
+                }
+            };
+        } else {
+            pollAnalysisStatus(videoId);
+        }
+        
+        // Also poll frame-by-frame for real-time display
+        requestAnimationFrame(function frameLoop() {
+            if (isAnalyzing && !videoPlayer.paused) {
+                sendFrameForAnalysis(videoId);
+                requestAnimationFrame(frameLoop);
+            }
+        });
+    }
+    
+    function pollAnalysisStatus(videoId) {
         analysisInterval = setInterval(async () => {
             if (!isAnalyzing) {
-                clearInterval(analysisInterval);
+                stopAnalysisUpdates();
                 return;
             }
             
             try {
                 const response = await fetch(`/api/video/status/${videoId}`);
-                const data = await response.json();
-                
-                if (data.status === 'processing') {
-                    // Update progress
-                    progressFill.style.width = `${data.progress}%`;
-                    progressText.textContent = `Processing: ${Math.round(data.progress)}%`;
-                    
-                    // Log progress at intervals
-                    const currentProgress = Math.floor(data.progress / 10) * 10;
-                    if (currentProgress > lastProgress && currentProgress > 0) {
-                        addLog(`Progress: ${currentProgress}% | Reps: ${data.reps || 0} | Score: ${data.form_score || '--'}`, 'progress');
-                        lastProgress = currentProgress;
-                    }
-                    
-                    // Update stats
-                    updateStats(data);
-                    
-                } else if (data.status === 'completed') {
-                    clearInterval(analysisInterval);
-                    analysisResults.endTime = new Date();
-                    
-                    // IMPORTANT: Update stats with final values before showing report
-                    updateStats(data);
-                    
-                    // Set progress to 100%
-                    progressFill.style.width = '100%';
-                    progressText.textContent = '100%';
-                    
-                    // Terminal completion logs
-                    addLog('═══════════════════════════════════════════════', 'success');
-                    addLog('✓ Analysis completed successfully!', 'success');
-                    addLog(`Total Reps: ${data.reps || 0}`, 'success');
-                    addLog(`Average Score: ${data.avg_form_score || data.form_score || '--'}/100`, 'success');
-                    addLog(`Grade: ${data.grade || '--'}`, 'success');
-                    setTerminalStatus('Completed', 'success');
-                    
-                    // Check if processed video with skeleton is available
-                    if (data.has_processed_video && data.processed_video_url) {
-                        addLog('Loading processed video with skeleton overlay...', 'processing');
-                        addFeedback('success', 'Analysis completed! Loading video with skeleton overlay...');
-                        
-                        // Replace video source with processed video
-                        videoPlayer.src = data.processed_video_url;
-                        videoPlayer.load();
-                        videoPlayer.play();
-                        
-                        addLog('Video with skeleton overlay loaded.', 'success');
-                        addFeedback('info', '🦴 Video with skeleton overlay is now playing');
-                    } else {
-                        addFeedback('success', 'Analysis completed!');
-                    }
-                    
-                    showReport(data);
-                    stopAnalysis();
-                    
-                } else if (data.status === 'error') {
-                    clearInterval(analysisInterval);
-                    addLog(`✗ Analysis error: ${data.error}`, 'error');
-                    setTerminalStatus('Error', 'error');
-                    addFeedback('error', `Analysis error: ${data.error}`);
-                    stopAnalysis();
-                }
+                handleAnalysisStatus(await response.json());
             } catch (error) {
                 console.error('Polling error:', error);
                 addLog(`Network error during polling: ${error.message}`, 'warning');
             }
         }, 200);
-        
-        // Also poll frame-by-frame for real-time display
-        requestAnimationFrame(function frameLoop() {
-            if (isAnalyzing && !videoPlayer.paused) {
-                sendFrameForAnalysis(videoId);
-                requestAnimationFrame(frameLoop);
+    }
+    
+    function stopAnalysisUpdates() {
+        if (analysisEvents) {
+            analysisEvents.close();
+            analysisEvents = null;
+        }
+        if (analysisInterval) {
+            clearInterval(analysisInterval);
+            analysisInterval = null;
+        }
+    }
+    
+    function handleAnalysisStatus(data) {
+        if (data.status === 'processing') {
+            // Update progress
+            progressFill.style.width = `${data.progress}%`;
+            progressText.textContent = `Processing: ${Math.round(data.progress)}%`;
+            
+            // Log progress at intervals
+            const currentProgress = Math.floor(data.progress / 10) * 10;
+            if (currentProgress > lastProgress && currentProgress > 0) {
+                addLog(`Progress: ${currentProgress}% | Reps: ${data.reps || 0} | Score: ${data.form_score || '--'}`, 'progress');
+                lastProgress = currentProgress;
             }
-        });
+            
+            // Update stats
+            updateStats(data);
+            
+        } else if (data.status === 'completed') {
+            stopAnalysisUpdates();
+            analysisResults.endTime = new Date();
+            
+            // IMPORTANT: Update stats with final values before showing report
+            updateStats(data);
+            
+            // Set progress to 100%
+            progressFill.style.width = '100%';
+            progressText.textContent = '100%';
+            
+            // Terminal completion logs
+            addLog('═══════════════════════════════════════════════', 'success');
+            addLog('✓ Analysis completed successfully!', 'success');
+            addLog(`Total Reps: ${data.reps || 0}`, 'success');
+            addLog(`Average Score: ${data.avg_form_score || data.form_score || '--'}/100`, 'success');
+            addLog(`Grade: ${data.grade || '--'}`, 'success');
+            setTerminalStatus('Completed', 'success');
+            
+            // Check if processed video with skeleton is available
+            if (data.has_processed_video && data.processed_video_url) {
+                addLog('Loading processed video with skeleton overlay...', 'processing');
+                addFeedback('success', 'Analysis completed! Loading video with skeleton overlay...');
+                
+                // Replace video source with processed video
+                videoPlayer.src = data.processed_video_url;
+                videoPlayer.load();
+                videoPlayer.play();
+                
+                addLog('Video with skeleton overlay loaded.', 'success');
+                addFeedback('info', '🦴 Video with skeleton overlay is now playing');
+            } else {
+                addFeedback('success', 'Analysis completed!');
+            }
+            
+            showReport(data);
+            stopAnalysis();
+            
+        } else if (data.status === 'error') {
+            stopAnalysisUpdates();
+            addLog(`✗ Analysis error: ${data.error}`, 'error');
+            setTerminalStatus('Error', 'error');
+            addFeedback('error', `Analysis error: ${data.error}`);
+            stopAnalysis();
+        }
     }
     
     async function sendFrameForAnalysis(videoId) {
@@ -529,10 +567,7 @@ document.addEventListener('DOMContentLoaded', function() {
     function stopAnalysis() {
         isAnalyzing = false;
         lastProgress = 0;  // Reset progress tracker
-        if (analysisInterval) {
-            clearInterval(analysisInterval);
-            analysisInterval = null;
-        }
+        stopAnalysisUpdates();
         
         videoPlayer.pause();
         analyzeBtn.disabled = false;
@@ -0,0 +1,176 @@
+"""
+Test script for the asyncio (ASGI) serving mode
+"""
+
+import sys
+import os
+import asyncio
+import json
+import threading
+import time
+
+from flask import Flask, Response, jsonify, request
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.async_server import AsyncServer
+
+
+def make_flask_app():
+    app = Flask(__name__)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return jsonify({'json': request.json, 'query': request.args.get('q')})
+
+    @app.route('/endless')
+    def endless():
+        def chunks():
+            try:
+                for i in range(100000):
+                    time.sleep(0.001)
+                    yield f"chunk {i}\r\n".encode()
+            finally:
+                app.config['endless_closed'] = True
+        return Response(chunks(), mimetype='text/plain')
+
+    return app
+
+
+def frame_source():
+    """Slow generator standing in for capture + pose + JPEG encode"""
+    for i in range(1000):
+        time.sleep(0.01)
+        yield f"--frame {i}\r\n".encode()
+
+
+async def call(server, path, method='GET', body=b'', headers=(), query=b'', max_chunks=None, timeout=2.0):
+    """Run one request against the ASGI app, collecting the response"""
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query,
+             'headers': [(b'content-length', str(len(body)).encode())] + list(headers)}
+    disconnect = asyncio.Event()
+    received = asyncio.Queue()
+    await received.put({'type': 'http.request', 'body': body, 'more_body': False})
+    response = {'chunks': []}
+
+    async def receive():
+        if not received.empty():
+            return await received.get()
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = dict(message['headers'])
+        elif message.get('body'):
+            response['chunks'].append(message['body'])
+            if max_chunks and len(response['chunks']) >= max_chunks:
+                disconnect.set()
+
+    await asyncio.wait_for(server(scope, receive, send), timeout)
+    return response
+
+
+def test_wsgi_routes_served():
+    async def run():
+        server = AsyncServer(make_flask_app())
+        response = await call(server, '/echo', 'POST', body=b'{"a": 1}', query=b'q=x',
+                              headers=[(b'content-type', b'application/json')])
+        assert response['status'] == 200
+        assert json.loads(b''.join(response['chunks'])) == {'json': {'a': 1}, 'query': 'x'}
+        missing = await call(server, '/nope')
+        assert missing['status'] == 404
+
+    asyncio.run(run())
+    print("\n✅ Flask routes are served through the WSGI bridge")
+    return True
+
+
+def test_wsgi_streaming_route():
+    async def run():
+        flask_app = make_flask_app()
+        server = AsyncServer(flask_app)
+        start = time.perf_counter()
+        response = await call(server, '/endless', max_chunks=3, timeout=3.0)
+        assert time.perf_counter() - start < 1.0, "Chunks arrive while the generator runs"
+        assert response['chunks'] == [b'chunk 0\r\n', b'chunk 1\r\n', b'chunk 2\r\n']
+        for _ in range(100):
+            if flask_app.config.get('endless_closed'):
+                break
+            await asyncio.sleep(0.01)
+        assert flask_app.config.get('endless_closed'), "The generator is closed when the client leaves"
+
+    asyncio.run(run())
+    print("✅ Streaming Flask responses are sent chunk by chunk")
+    return True
+
+
+def test_streams_share_one_producer():
+    async def run():
+        server = AsyncServer(make_flask_app(), frame_source=frame_source)
+        threads_before = threading.active_count()
+        streams = [call(server, '/video_feed', max_chunks=5) for _ in range(50)]
+
+        # A status request is not held up by the open streams
+        start = time.perf_counter()
+        responses = await asyncio.gather(*streams, call(server, '/echo', 'POST', body=b'null',
+                                                        headers=[(b'content-type', b'application/json')]))
+        assert responses[-1]['status'] == 200
+        elapsed = time.perf_counter() - start
+        print(f"\n50 streams x 5 frames in {elapsed:.2f}s, stats {server.get_stats()['video_feed']}")
+
+        for response in responses[:-1]:
+            assert response['headers'][b'content-type'].startswith(b'multipart/x-mixed-replace')
+            assert len(response['chunks']) == 5
+        assert server.frames.get_stats()['published'] < 50, "Streams should share the same frames"
+        assert threading.active_count() - threads_before <= 3
+        assert server.frames.get_stats()['subscribers'] == 0
+
+    asyncio.run(run())
+    print("✅ Many streams are served from one frame producer")
+    return True
+
+
+def test_status_and_job_events():
+    status = {'exercise_running': True, 'current_reps': 0}
+    jobs = {'v1': {'status': 'processing', 'progress': 0}}
+
+    async def run():
+        server = AsyncServer(make_flask_app(), status_source=lambda: dict(status),
+                             job_source=jobs.get, status_interval=0.02)
+
+        async def change():
+            for reps in (1, 2):
+                await asyncio.sleep(0.1)
+                status['current_reps'] = reps
+            for progress in (50, 100):
+                await asyncio.sleep(0.1)
+                jobs['v1'] = {'status': 'processing' if progress < 100 else 'completed', 'progress': progress}
+
+        changer = asyncio.ensure_future(change())
+        status_events, job_events = await asyncio.gather(
+            call(server, '/events/status', max_chunks=3),
+            call(server, '/events/video/v1'))
+        await changer
+
+        reps = [json.loads(c[len(b'data: '):])['current_reps'] for c in status_events['chunks']]
+        assert reps == [0, 1, 2], "Status is pushed once per change"
+        assert status_events['headers'][b'content-type'] == b'text/event-stream'
+
+        progress = [json.loads(c[len(b'data: '):]) for c in job_events['chunks'] if c.startswith(b'data')]
+        assert progress[-1] == {'status': 'completed', 'progress': 100}, "Job stream ends after completion"
+
+        unknown = await call(server, '/events/video/missing')
+        assert json.loads(unknown['chunks'][0][len(b'data: '):])['status'] == 'not_found'
+
+    asyncio.run(run())
+    print("✅ Status and upload progress are pushed as server-sent events")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_wsgi_routes_served, test_wsgi_streaming_route, test_streams_share_one_producer,
+                 test_status_and_job_events):
+        test()
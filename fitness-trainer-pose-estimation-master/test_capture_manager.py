@@ -0,0 +1,146 @@
+"""
+Test script for multi-camera stations sharing one inference service
+"""
+
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from exercises.loader import load_exercise
+from pose_estimation.inference_service import PoseInferenceService
+from pose_estimation.landmarks import landmarks_from_array
+from pose_estimation.synthetic import exercise_sequence
+from utils.capture_manager import CaptureManager, parse_stations
+from utils.frame_source import SyntheticSource
+from utils.metrics import MetricsRegistry, stage_metrics
+
+
+class SourceEstimator:
+    """Returns the pose the station's synthetic source drew for its latest frame"""
+
+    def __init__(self, source, delay=0.005):
+        self.source = source
+        self.delay = delay
+        self.calls = 0
+
+    def estimate_pose(self, frame, exercise_name):
+        self.calls += 1
+        time.sleep(self.delay)
+        pose = self.source.poses[(self.source.frames_read - 1) % len(self.source.poses)]
+        return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmarks_from_array(pose)))
+
+    def close(self):
+        pass
+
+
+def make_manager(station_ids, registry=None, rep_sink=None):
+    poses = exercise_sequence(load_exercise('squat'), 120, frame_shape=(120, 160))
+    sources = {sid: SyntheticSource(poses, 160, 120, speed=4.0) for sid in station_ids}
+    estimators = {}
+
+    def factory(session_id, frame):
+        estimators[session_id] = SourceEstimator(sources[session_id.split(':', 1)[1]])
+        return estimators[session_id]
+
+    stage_factory = (lambda sid: stage_metrics(registry, f'station:{sid}')) if registry else None
+    manager = CaptureManager(PoseInferenceService(factory, num_workers=1), stage_factory, rep_sink)
+    for sid in station_ids:
+        manager.add(sid, sources[sid])
+    return manager, estimators
+
+
+def wait_for(condition, timeout=20.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_stations_count_independently():
+    saved = []
+    manager, estimators = make_manager(['a', 'b'], rep_sink=lambda *call: saved.append(call))
+    try:
+        assert manager.get('a').start_exercise('squat', sets=1, reps=2)['success']
+        assert manager.get('b').start_exercise('squat', sets=2, reps=2)['success']
+        assert not manager.get('b').start_exercise('not_an_exercise')['success']
+
+        assert wait_for(lambda: not manager.get('a').exercise_running), "Station a finishes its single set"
+        assert wait_for(lambda: not manager.get('b').exercise_running), "Station b finishes both sets"
+        assert manager.get('a').sets_completed == 1 and manager.get('b').sets_completed == 2
+
+        calls = [estimators['station:a'].calls, estimators['station:b'].calls]
+        assert min(calls) > 0
+        status = manager.get('b').get_status()
+        assert status['station'] == 'b' and status['exercise'] == 'squat' and not status['exercise_running']
+
+        reps = sum(len(call[1]) for call in saved)
+        assert reps == 2 + 4, f"Every rep reaches the telemetry sink ({reps})"
+        assert all(call[0] == 'squat' for call in saved) and sum(call[2] for call in saved) == 2, \
+            "One flush per finished workout"
+    finally:
+        manager.close()
+    print("✅ Stations run their own engines on a shared inference service")
+    return True
+
+
+def test_fair_inference():
+    manager, estimators = make_manager(['a', 'b', 'c'])
+    try:
+        for station in manager:
+            station.start_exercise('squat', sets=100, reps=100)
+        time.sleep(1.5)
+        calls = [estimators[f'station:{sid}'].calls for sid in 'abc']
+    finally:
+        manager.close()
+    assert min(calls) > 0 and max(calls) <= min(calls) * 1.5 + 2, f"Inference shared fairly: {calls}"
+    print(f"✅ Inference is shared fairly between cameras {calls}")
+    return True
+
+
+def test_mjpeg_and_stats():
+    registry = MetricsRegistry()
+    manager, _ = make_manager(['front'], registry)
+    try:
+        station = manager.get('front')
+        station.start_exercise('squat', sets=100, reps=100)
+        frames = station.frames_mjpeg()
+        chunks = [next(frames) for _ in range(3)]
+        assert all(c.startswith(b'--frame\r\nContent-Type: image/jpeg') for c in chunks)
+        assert station.viewers == 1
+        frames.close()
+        assert station.viewers == 0
+
+        assert wait_for(lambda: station.fps > 0)
+        stats = manager.get_stats()[0]
+        assert stats['running'] and stats['frames'] > 0 and stats['latency_ms']['p50'] > 0
+        text = registry.render()
+        assert 'pipeline="station:front",stage="frame_latency"' in text
+        assert 'pipeline="station:front",stage="estimate_pose"' in text
+    finally:
+        manager.close()
+    assert not manager.get_stats()
+    print("✅ Stations stream MJPEG and report fps and latency")
+    return True
+
+
+def test_parse_stations():
+    assert parse_stations('front=0, back=clips/a.mp4,') == {'front': '0', 'back': 'clips/a.mp4'}
+    assert parse_stations('') == {}
+    try:
+        parse_stations('front')
+    except ValueError:
+        print("✅ CAMERA_STATIONS is parsed")
+        return True
+    raise AssertionError("Expected ValueError")
+
+
+if __name__ == "__main__":
+    for test in (test_stations_count_independently, test_fair_inference, test_mjpeg_and_stats,
+                 test_parse_stations):
+        test()
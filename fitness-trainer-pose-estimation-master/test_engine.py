@@ -186,6 +186,97 @@ def test_config_validation():
     return True
 
 
+def test_status_snapshot():
+    """Yayınlanan durum snapshot'larını test et."""
+    import threading
+    from exercises.engine import ExerciseEngine
+    from pose_estimation.landmarks import landmarks_from_array
+    from test_landmark_recorder import squat_pose
+    
+    print("\n" + "=" * 60)
+    print("TEST: Status Snapshots")
+    print("=" * 60)
+    
+    frame_times = iter(range(0, 100000, 200))
+    engine = ExerciseEngine(clock=lambda: next(frame_times) / 1000.0)
+    engine.set_exercise("squat")
+    first = engine.get_snapshot()
+    first_status = dict(first.status)
+    
+    # Frame döngüsü çalışırken başka bir thread snapshot okur
+    seen = []
+    torn = []
+    done = threading.Event()
+    
+    def reader():
+        while not done.is_set():
+            snapshot = engine.get_snapshot()
+            if snapshot.counter != snapshot.status["counter"]:
+                torn.append(snapshot)
+            seen.append(snapshot.version)
+    
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for _ in range(20):
+        for angle in [175, 150, 120, 90, 80, 100, 140, 175]:
+            engine.process_landmarks(landmarks_from_array(squat_pose(angle)), (480, 640))
+    done.set()
+    thread.join()
+    
+    last = engine.get_snapshot()
+    assert not torn, f"Torn snapshots: {torn[:3]}"
+    assert last.counter == 20, f"Expected 20 reps, got {last.counter}"
+    assert first.version < last.version <= first.version + 160, "At most one version per processed frame"
+    assert seen == sorted(seen), "Versions only increase"
+    
+    # Aynı pose tekrar işlenince durum değişmez, versiyon da artmaz
+    pose = landmarks_from_array(squat_pose(175))
+    engine.process_landmarks(pose, (480, 640))
+    unchanged = engine.get_snapshot()
+    engine.process_landmarks(pose, (480, 640))
+    engine.publish_status()
+    assert engine.get_snapshot() is unchanged, "Unchanged status keeps its version"
+    assert first.status == first_status, "Published snapshots are never modified"
+    
+    engine.publish_status({"exercise_running": True})
+    assert engine.get_snapshot().version == unchanged.version + 1, "A session change is a new version"
+    engine.reset()
+    assert engine.get_snapshot().counter == 0
+    assert engine.get_snapshot().session == {"exercise_running": True}, "Session fields are kept"
+    
+    print(f"\n✅ {len(seen)} reads, versions {first.version}..{last.version}")
+    return True
+
+
+def test_synthetic_reps():
+    """Her tekrar egzersizinin sentetik hareketle tekrar saydığını test et."""
+    from pose_estimation.synthetic import FRAME_SHAPE, exercise_sequence
+    from exercises.engine import ExerciseEngine
+    from pose_estimation.landmarks import landmarks_from_array
+    
+    print("\n" + "=" * 60)
+    print("TEST: Synthetic Repetitions")
+    print("=" * 60)
+    
+    counts = {}
+    for name in get_available_exercises():
+        frame = [0]
+        engine = ExerciseEngine(clock=lambda: frame[0] / 30)
+        engine.set_exercise(name)
+        if isinstance(engine.exercise, DurationExercise):
+            continue
+        # 10 saniye, 2 saniyelik tekrarlar
+        for pose in exercise_sequence(engine.exercise, 300):
+            frame[0] += 1
+            engine.process_landmarks(landmarks_from_array(pose), FRAME_SHAPE)
+        counts[name] = engine.get_counter()
+    
+    no_reps = [name for name, reps in counts.items() if reps == 0]
+    assert not no_reps, f"No reps counted for: {no_reps}"
+    print(f"\n✅ {len(counts)} repetition exercises count reps: {counts}")
+    return True
+
+
 def main():
     """Tüm testleri çalıştır."""
     print("\n" + "🏋️ " * 20)
@@ -200,6 +291,8 @@ def main():
         ("Duration Exercise", test_duration_exercise),
         ("Feedback Rules", test_feedback_rules),
         ("Config Validation", test_config_validation),
+        ("Status Snapshots", test_status_snapshot),
+        ("Synthetic Repetitions", test_synthetic_reps),
     ]
     
     results = []
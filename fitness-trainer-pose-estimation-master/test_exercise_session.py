@@ -0,0 +1,52 @@
+"""
+Test script for landmark-fed exercise sessions (client-side pose mode)
+"""
+
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from exercises.session import ExerciseSession
+from pose_estimation.landmarks import landmarks_from_array
+from test_landmark_recorder import squat_pose
+
+REP_ANGLES = [175, 170, 150, 120, 95, 80, 80, 100, 140, 170, 175]
+
+
+def test_sets_roll_over_on_client_time():
+    session = ExerciseSession("squat", sets_goal=2, rep_goal=1)
+    timestamp = 1000.0
+
+    # Client timestamps 0.2 s apart: reps pass min_rep_duration even if requests arrive in a burst
+    statuses = []
+    for angle in REP_ANGLES * 2:
+        statuses.append(session.process_landmarks(landmarks_from_array(squat_pose(angle)), (480, 640), timestamp))
+        timestamp += 0.2
+
+    print(f"\nFinal status: {statuses[-1]}")
+    assert sum(1 for s in statuses if s.get("counted")) == 2
+    assert statuses[-1]["sets_completed"] == 2
+    assert not statuses[-1]["exercise_running"]
+
+    summary = session.finish()
+    assert summary["sets"] == 2
+    assert len(summary["rep_telemetry"]) == 2
+    print("✅ Session counts reps and completes sets from streamed landmarks")
+    return True
+
+
+def test_missing_person_keeps_state():
+    session = ExerciseSession("squat", sets_goal=1, rep_goal=5)
+    session.process_landmarks(landmarks_from_array(squat_pose(175)), (480, 640), 0.0)
+    status = session.process_landmarks(None, (480, 640), 0.1)
+    assert status["exercise_running"] and status["current_reps"] == 0
+    assert "counted" not in status
+    print("✅ Frames without a person only report status")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_sets_roll_over_on_client_time, test_missing_person_keeps_state):
+        test()
@@ -0,0 +1,145 @@
+"""
+Test script for the live frame sources (CAMERA_SOURCE)
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.frame_source import FileSource, SyntheticSource, open_frame_source
+from pose_estimation.landmark_recorder import LandmarkRecorder
+from pose_estimation.landmarks import landmarks_from_array
+from test_landmark_recorder import squat_pose
+
+
+def write_clip(path, frames, fps=60):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    writer.release()
+
+
+def test_video_file_loops_paced():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'clip.mp4')
+        write_clip(path, 5)
+        source = open_frame_source(path)
+        assert isinstance(source, FileSource) and source.isOpened()
+        assert (source.width, source.height, source.fps) == (64, 48, 60)
+
+        start = time.perf_counter()
+        frames = [source.read_frame() for _ in range(12)]
+        elapsed = time.perf_counter() - start
+        source.release()
+        assert all(f is not None for f in frames), "The file starts over at the end"
+        assert [f.index for f in frames] == list(range(12))
+        assert elapsed >= 11 / 60 * 0.9, f"Frames are paced at the file's frame rate ({elapsed:.3f}s)"
+        steps = np.diff([f.timestamp for f in frames])
+        assert np.allclose(steps, 1 / 60, atol=0.005), "Timestamps follow the source clock"
+
+        source = open_frame_source(path, speed=0)
+        buffer = np.empty((48, 64, 3), dtype=np.uint8)
+        success, frame = source.read(buffer)
+        source.release()
+        assert success and frame is buffer, "A caller's buffer is decoded into in place"
+    print("✅ Video file source loops at its own frame rate with capture timestamps")
+    return True
+
+
+def test_accelerated_and_unpaced():
+    poses = np.stack([squat_pose(90 + i) for i in range(10)])
+    for speed, max_seconds in ((4.0, 29 / 120 * 1.5), (0, 0.5)):
+        source = SyntheticSource(poses, 160, 120, fps=30, speed=speed)
+        start = time.perf_counter()
+        for _ in range(30):
+            assert source.read_frame() is not None
+        elapsed = time.perf_counter() - start
+        assert elapsed < max_seconds, f"speed={speed} took {elapsed:.3f}s"
+    print("✅ Sources play accelerated or unpaced")
+    return True
+
+
+def test_frame_pool_reuse():
+    poses = np.stack([squat_pose(90 + i * 10) for i in range(6)])
+    source = SyntheticSource(poses, 160, 120, speed=0)
+    frames = [source.read_frame() for _ in range(source.pool.size + 1)]
+    buffers = [f.image for f in frames]
+    assert all(b.shape == (120, 160, 3) for b in buffers)
+    assert len({id(b) for b in buffers[:source.pool.size]}) == source.pool.size, "No buffer reused too early"
+    assert buffers[source.pool.size] is buffers[0], "Buffers are reused after a full cycle"
+
+    own = np.empty((120, 160, 3), dtype=np.uint8)
+    success, frame = source.read(own)
+    assert success and frame is own, "A caller's buffer is filled in place"
+    print("✅ Frames are captured into the pool without copies")
+    return True
+
+
+def test_landmark_log_and_synthetic_specs():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'session.plmk')
+        recorder = LandmarkRecorder(path, 'squat')
+        for i in range(10):
+            recorder.record(landmarks_from_array(squat_pose(90 + i * 5)), (240, 320), timestamp=1000 + i / 30)
+        recorder.close()
+
+        source = open_frame_source(path, speed=0)
+        assert (source.width, source.height) == (320, 240)
+        assert abs(source.fps - 30) < 1
+        frames = [source.read()[1].copy() for _ in range(11)]
+        assert not np.array_equal(frames[0], frames[5]), "The figure moves with the recording"
+        assert np.array_equal(frames[0], frames[10]), "Replay starts over after the last frame"
+
+    source = open_frame_source('synthetic:squat', speed=0)
+    assert source.get_info()['source'] == 'synthetic:squat'
+    assert source.read_frame().image.shape == (480, 640, 3)
+    print("✅ Landmark logs and synthetic:<exercise> specs draw stick figures")
+    return True
+
+
+def test_landmark_log_replay():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'session.plmk')
+        recorder = LandmarkRecorder(path, 'squat')
+        for i in range(10):
+            recorder.record(landmarks_from_array(squat_pose(90 + i * 5)), (240, 320), timestamp=1000 + i / 30)
+        recorder.close()
+
+        # Paced at the recorded frame rate
+        source = open_frame_source(path)
+        assert isinstance(source, SyntheticSource) and source.isOpened()
+        frames = [source.read_frame() for _ in range(6)]
+        source.release()
+        assert not source.isOpened()
+        assert frames[0].image.shape == (240, 320, 3)
+        steps = np.diff([f.timestamp for f in frames])
+        assert np.allclose(steps, 1 / 30, atol=0.01), f"Replayed at the recorded rate: {steps}"
+
+        # Without looping the replay ends after the last recorded frame
+        source = SyntheticSource.from_landmark_log(path, speed=0, loop=False)
+        frames = [source.read_frame() for _ in range(11)]
+        assert all(f is not None for f in frames[:10]) and frames[10] is None
+    print("✅ Landmark logs replay at their recorded size and frame rate")
+    return True
+
+
+def test_missing_file():
+    try:
+        open_frame_source('/nonexistent/clip.mp4')
+    except FileNotFoundError:
+        print("✅ Missing source file is reported")
+        return True
+    raise AssertionError("Expected FileNotFoundError")
+
+
+if __name__ == "__main__":
+    for test in (test_video_file_loops_paced, test_accelerated_and_unpaced, test_frame_pool_reuse,
+                 test_landmark_log_and_synthetic_specs, test_landmark_log_replay, test_missing_file):
+        test()
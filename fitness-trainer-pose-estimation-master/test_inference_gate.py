@@ -0,0 +1,74 @@
+"""
+Test script for motion- and presence-gated live inference
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pose_estimation.inference_gate import InferenceGate
+
+
+def frame_with_box(x):
+    frame = np.full((360, 640, 3), 30, dtype=np.uint8)
+    frame[100:260, x:x + 80] = 220
+    return frame
+
+
+def run(gate, frames, person_found):
+    """Feed frames, reporting person_found for every inferred one; returns the inferred indices"""
+    inferred = []
+    for i, frame in enumerate(frames):
+        if gate.should_infer(frame):
+            gate.record_result(person_found)
+            inferred.append(i)
+    return inferred
+
+
+def test_static_frames_are_gated():
+    gate = InferenceGate(max_static_frames=15)
+    still = frame_with_box(200)
+    inferred = run(gate, [still] * 46, person_found=True)
+    assert inferred == [0, 15, 30, 45], f"Still person is re-checked every 15 frames: {inferred}"
+    stats = gate.get_stats()
+    assert stats['gated_static_frames'] == 42 and stats['processed_frames'] == 4
+    assert stats['person_present']
+    print("✅ Still frames skip inference between periodic re-checks")
+    return True
+
+
+def test_motion_is_inferred():
+    gate = InferenceGate()
+    frames = [frame_with_box(100 + i * 20) for i in range(10)]
+    assert run(gate, frames, person_found=True) == list(range(10)), "Every moving frame is inferred"
+
+    # Sensor noise below pixel_threshold is not motion
+    noisy = frames[-1].astype(np.int16) + np.random.default_rng(0).integers(-5, 6, frames[-1].shape)
+    assert not gate.should_infer(np.clip(noisy, 0, 255).astype(np.uint8))
+    print("✅ Moving frames go through pose inference")
+    return True
+
+
+def test_backoff_while_nobody_in_view():
+    gate = InferenceGate(max_backoff_frames=8)
+    empty = np.full((360, 640, 3), 30, dtype=np.uint8)
+    inferred = run(gate, [empty] * 40, person_found=False)
+    assert inferred == [0, 2, 6, 14, 22, 30, 38], f"Detection backs off 2, 4, 8, 8, ... frames: {inferred}"
+    assert gate.get_stats()['gated_absent_frames'] == 40 - len(inferred)
+
+    # Someone walking in is tried right away
+    assert gate.should_infer(frame_with_box(300))
+    gate.record_result(True)
+    gate.reset()
+    assert gate.should_infer(empty) and gate.get_stats()['processed_frames'] == 1
+    print("✅ Detection backs off while nobody is in view")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_static_frames_are_gated, test_motion_is_inferred, test_backoff_while_nobody_in_view):
+        test()
@@ -0,0 +1,118 @@
+"""
+Test script for the shared, session-pinned pose inference service
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pose_estimation.inference_service import PoseInferenceService
+
+
+class FakeEstimator:
+    """Sleeps like a graph run (releasing the GIL) and records where it ran"""
+
+    def __init__(self, session_id, delay=0.02):
+        self.session_id = session_id
+        self.delay = delay
+        self.threads = set()
+        self.closed = False
+
+    def estimate_pose(self, frame, exercise_name):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return (self.session_id, frame)
+
+    def close(self):
+        self.closed = True
+
+    def get_model_info(self):
+        return {"model": "fake"}
+
+
+def make_service(num_workers, delay=0.02, **kwargs):
+    estimators = {}
+
+    def factory(session_id, frame):
+        estimators[session_id] = FakeEstimator(session_id, delay)
+        return estimators[session_id]
+
+    return PoseInferenceService(factory, num_workers=num_workers, **kwargs), estimators
+
+
+def run_sessions(service, sessions, frames_per_session):
+    def session_loop(session_id):
+        for i in range(frames_per_session):
+            assert service.estimate_pose(session_id, i, "squat") == (session_id, i)
+
+    threads = [threading.Thread(target=session_loop, args=(sid,)) for sid in sessions]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def test_sessions_pinned_and_parallel():
+    service, estimators = make_service(num_workers=4)
+    sessions = [f"s{i}" for i in range(4)]
+    elapsed = run_sessions(service, sessions, 10)
+    serial = 4 * 10 * 0.02
+    print(f"\n4 sessions x 10 frames: {elapsed:.2f}s (serial would be {serial:.2f}s)")
+
+    assert elapsed < serial * 0.6, "Sessions on different workers should run in parallel"
+    assert len(estimators) == 4
+    assert all(len(e.threads) == 1 for e in estimators.values()), "Each session stays on one worker"
+    assert len({next(iter(e.threads)) for e in estimators.values()}) == 4
+    assert service.get_model_info("s0") == {"model": "fake"}
+    service.shutdown()
+    print("✅ Sessions spread over workers and keep their estimator")
+    return True
+
+
+def test_stale_frames_are_replaced():
+    service, _ = make_service(num_workers=1, delay=0.05)
+    first = service.submit("cam", 0)
+    time.sleep(0.01)  # Worker is now busy with frame 0
+    stale = service.submit("cam", 1)
+    latest = service.submit("cam", 2)
+
+    assert first.result() == ("cam", 0)
+    assert latest.result() == ("cam", 2)
+    assert stale.cancelled()
+    assert service.get_stats()["per_worker"][0]["dropped_frames"] == 1
+    service.shutdown()
+    print("✅ Only the newest pending frame of a session is kept")
+    return True
+
+
+def test_round_robin_and_close():
+    service, estimators = make_service(num_workers=1, delay=0.005)
+    elapsed = run_sessions(service, ["a", "b", "c"], 5)
+    stats = service.get_stats()["per_worker"][0]
+    print(f"\nOne worker, 3 sessions: {elapsed:.2f}s, avg round {stats['avg_round']}")
+    assert stats["frames"] == 15
+    assert stats["avg_round"] > 1.5, "Sessions sharing a worker should take turns"
+
+    # A lone frame runs right away instead of waiting for the other sessions
+    start = time.perf_counter()
+    service.estimate_pose("b", 0)
+    assert time.perf_counter() - start < 0.005 + 0.01
+
+    service.close_session("a")
+    time.sleep(0.05)
+    assert estimators["a"].closed
+    service.shutdown()
+    print("✅ Shared worker serves its sessions in turn and releases closed ones")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_sessions_pinned_and_parallel, test_stale_frames_are_replaced,
+                 test_round_robin_and_close):
+        test()
@@ -0,0 +1,104 @@
+"""
+Test script for the binary landmark recorder and replay
+"""
+
+import sys
+import os
+import math
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pose_estimation.landmarks import landmarks_from_array
+from pose_estimation.landmark_recorder import LandmarkRecorder, LandmarkLogReader, replay_log
+
+
+def squat_pose(hip_angle):
+    """33 landmarks with the left shoulder-hip-knee angle set to hip_angle"""
+    pose = np.zeros((33, 4), dtype=np.float32)
+    pose[:, :2] = 0.5
+    pose[:, 3] = 0.9
+    hip = np.array([0.5, 0.6])
+    knee = hip + [0.0, 0.2]
+    theta = math.radians(hip_angle)
+    shoulder = hip + 0.2 * np.array([math.sin(theta), math.cos(theta)])
+    pose[11, :2] = shoulder
+    pose[23, :2] = hip
+    pose[25, :2] = knee
+    pose[27, :2] = knee + [0.0, 0.15]
+    return pose
+
+
+def test_round_trip():
+    path = os.path.join(tempfile.mkdtemp(), "session.plmk")
+    recorder = LandmarkRecorder(path, "squat", keyframe_interval=5)
+
+    rng = np.random.default_rng(0)
+    poses = [rng.uniform(0, 1, (33, 4)).astype(np.float32)]
+    for i in range(11):
+        poses.append(np.clip(poses[-1] + rng.normal(0, 0.002, (33, 4)), 0, 1).astype(np.float32))
+    poses[6] = None
+    poses[9][:, :3] += 0.5  # Too far to be a delta
+
+    for i, pose in enumerate(poses):
+        landmarks = landmarks_from_array(pose) if pose is not None else None
+        recorder.record(landmarks, (720, 1280), timestamp=recorder.start_time + i / 30)
+    recorder.close()
+
+    stats = recorder.get_stats()
+    print(f"\nRecorder: {stats}")
+    assert stats["frames"] == 12 and stats["dropped_frames"] == 0
+    assert stats["bytes_written"] < 12 * 33 * 4 * 4 / 2, "Should be well under half the float32 size"
+
+    reader = LandmarkLogReader(path)
+    assert reader.exercise_name == "squat" and reader.frame_shape == (720, 1280)
+    timestamps, landmarks = reader.read_all()
+    assert len(timestamps) == 12
+    assert abs(timestamps[3] - (reader.start_time + 0.1)) < 0.002
+    assert np.isnan(landmarks[6]).all()
+    for i, pose in enumerate(poses):
+        if pose is not None:
+            assert np.abs(landmarks[i, :, :3] - pose[:, :3]).max() < 1e-3
+            assert np.abs(landmarks[i, :, 3] - pose[:, 3]).max() < 0.01
+    print("✅ Landmarks survive quantization and delta encoding")
+    return True
+
+
+def test_truncated_log_is_readable():
+    path = os.path.join(tempfile.mkdtemp(), "session.plmk")
+    recorder = LandmarkRecorder(path, "squat")
+    for angle in (170, 150, 130):
+        recorder.record(landmarks_from_array(squat_pose(angle)), (480, 640))
+    recorder.close()
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 10)
+    assert len(list(LandmarkLogReader(path))) == 2
+    print("✅ A cut-off final record is skipped")
+    return True
+
+
+def test_replay_counts_on_recorded_time():
+    path = os.path.join(tempfile.mkdtemp(), "squat.plmk")
+    recorder = LandmarkRecorder(path, "squat")
+    angles = [175, 170, 150, 120, 95, 80, 80, 100, 140, 170, 175] * 2
+    for i, angle in enumerate(angles):
+        # 0.2 s per frame, so each rep is longer than min_rep_duration
+        recorder.record(landmarks_from_array(squat_pose(angle)), (480, 640),
+                        timestamp=recorder.start_time + i * 0.2)
+    recorder.close()
+
+    engine, results = replay_log(path)
+    print(f"\nReplayed {len(results)} frames, counter={engine.get_counter()}")
+    assert engine.get_counter() == 2
+    assert len(engine.drain_rep_telemetry()) == 2
+    print("✅ Replay reproduces the rep count")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_round_trip, test_truncated_log_is_readable, test_replay_counts_on_recorded_time):
+        test()
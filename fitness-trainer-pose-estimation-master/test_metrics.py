@@ -0,0 +1,98 @@
+"""
+Test script for the Prometheus metrics layer
+"""
+
+import sys
+import os
+import json
+import threading
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.metrics import MetricsRegistry, NULL_STAGES, process_rss_bytes, stage_metrics
+from exercises.engine import ExerciseEngine
+from pose_estimation.landmarks import landmarks_from_array
+from test_landmark_recorder import squat_pose
+
+
+def parse(text):
+    """Sample lines as {name{labels}: value}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_text_format():
+    registry = MetricsRegistry()
+    stages = stage_metrics(registry, 'live')
+    for seconds in (0.0004, 0.003, 0.003, 2.0):
+        stages.observe('capture', seconds)
+    jobs = registry.counter('fitness_video_jobs_total', 'Finished jobs', labels=('status',))
+    jobs.inc('completed')
+    jobs.inc('completed')
+    registry.gauge('fitness_active_sessions', 'Sessions', lambda: {('live',): 1, ('client',): 3}, labels=('kind',))
+    registry.gauge('process_resident_memory_bytes', 'RSS', process_rss_bytes)
+    registry.callback_counter('process_cpu_seconds_total', 'CPU time', lambda: sum(os.times()[:2]))
+    registry.gauge('broken', 'Raises on read', lambda: 1 / 0)
+
+    text = registry.render()
+    print(f"\n{text}")
+    samples = parse(text)
+    prefix = 'fitness_stage_duration_seconds'
+    labels = 'pipeline="live",stage="capture"'
+    assert samples[f'{prefix}_bucket{{{labels},le="0.0005"}}'] == 1
+    assert samples[f'{prefix}_bucket{{{labels},le="0.005"}}'] == 3, "Buckets are cumulative"
+    assert samples[f'{prefix}_bucket{{{labels},le="1"}}'] == 3
+    assert samples[f'{prefix}_bucket{{{labels},le="+Inf"}}'] == 4
+    assert samples[f'{prefix}_count{{{labels}}}'] == 4
+    assert abs(samples[f'{prefix}_sum{{{labels}}}'] - 2.0064) < 1e-9
+    assert samples['fitness_video_jobs_total{status="completed"}'] == 2
+    assert samples['fitness_active_sessions{kind="client"}'] == 3
+    assert samples['process_resident_memory_bytes'] > 1024 * 1024
+    assert 'broken' not in text, "A failing gauge is left out instead of failing the scrape"
+    assert '# TYPE fitness_stage_duration_seconds histogram' in text
+    assert '# TYPE process_resident_memory_bytes gauge' in text
+    assert '# TYPE process_cpu_seconds_total counter' in text and samples['process_cpu_seconds_total'] > 0
+    print("✅ Metrics render in the Prometheus text format")
+    return True
+
+
+def test_engine_stage_timings():
+    registry = MetricsRegistry()
+    stages = stage_metrics(registry, 'live')
+    engine = ExerciseEngine(stages=stages)
+    engine.set_exercise('squat')
+
+    # Concurrent observations from other threads are not lost
+    threads = [threading.Thread(target=lambda: [stages.observe('capture', 0.001) for _ in range(1000)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for angle in (175, 150, 120, 90, 120, 175):
+        engine.process_landmarks(landmarks_from_array(squat_pose(angle)), (480, 640))
+    for thread in threads:
+        thread.join()
+
+    exported = stages.export()
+    for stage in ('compute_angles', 'fsm_update', 'feedback'):
+        assert sum(exported[stage]['counts']) == 6, f"{stage} timed once per frame"
+    assert sum(exported['capture']['counts']) == 4000
+
+    # Bucket counts written by the video subprocess are merged into the web process
+    video = stage_metrics(registry, 'video')
+    video.merge(json.loads(json.dumps(exported)))
+    video.merge(exported)
+    assert sum(video.export()['feedback']['counts']) == 12
+
+    assert ExerciseEngine().stages is NULL_STAGES, "No timing without metrics"
+    print(f"\n✅ Engine stages timed: {sorted(exported)}")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_text_format, test_engine_stage_timings):
+        test()
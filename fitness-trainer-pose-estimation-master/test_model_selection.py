@@ -0,0 +1,86 @@
+"""
+Test script for latency-budgeted pose model selection
+"""
+
+import sys
+import os
+import json
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pose_estimation.model_selection import LatencyGovernor, load_host_benchmark, select_complexity
+
+HOST_LATENCIES = {0: 12.0, 1: 25.0, 2: 70.0}
+
+
+def test_select_complexity_by_budget():
+    assert select_complexity(HOST_LATENCIES, 100) == 2, "Heavy fits a generous budget"
+    assert select_complexity(HOST_LATENCIES, 40) == 1
+    assert select_complexity(HOST_LATENCIES, 25) == 1, "The budget is inclusive"
+    assert select_complexity(HOST_LATENCIES, 15) == 0
+    assert select_complexity(HOST_LATENCIES, 5) == 0, "Lite when nothing fits"
+    assert select_complexity({}, 40) == 0
+    print("✅ The most accurate model within the budget is chosen")
+    return True
+
+
+def feed(governor, latency_ms, frames):
+    """Observe frames at a fixed latency; returns (frame index, new complexity) of the first switch"""
+    for i in range(frames):
+        switch = governor.observe(latency_ms)
+        if switch is not None:
+            return i, switch
+    return None
+
+
+def test_governor_steps_down_on_drift():
+    governor = LatencyGovernor(40, 1, HOST_LATENCIES, patience=30, cooldown=90)
+    assert feed(governor, 30, 200) is None, "Within budget nothing changes"
+
+    # Several uploads slow the host down: 80 ms per frame
+    index, switch = feed(governor, 80, 400)
+    assert switch == 0, "Steps down to Lite"
+    assert index >= 30, f"Short spikes are tolerated ({index} frames)"
+
+    governor.record_choice(0, "latency drift")
+    assert feed(governor, 80, 89) is None, "Cooldown after a switch"
+    assert feed(governor, 80, 200) is None, "Lite is the lowest model"
+    assert governor.history[-1]['reason'] == "latency drift"
+    print(f"✅ Sustained latency over budget steps down after {index} frames")
+    return True
+
+
+def test_governor_steps_up_on_headroom():
+    governor = LatencyGovernor(40, 0, HOST_LATENCIES, patience=30, cooldown=90)
+    # Lite at its host latency: Full is expected at 25 ms, within budget
+    index, switch = feed(governor, 12, 1000)
+    assert switch == 1 and index + 1 >= 90 + 4 * 30 - 1, f"Steps up after cooldown and headroom ({index} frames)"
+
+    # From Full, Heavy (70 ms) never fits the 40 ms budget
+    governor.record_choice(1, "latency headroom")
+    assert feed(governor, 15, 1000) is None, "No step up when the next model would not fit"
+    print("✅ Clear headroom steps up only when the next model fits")
+    return True
+
+
+def test_cached_benchmark():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'benchmark.json')
+        entry = {'measured_at': time.time(), 'latencies_ms': {str(c): ms for c, ms in HOST_LATENCIES.items()}}
+        with open(path, 'w') as f:
+            json.dump({'640': entry, '320': dict(entry, measured_at=0)}, f)
+        assert load_host_benchmark(path, 640) == HOST_LATENCIES
+        assert load_host_benchmark(path, 320) is None, "Stale benchmarks are measured again"
+        assert load_host_benchmark(path, 1280) is None
+        assert load_host_benchmark(os.path.join(tmp, 'missing.json'), 640) is None
+    print("✅ Host benchmarks are reused from the cache while fresh")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_select_complexity_by_budget, test_governor_steps_down_on_drift,
+                 test_governor_steps_up_on_headroom, test_cached_benchmark):
+        test()
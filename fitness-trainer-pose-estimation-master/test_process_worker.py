@@ -0,0 +1,132 @@
+"""
+Test script for the out-of-process pose worker and its shared-memory ring
+"""
+
+import sys
+import os
+import subprocess
+import tempfile
+import textwrap
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pose_estimation.landmarks import Landmark, NUM_LANDMARKS
+from pose_estimation.process_worker import ProcessPoseEstimator
+
+
+class FakeEstimator:
+    """Runs in the worker: reports the frame's first pixel and pid as landmarks"""
+
+    def __init__(self, model_complexity=1, delay=0.0, **kwargs):
+        self.model_complexity = model_complexity
+        self.delay = delay
+
+    def process(self, frame):
+        time.sleep(self.delay)
+        if not frame.any():
+            return SimpleNamespace(pose_landmarks=None)
+        value = frame[0, 0, 0] / 255.0
+        landmark = [Landmark(value, frame.shape[0] / 10000, os.getpid() / 1e7, 1.0)] * NUM_LANDMARKS
+        return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmark))
+
+    def close(self):
+        pass
+
+
+def make_estimator(**kwargs):
+    return ProcessPoseEstimator(slots=2, max_frame_shape=(120, 160, 3), estimator_class=FakeEstimator,
+                                startup_timeout=60, **kwargs)
+
+
+def test_landmarks_from_worker_process():
+    estimator = make_estimator(model_complexity=2)
+    try:
+        frame = np.full((100, 160, 3), 51, dtype=np.uint8)
+        results = estimator.process(frame)
+        landmarks = results.pose_landmarks.landmark
+        assert len(landmarks) == NUM_LANDMARKS
+        assert abs(landmarks[0].x - 0.2) < 1e-6
+        assert abs(landmarks[0].y - 0.01) < 1e-6
+        assert round(landmarks[0].z * 1e7) != os.getpid(), "Inference should run in another process"
+
+        assert estimator.process(np.zeros((100, 160, 3), dtype=np.uint8)).pose_landmarks is None
+        info = estimator.get_model_info()
+        assert info["model_complexity"] == 2 and info["process"] != os.getpid()
+    finally:
+        estimator.close()
+    print("\n✅ Landmarks come back from the worker process")
+    return True
+
+
+def test_frame_buffer_zero_copy():
+    estimator = make_estimator()
+    try:
+        buffer = estimator.frame_buffer((120, 160, 3))
+        assert buffer is not None and estimator._slot_of(buffer) is not None
+        buffer[...] = 102
+        results = estimator.process(buffer)
+        assert abs(results.pose_landmarks.landmark[0].x - 0.4) < 1e-6
+
+        # Slots are reused: the held one is released on the next call
+        for value in (10, 20, 30):
+            buffer = estimator.frame_buffer((120, 160, 3))
+            buffer[...] = value
+            assert abs(estimator.process(buffer).pose_landmarks.landmark[0].x - value / 255) < 1e-6
+
+        assert estimator.frame_buffer((480, 640, 3)) is None, "Frames larger than a slot need a fallback"
+    finally:
+        estimator.close()
+    print("✅ Frames captured into the ring reach the worker without a copy")
+    return True
+
+
+def test_stuck_worker_is_restarted():
+    estimator = make_estimator(delay=1.0, timeout=0.3)
+    try:
+        frame = np.full((100, 160, 3), 51, dtype=np.uint8)
+        first_pid = estimator._process.pid
+        assert estimator.process(frame).pose_landmarks is None
+        assert estimator.timeouts == 1
+        assert estimator._process.pid != first_pid
+    finally:
+        estimator.close()
+    print("✅ A worker that misses its deadline is replaced")
+    return True
+
+
+def test_server_script_not_rerun_in_worker():
+    project_root = os.path.dirname(os.path.abspath(__file__))
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {project_root!r})
+        print("module setup", __name__, flush=True)
+        import numpy as np
+        from pose_estimation.process_worker import ProcessPoseEstimator
+        from test_process_worker import FakeEstimator
+        if __name__ == "__main__":
+            estimator = ProcessPoseEstimator(slots=2, max_frame_shape=(120, 160, 3),
+                                             estimator_class=FakeEstimator, startup_timeout=60)
+            assert estimator.process(np.full((100, 160, 3), 51, dtype=np.uint8)).pose_landmarks
+            estimator.close()
+    """)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'server.py')
+        with open(path, 'w') as f:
+            f.write(script)
+        result = subprocess.run([sys.executable, path], capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines() == ["module setup __main__"], \
+        f"The worker must not re-run the server script: {result.stdout!r}"
+    print("✅ The worker process does not import the server script")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_landmarks_from_worker_process, test_frame_buffer_zero_copy, test_stuck_worker_is_restarted,
+                 test_server_script_not_rerun_in_worker):
+        test()
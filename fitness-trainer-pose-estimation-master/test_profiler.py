@@ -0,0 +1,93 @@
+"""
+Test script for the sampling profiler
+"""
+
+import sys
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils import profiler
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Stand-in for a video job: busy in a recognizable function until killed
+SUBPROCESS_SCRIPT = """
+import sys, time
+sys.path.insert(0, {root!r})
+from utils.profiler import install_signal_handler
+time.sleep(0.5)  # Slow imports (cv2, numpy) before the handler is installed
+install_signal_handler({path!r})
+
+def encode_frames():
+    while True:
+        sum(i * i for i in range(10000))
+
+print('ready', flush=True)
+encode_frames()
+"""
+
+
+def busy_eval(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_sample_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_eval, args=(stop,), name='frame-loop')
+    worker.start()
+    try:
+        stacks = profiler.sample(0.3, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    text = profiler.collapsed(stacks, prefix='web;')
+    print(f"\n{text.splitlines()[0]}")
+    busy = {s: n for s, n in stacks.items() if s.startswith('frame-loop;') and 'test_profiler.py:busy_eval' in s}
+    assert sum(busy.values()) >= 10, "The busy thread is sampled"
+    assert not any('utils/profiler.py:sample' in s for s in stacks), "The sampling thread skips itself"
+    assert profiler.parse_collapsed(text) == {f'web;{s}': n for s, n in stacks.items()}
+    print("✅ Thread stacks are sampled into collapsed stacks")
+    return True
+
+
+def test_profile_subprocess():
+    if profiler.PROFILE_SIGNAL is None:
+        print("\n⚠️  Skipped: no profiling signal on this platform")
+        return True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'job_results.json')
+        process = subprocess.Popen([sys.executable, '-c', SUBPROCESS_SCRIPT.format(root=PROJECT_ROOT, path=path)],
+                                   stdout=subprocess.PIPE, text=True)
+        try:
+            assert not profiler.request_subprocess_profile(process.pid, path, 0.3), "Not signalled before ready"
+            assert process.stdout.readline().strip() == 'ready' and process.poll() is None
+            assert profiler.subprocess_ready(path)
+            assert profiler.request_subprocess_profile(process.pid, path, 0.3)
+            stacks = profiler.collect_subprocess_profile(path, timeout=10)
+        finally:
+            process.kill()
+            process.wait()
+
+        assert stacks, "The subprocess wrote its profile"
+        top = stacks.most_common(1)[0][0]
+        print(f"\nTop stack: {top}")
+        assert top.startswith('MainThread;') and ':encode_frames' in top
+        assert os.listdir(tmp) == [os.path.basename(path) + '.profile_ready'], "Request and result files are removed"
+        assert not profiler.request_subprocess_profile(process.pid, path, 0.3), "Exited process"
+        profiler.remove_subprocess_files(path)
+        assert os.listdir(tmp) == []
+    print("✅ Video subprocesses profile themselves on signal")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_sample_threads, test_profile_subprocess):
+        test()
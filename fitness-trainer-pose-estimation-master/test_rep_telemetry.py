@@ -0,0 +1,120 @@
+"""
+Test script for the columnar per-rep telemetry store
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db.rep_telemetry import RepTelemetryStore
+
+
+def make_rep(ts, form_score, feedback=(), knee_min=90.0, side=None):
+    return {
+        "timestamp": ts,
+        "rep_index": 1,
+        "side": side,
+        "duration": 2.5,
+        "form_score": form_score,
+        "angle_min": {"knee_angle": knee_min},
+        "angle_max": {"knee_angle": 170.0},
+        "feedback": list(feedback),
+    }
+
+
+def test_query_filters_and_columns():
+    store = RepTelemetryStore(tempfile.mkdtemp(), flush_rows=2)
+    now = time.time()
+
+    store.append_reps("squat", [make_rep(now - 200 * 86400, 60), make_rep(now - 10, 80, ["knees_in"])])
+    store.append_reps("push_up", [make_rep(now - 5, 95)])
+    store.flush()
+
+    data = store.query(["ts", "form_score", "feedback"], exercise="squat", since=now - 180 * 86400)
+    print(f"\nSquat rows: {data}")
+    assert list(data["form_score"]) == [80]
+    assert store.feedback_names(data["feedback"][0]) == ["knees_in"]
+
+    assert len(store.query(["ts"])["ts"]) == 3
+    assert store.query(["min_knee_angle"], exercise="push_up")["min_knee_angle"][0] == 90.0
+    assert len(store.query(["ts"], exercise="lunge")["ts"]) == 0
+    print("✅ Queries return only matching rows and requested columns")
+    return True
+
+
+def test_compaction_keeps_rows():
+    root = tempfile.mkdtemp()
+    store = RepTelemetryStore(root, flush_rows=1000, compact_threshold=100)
+    now = time.time()
+
+    for i in range(6):
+        store.append_reps("squat", [make_rep(now - i, 70 + i)])
+        store.flush()
+    # An angle that only appears in a later segment reads back as NaN before it
+    store.append_reps("squat", [dict(make_rep(now, 90), angle_min={"hip_angle": 80.0})])
+    store.flush()
+    assert store.get_stats()["segments"] == 7
+
+    store.compact()
+    assert store.get_stats()["segments"] == 1
+
+    reopened = RepTelemetryStore(root)
+    data = reopened.query(["form_score", "min_hip_angle"])
+    assert sorted(data["form_score"]) == [70, 71, 72, 73, 74, 75, 90]
+    assert np.isnan(data["min_hip_angle"]).sum() == 6
+    assert len([n for n in os.listdir(root) if n.startswith("seg-")]) == 1
+    print("✅ Compaction merges segments without losing rows")
+    return True
+
+
+def test_flush_compaction_is_tiered():
+    store = RepTelemetryStore(tempfile.mkdtemp(), flush_rows=1000, compact_threshold=4)
+    written = []
+    write_segment = store._write_segment
+
+    def counting_write(columns):
+        written.append(len(columns['ts']))
+        return write_segment(columns)
+
+    store._write_segment = counting_write
+    now = time.time()
+    for i in range(64):
+        store.append_reps("squat", [make_rep(now - 64 + i, 70)])
+        store.flush()
+        if i == 19:
+            sizes = [s['rows'] for s in store._manifest['segments']]
+            assert sizes == [16, 4], f"Merged segments stay until a tier fills up: {sizes}"
+
+    assert [s['rows'] for s in store._manifest['segments']] == [64]
+    # 64 flushed rows, each rewritten once per tier (4 -> 16 -> 64)
+    assert sum(written) == 64 * 4, f"Rows written: {sum(written)}"
+    assert list(store.query(["ts"])["ts"]) == sorted(store.query(["ts"])["ts"])
+    print(f"✅ Flush compaction merges similar-sized segments ({sum(written)} rows written)")
+    return True
+
+
+def test_form_score_trend():
+    store = RepTelemetryStore(tempfile.mkdtemp())
+    now = time.time()
+    store.append_reps("squat", [make_rep(now - 30 * 86400, 60), make_rep(now - 30 * 86400 + 60, 70),
+                                make_rep(now - 60, 90)])
+    store.flush()
+
+    trend = store.form_score_trend("squat", days=180, bucket_days=7)
+    print(f"\nTrend: {trend}")
+    assert [b["avg_form_score"] for b in trend] == [65.0, 90.0]
+    assert [b["reps"] for b in trend] == [2, 1]
+    print("✅ Weekly form score trend")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_query_filters_and_columns, test_compaction_keeps_rows, test_flush_compaction_is_tiered,
+                 test_form_score_trend):
+        test()
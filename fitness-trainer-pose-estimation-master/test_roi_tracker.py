@@ -0,0 +1,89 @@
+"""
+Test script for the person ROI tracker used by PoseEstimator
+"""
+
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pose_estimation.roi_tracker import PersonRoiTracker
+
+
+class FakeLandmark:
+    def __init__(self, x, y, z=0.0, visibility=1.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+
+def make_person(x0, y0, x1, y1, count=33):
+    """Landmarks spread evenly over a box"""
+    landmarks = []
+    for i in range(count):
+        t = i / (count - 1)
+        landmarks.append(FakeLandmark(x0 + (x1 - x0) * t, y0 + (y1 - y0) * t))
+    return landmarks
+
+
+def test_crop_follows_person():
+    tracker = PersonRoiTracker(padding=0.25)
+    assert tracker.crop_rect((720, 1280)) is None
+
+    tracker.update(make_person(0.4, 0.3, 0.6, 0.9))
+    x0, y0, x1, y1 = tracker.crop_rect((720, 1280))
+    print(f"\nCrop: {(x0, y0, x1, y1)}")
+
+    # Crop contains the person and is much smaller than the frame
+    assert x0 < 0.4 * 1280 and x1 > 0.6 * 1280
+    assert y0 < 0.3 * 720 and y1 >= 0.9 * 720
+    assert (x1 - x0) * (y1 - y0) < 0.5 * 1280 * 720
+    print("✅ Crop wraps the tracked person")
+    return True
+
+
+def test_crop_is_stable_for_small_moves():
+    tracker = PersonRoiTracker(padding=0.3)
+    tracker.update(make_person(0.4, 0.3, 0.6, 0.9))
+    first = tracker.crop_box
+
+    tracker.update(make_person(0.41, 0.31, 0.61, 0.89))
+    assert tracker.crop_box == first, "Small moves should not shift the crop"
+
+    tracker.update(make_person(0.7, 0.3, 0.9, 0.9))
+    assert tracker.crop_box != first, "Large moves should re-center the crop"
+    print("✅ Crop only moves when the person nears its edge")
+    return True
+
+
+def test_tracking_lost_with_few_visible_landmarks():
+    tracker = PersonRoiTracker(min_visible=8)
+    landmarks = make_person(0.4, 0.3, 0.6, 0.9)
+    tracker.update(landmarks)
+    assert tracker.is_tracking
+
+    for lm in landmarks[5:]:
+        lm.visibility = 0.1
+    tracker.update(landmarks)
+    assert not tracker.is_tracking
+    print("✅ Falls back to full frame when the person is not visible")
+    return True
+
+
+def test_map_to_frame():
+    landmarks = [FakeLandmark(0.5, 0.5, 0.2), FakeLandmark(0.0, 1.0)]
+    PersonRoiTracker.map_to_frame(landmarks, (320, 180, 960, 540), (720, 1280))
+
+    assert abs(landmarks[0].x - 0.5) < 1e-9 and abs(landmarks[0].y - 0.5) < 1e-9
+    assert abs(landmarks[0].z - 0.1) < 1e-9
+    assert abs(landmarks[1].x - 0.25) < 1e-9 and abs(landmarks[1].y - 0.75) < 1e-9
+    print("✅ Crop coordinates map back to full-frame coordinates")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_crop_follows_person, test_crop_is_stable_for_small_moves,
+                 test_tracking_lost_with_few_visible_landmarks, test_map_to_frame):
+        test()
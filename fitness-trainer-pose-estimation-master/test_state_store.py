@@ -0,0 +1,165 @@
+"""
+Test script for state shared between worker processes (multi-worker deployments)
+"""
+
+import sys
+import os
+import multiprocessing
+import tempfile
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db.state_store import SharedSessionRegistry, SharedStateStore
+from db.rep_telemetry import RepTelemetryStore
+from db.workout_logger import WorkoutLogger
+from exercises.session import ExerciseSession
+from test_landmark_recorder import squat_pose
+from pose_estimation.landmarks import landmarks_from_array
+
+
+def _increment_counter(db_path, times, key='c', work_seconds=0.0):
+    store = SharedStateStore(db_path)
+
+    def increment(counter):
+        time.sleep(work_seconds)  # Engine work on the session
+        counter['value'] += 1
+
+    for _ in range(times):
+        store.update_object('counters', key, increment)
+
+
+def _append_reps(root_dir, worker, count):
+    store = RepTelemetryStore(root_dir, shared=True)
+    for i in range(count):
+        store.append_reps(f'exercise_{worker}', [{
+            'timestamp': 1000.0 + i, 'rep_index': i, 'duration': 2.0, 'form_score': 90.0,
+            'feedback': [f'feedback_{worker}_{i % 3}'], 'angle_min': {}, 'angle_max': {},
+        }])
+        store.flush()
+
+
+def run_processes(target, args_list):
+    ctx = multiprocessing.get_context('spawn')
+    processes = [ctx.Process(target=target, args=args) for args in args_list]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join(60)
+        assert p.exitcode == 0
+
+
+def test_objects_edited_by_many_processes():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'state.db')
+        store = SharedStateStore(db_path)
+        store.add_object('counters', 'c', {'value': 0})
+        run_processes(_increment_counter, [(db_path, 50)] * 3)
+        assert store.get_object('counters', 'c')['value'] == 150, "No update may be lost between workers"
+        assert store.update_object('counters', 'missing', lambda c: 1) is None
+    print("\n✅ Objects edited from 3 processes keep every update")
+    return True
+
+
+def test_sessions_do_not_wait_for_each_other():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'state.db')
+        store = SharedStateStore(db_path)
+        for key in 'abc':
+            store.add_object('counters', key, {'value': 0})
+        start = time.perf_counter()
+        run_processes(_increment_counter, [(db_path, 10, key, 0.2) for key in 'abc'])
+        elapsed = time.perf_counter() - start
+        assert all(store.get_object('counters', key)['value'] == 10 for key in 'abc')
+        assert elapsed < 2 * 10 * 0.2, f"Work on different sessions runs in parallel ({elapsed:.2f}s)"
+
+        before = store._conn().execute("SELECT updated_at FROM objects WHERE key = 'a'").fetchone()[0]
+        store.get_object('counters', 'a')
+        after = store._conn().execute("SELECT updated_at FROM objects WHERE key = 'a'").fetchone()[0]
+        assert before == after, "Reading does not touch the object"
+    print(f"✅ Updates to different sessions run in parallel ({elapsed:.2f}s for 3 x 2s of work)")
+    return True
+
+
+def test_claims_and_forwarded_commands():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SharedStateStore(os.path.join(tmp, 'state.db'), claim_ttl=0.3)
+        assert store.claim('camera', 'A')
+        assert not store.claim('camera', 'B'), "Camera is owned by A"
+        assert store.owner('camera') == 'A'
+
+        # Owner A serves commands sent by worker B
+        stop = threading.Event()
+
+        def owner_loop():
+            while not stop.is_set():
+                for command in store.take_commands('A'):
+                    store.complete_command(command['id'], {'echo': command['payload'], 'by': 'A'})
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=owner_loop)
+        thread.start()
+        assert store.call('A', 'start_exercise', {'reps': 5}) == {'echo': {'reps': 5}, 'by': 'A'}
+        stop.set()
+        thread.join()
+        assert store.call('A', 'stop_exercise', timeout=0.1) is None
+
+        time.sleep(0.35)
+        assert store.owner('camera') is None, "Claim expires without heartbeat"
+        assert store.claim('camera', 'B')
+    print("✅ Camera claim expires and commands reach the owning worker")
+    return True
+
+
+def test_client_session_shared_between_workers():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'state.db')
+        worker_a = SharedSessionRegistry(SharedStateStore(db_path), 'client_pose')
+        worker_b = SharedSessionRegistry(SharedStateStore(db_path), 'client_pose')
+        worker_a.add('s1', ExerciseSession('squat', sets_goal=1, rep_goal=5))
+
+        angles = [175, 170, 150, 120, 95, 80, 80, 100, 140, 170, 175]
+        for i, angle in enumerate(angles):
+            registry = worker_a if i % 2 else worker_b
+            status = registry.update('s1', lambda session: session.process_landmarks(
+                landmarks_from_array(squat_pose(angle)), (480, 640), 100.0 + i * 0.2))
+        assert status['current_reps'] == 1, "Frames alternating between workers count one rep"
+        assert len(worker_b) == 1
+        assert worker_b.pop('s1').frames == len(angles)
+        assert len(worker_a) == 0
+    print("✅ Client pose session state follows requests across workers")
+    return True
+
+
+def test_rep_telemetry_and_stats_from_many_processes():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'telemetry')
+        run_processes(_append_reps, [(root, w, 10) for w in range(3)])
+        store = RepTelemetryStore(root, shared=True)
+        assert store.get_stats()['rows'] == 30, "Segments from all workers are kept"
+        for worker in range(3):
+            data = store.query(['rep_index', 'feedback'], exercise=f'exercise_{worker}')
+            assert sorted(data['rep_index']) == list(range(10))
+            names = {n for mask in data['feedback'] for n in store.feedback_names(mask)}
+            assert names == {f'feedback_{worker}_{i}' for i in range(3)}, "Dictionary codes stay consistent"
+
+        db_path = os.path.join(tmp, 'workouts.db')
+        reader = WorkoutLogger(db_path, shared=True)
+        assert reader.get_cached_stats()['total_workouts'] == 0
+        writer = WorkoutLogger(db_path, shared=True)
+        writer.log_workout('squat', sets=2, reps=10, duration_seconds=60, form_score=90)
+        writer.flush()
+        assert reader.get_cached_stats()['total_workouts'] == 1, "Cached stats see other workers' workouts"
+        writer.close()
+        reader.close()
+    print("✅ Telemetry and workout stats stay consistent across workers")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_objects_edited_by_many_processes, test_sessions_do_not_wait_for_each_other,
+                 test_claims_and_forwarded_commands, test_client_session_shared_between_workers,
+                 test_rep_telemetry_and_stats_from_many_processes):
+        test()
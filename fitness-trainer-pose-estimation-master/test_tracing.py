@@ -0,0 +1,123 @@
+"""
+Test script for per-frame Chrome trace export
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.metrics import MetricsRegistry, stage_metrics
+from utils.tracing import Tracer
+from exercises.engine import ExerciseEngine
+from pose_estimation.landmarks import landmarks_from_array
+from test_landmark_recorder import squat_pose
+from video_processor import FramePrefetcher
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in returning blank frames with a decode delay"""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def read(self):
+        if self.frames == 0:
+            return False, None
+        self.frames -= 1
+        time.sleep(0.001)
+        return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def grab(self):
+        return self.read()[0]
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    stages = stage_metrics(MetricsRegistry(), 'live', tracer)
+    with stages.time('capture'), tracer.span('frame'):
+        pass
+    tracer.add('frame', 0.0, 1.0)
+    assert len(tracer) == 0
+    assert tracer.export()['traceEvents'] == []
+    print("\n✅ A disabled tracer records no spans")
+    return True
+
+
+def test_frame_spans_exported():
+    tracer = Tracer(capacity=1000, enabled=True)
+    stages = stage_metrics(MetricsRegistry(), 'live', tracer)
+    engine = ExerciseEngine(stages=stages)
+    engine.set_exercise('squat')
+
+    for index, angle in enumerate((175, 150, 120, 90, 120, 175)):
+        frame_start = time.perf_counter()
+        with stages.time('estimate_pose'):
+            landmarks = landmarks_from_array(squat_pose(angle))
+        engine.process_landmarks(landmarks, (480, 640))
+        tracer.add('frame', frame_start, time.perf_counter(), 'live', {'frame': index})
+
+    # Spans from another thread get their own track
+    worker = threading.Thread(target=lambda: tracer.span('read', cat='prefetch').__enter__().__exit__(),
+                              name='prefetch')
+    worker.start()
+    worker.join()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'trace.json')
+        tracer.dump(path)
+        with open(path) as f:
+            trace = json.load(f)
+
+    spans = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+    names = [e['name'] for e in spans]
+    for name in ('estimate_pose', 'compute_angles', 'fsm_update', 'feedback', 'frame'):
+        assert names.count(name) == 6, f"{name}: one span per frame"
+    frames = [e for e in spans if e['name'] == 'frame']
+    for frame in frames:
+        inner = [e for e in spans if e['tid'] == frame['tid'] and e['name'] != 'frame'
+                 and frame['ts'] <= e['ts'] <= frame['ts'] + frame['dur']]
+        assert len(inner) == 4, "Stage spans nest inside their frame span"
+    threads = {e['args']['name'] for e in trace['traceEvents'] if e['ph'] == 'M'}
+    assert 'prefetch' in threads and len(threads) == 2
+    assert abs(frames[0]['ts'] / 1e6 - time.time()) < 60, "Timestamps are wall-clock microseconds"
+    print(f"\n✅ {len(spans)} spans exported on {len(threads)} threads")
+    return True
+
+
+def test_ring_buffer_and_window():
+    tracer = Tracer(capacity=100, enabled=True)
+    now = time.perf_counter()
+    for i in range(250):
+        tracer.add('frame', now - 25 + i * 0.1, now - 25 + i * 0.1 + 0.05, args={'frame': i})
+    assert len(tracer) == 100, "Only the newest spans are kept"
+    recent = tracer.export(seconds=5)['traceEvents']
+    frames = [e['args']['frame'] for e in recent if e['ph'] == 'X']
+    assert frames == list(range(200, 250)), "Window keeps spans ended in the last 5 seconds"
+    print("✅ Ring buffer keeps the newest spans and windows by time")
+    return True
+
+
+def test_prefetch_spans():
+    tracer = Tracer(enabled=True)
+    prefetcher = FramePrefetcher(FakeCapture(10), should_decode=lambda i: i % 2 == 0, tracer=tracer).start()
+    frames = [index for index, _ in prefetcher]
+    prefetcher.stop()
+    names = [e['name'] for e in tracer.export()['traceEvents'] if e['ph'] == 'X']
+    assert frames == [2, 4, 6, 8, 10]
+    assert names.count('read') == 5 and names.count('grab') == 6
+    print("✅ Prefetch thread reads show up as spans")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_disabled_tracer_records_nothing, test_frame_spans_exported,
+                 test_ring_buffer_and_window, test_prefetch_spans):
+        test()
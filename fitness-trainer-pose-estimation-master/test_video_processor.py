@@ -0,0 +1,78 @@
+"""
+Test script for the upload pre-pass that trims idle lead-in and lead-out
+"""
+
+import sys
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from video_processor import detect_active_segment
+
+FPS = 30
+
+
+def write_clip(path, phases):
+    """phases: (seconds, kind) with kind 'idle', 'move' or 'hold' (person present, still)"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), FPS, (160, 120))
+    t = 0
+    for seconds, kind in phases:
+        for _ in range(int(seconds * FPS)):
+            frame = np.full((120, 160, 3), 40, dtype=np.uint8)
+            if kind == 'move':
+                y = int(50 + 30 * np.sin(2 * np.pi * t / FPS))
+                cv2.rectangle(frame, (60, y), (100, y + 30), (255, 255, 255), -1)
+            elif kind == 'hold':
+                cv2.rectangle(frame, (40, 70), (120, 85), (255, 255, 255), -1)
+            writer.write(frame)
+            t += 1
+    writer.release()
+
+
+def test_multi_set_keeps_every_set():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sets.mp4')
+        write_clip(path, [(5, 'idle'), (10, 'move'), (12, 'idle'), (10, 'move'), (5, 'idle')])
+        segment = detect_active_segment(path, FPS)
+    assert segment is not None, "Idle lead-in/lead-out is detected"
+    assert 3.0 <= segment['start_sec'] <= 5.0, segment
+    assert 37.0 <= segment['end_sec'] <= 39.0, f"The second set is analyzed: {segment}"
+    print(f"✅ A rest between sets stays in the segment ({segment['start_sec']}s - {segment['end_sec']}s)")
+    return True
+
+
+def test_static_hold():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'plank.mp4')
+        write_clip(path, [(5, 'idle'), (2, 'move'), (15, 'hold'), (2, 'move'), (5, 'idle')])
+        segment = detect_active_segment(path, FPS)
+        assert segment is not None and segment['start_sec'] <= 5.0
+        assert segment['end_sec'] >= 24.0, f"The hold between get-in and get-out is kept: {segment}"
+
+        # The clip ends mid-hold: nothing after the get-in moves
+        path = os.path.join(tmp, 'plank_cut.mp4')
+        write_clip(path, [(5, 'idle'), (2, 'move'), (15, 'hold')])
+        segment = detect_active_segment(path, FPS, static_hold=True)
+        assert segment is not None and 3.0 <= segment['start_sec'] <= 5.0
+        assert segment['end_frame'] == segment['total_frames'], "A static hold is kept to the end"
+    print("✅ Static holds are not cut")
+    return True
+
+
+def test_no_idle_part():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'still.mp4')
+        write_clip(path, [(6, 'idle')])
+        assert detect_active_segment(path, FPS) is None
+    print("✅ A clip without motion is analyzed in full")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_multi_set_keeps_every_set, test_static_hold, test_no_idle_part):
+        test()
@@ -0,0 +1,70 @@
+"""
+Test script for the binary landmark batch wire format
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pose_estimation.wire_protocol import (FORMAT_FLOAT16, FORMAT_INT16, batch_size,
+                                           decode_batch, encode_batch)
+from exercises.session import ExerciseSession
+from test_landmark_recorder import squat_pose
+
+
+def test_round_trip_both_formats():
+    rng = np.random.default_rng(1)
+    landmarks = rng.uniform(0, 1, (5, 33, 4)).astype(np.float32)
+    landmarks[2] = np.nan
+    timestamps = 1700000000.0 + np.arange(5) / 30
+
+    for coord_format in (FORMAT_FLOAT16, FORMAT_INT16):
+        data = encode_batch(timestamps, landmarks, (720, 1280), coord_format)
+        assert len(data) == batch_size(5, 33)
+
+        batch = decode_batch(data)
+        assert len(batch) == 5 and batch.frame_shape == (720, 1280)
+        assert list(batch.present) == [True, True, False, True, True]
+        assert np.abs(batch.timestamps - timestamps).max() < 1e-5
+        assert not batch.coords.flags.owndata, "Landmark block should be a view into the request body"
+
+        frame = batch.landmarks(3)
+        assert np.abs(frame[:, :3] - landmarks[3, :, :3]).max() < 1e-3
+        assert np.array_equal(frame[:, 3] == 1.0, landmarks[3, :, 3] >= 0.5)
+    print(f"\n✅ {len(data)} bytes for 5 frames, decoded without copying")
+    return True
+
+
+def test_malformed_batches_rejected():
+    data = encode_batch([0.0], np.zeros((1, 33, 4), dtype=np.float32), (480, 640))
+    for bad in (data[:10], data[:-1], b"XXXX" + data[4:]):
+        try:
+            decode_batch(bad)
+        except ValueError:
+            continue
+        raise AssertionError("Malformed batch was accepted")
+    print("✅ Truncated and foreign payloads are rejected")
+    return True
+
+
+def test_session_scores_batches():
+    angles = [175, 170, 150, 120, 95, 80, 80, 100, 140, 170, 175]
+    landmarks = np.stack([squat_pose(a) for a in angles])
+    timestamps = 50.0 + np.arange(len(angles)) * 0.2
+
+    session = ExerciseSession("squat", sets_goal=1, rep_goal=5)
+    results, status = session.process_batch(decode_batch(encode_batch(timestamps, landmarks, (480, 640))))
+    assert len(results) == len(angles)
+    assert sum(r["counted"] for r in results) == 1
+    assert status["current_reps"] == 1
+    print("✅ One request scores a whole batch of frames")
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_round_trip_both_formats, test_malformed_batches_rejected, test_session_scores_batches):
+        test()
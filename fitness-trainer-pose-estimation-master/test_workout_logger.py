@@ -0,0 +1,112 @@
+"""
+Test script for the SQLite WorkoutLogger and its rollup tables
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db.workout_logger import WorkoutLogger, week_start
+
+
+def make_logger():
+    tmp_dir = tempfile.mkdtemp()
+    return WorkoutLogger(os.path.join(tmp_dir, 'workouts.db'), batch_interval=0.01)
+
+
+def at(day: date, hour=12):
+    return datetime(day.year, day.month, day.day, hour).timestamp()
+
+
+def test_rollups_match_history():
+    wl = make_logger()
+    today = date.today()
+
+    wl.log_workout("squat", sets=3, reps=10, duration_seconds=300, form_score=80, timestamp=at(today, 9))
+    wl.log_workout("squat", sets=2, reps=12, duration_seconds=240, form_score=90, timestamp=at(today, 18))
+    wl.log_workout("push_up", sets=1, reps=15, duration_seconds=120, timestamp=at(today - timedelta(days=1)))
+    wl.flush()
+
+    stats = wl.get_user_stats()
+    print(f"\nUser stats: {stats}")
+    assert stats['total_workouts'] == 3
+    assert stats['total_reps'] == 3 * 10 + 2 * 12 + 15
+    assert stats['total_minutes'] == 11
+    assert stats['avg_form_score'] == 85
+
+    assert wl.get_exercise_distribution() == {"squat": 2, "push_up": 1}
+    assert wl.get_exercise_stats()[0]['exercise'] == "squat"
+
+    weekly = wl.get_weekly_stats()
+    assert len(weekly) == 7
+    assert weekly[today.isoformat()]['workout_count'] == 2
+
+    recent = wl.get_recent_workouts(2)
+    assert [w['reps'] for w in recent] == [12, 10]
+    assert recent[0]['duration_seconds'] == 240
+
+    wl.close()
+    print("✅ Rollup tables agree with the logged workouts")
+    return True
+
+
+def test_streak_and_week():
+    wl = make_logger()
+    today = date.today()
+
+    # Three consecutive days, then a gap
+    for days_ago in (1, 2, 3, 5):
+        wl.log_workout("lunge", sets=1, reps=10, duration_seconds=60, timestamp=at(today - timedelta(days=days_ago)))
+    wl.flush()
+
+    assert wl.get_streak_days() == 3, "Streak should count back from yesterday"
+    wl.log_workout("lunge", sets=1, reps=10, duration_seconds=60, timestamp=at(today))
+    wl.flush()
+    assert wl.get_streak_days() == 4
+
+    in_week = sum(1 for d in (0, 1, 2, 3, 5) if week_start(today - timedelta(days=d)) == week_start(today))
+    assert wl.get_dashboard_stats()['weekly_workouts'] == in_week
+
+    wl.close()
+    print("✅ Streak and weekly count are correct")
+    return True
+
+
+def test_cached_stats_update_incrementally():
+    wl = make_logger()
+    today = date.today()
+    wl.log_workout("plank", sets=1, reps=1, duration_seconds=60, timestamp=at(today - timedelta(days=1)))
+
+    before = wl.get_cached_stats()
+    assert before['total_workouts'] == 1 and before['streak_days'] == 1
+
+    # Cache is updated on log_workout, before the write is committed
+    wl.log_workout("squat", sets=2, reps=10, duration_seconds=120, form_score=70, timestamp=at(today))
+    after = wl.get_cached_stats()
+    print(f"\nCached stats: {after}")
+    assert after['total_workouts'] == 2
+    assert after['streak_days'] == 2
+    assert after['today_reps'] == 20
+    assert after['avg_form_score'] == 70
+    assert after['exercise_distribution'] == {"plank": 1, "squat": 1}
+
+    # A fresh load from the rollups agrees with the incremental values
+    wl.flush()
+    wl._stats.clear()
+    reloaded = wl.get_cached_stats()
+    for key in ('total_workouts', 'total_reps', 'streak_days', 'weekly_workouts', 'today_reps'):
+        assert reloaded[key] == after[key], key
+
+    wl.close()
+    print("✅ Cached aggregates match a reload from the rollup tables")
+    return True
+
+
+if __name__ == "__main__":
+    test_rollups_match_history()
+    test_streak_and_week()
+    test_cached_stats_update_incrementally()
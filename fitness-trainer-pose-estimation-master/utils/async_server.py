@@ -0,0 +1,403 @@
+"""
+Asyncio serving mode for the Flask app.
+
+Under the Flask development server every open /video_feed response holds
+the only request thread, so status polls, stop requests and page loads
+wait behind the stream. AsyncServer is a plain ASGI application (run it
+with any ASGI server, e.g. `python asgi.py`) that serves the long-lived
+endpoints as cooperative tasks on one event loop:
+
+    /video_feed              MJPEG stream; one frame producer runs in an executor
+                             thread and every client gets the newest frame
+    /events/status           server-sent events with the live exercise status,
+                             pushed when it changes
+    /events/video/<id>       server-sent events with video analysis progress
+
+Everything else is handed to the Flask WSGI app on a thread pool, so the
+existing routes keep working unchanged. Their bodies are sent chunk by
+chunk, so streaming routes (station feeds, send_file) are not buffered. Pose inference and JPEG encoding
+stay in executor threads; the event loop only moves bytes. One process
+can therefore hold hundreds of streams and status connections. A slow
+client skips frames instead of building up a backlog.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MJPEG_CONTENT_TYPE = b"multipart/x-mixed-replace; boundary=frame"
+SSE_HEADERS = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+JOB_FINISHED = ("completed", "error", "not_found")
+
+
+class LatestValue:
+    """Newest value of a feed; readers wait for a value newer than the one they saw"""
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._value = None
+        self.seq = 0
+        self.closed = False
+        self.subscribers = 0
+        self.skipped = 0
+
+    async def publish(self, value):
+        async with self._cond:
+            self._value = value
+            self.seq += 1
+            self._cond.notify_all()
+
+    async def close(self):
+        async with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    async def wait_newer(self, seen, timeout=None):
+        """
+        Returns (seq, value) of the newest value after `seen`.
+
+        (seen, None) on timeout and (None, None) once the feed is closed.
+        """
+        async with self._cond:
+            try:
+                await asyncio.wait_for(self._cond.wait_for(lambda: self.seq != seen or self.closed), timeout)
+            except asyncio.TimeoutError:
+                return seen, None
+            if self.seq == seen:
+                return None, None
+            if seen:
+                self.skipped += self.seq - seen - 1
+            return self.seq, self._value
+
+
+class Feed:
+    """A LatestValue filled by one producer task that runs only while someone listens"""
+
+    def __init__(self, idle_timeout=5.0):
+        self.idle_timeout = idle_timeout
+        self.latest = None
+        self._task = None
+
+    async def produce(self, latest):
+        raise NotImplementedError
+
+    async def _run(self, latest):
+        try:
+            await self.produce(latest)
+        except Exception as e:
+            logger.error(f"{type(self).__name__} stopped: {e}")
+        finally:
+            self._task = None
+            await latest.close()
+
+    async def _idle(self, latest):
+        """Wait out a short gap without subscribers; True if nobody came back"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.idle_timeout
+        while latest.subscribers == 0:
+            if loop.time() >= deadline:
+                return True
+            await asyncio.sleep(0.1)
+        return False
+
+    async def subscribe(self, timeout=None):
+        """Async iterator over new values; yields None after `timeout` seconds without one"""
+        if self._task is None:
+            self.latest = LatestValue()
+            self._task = asyncio.ensure_future(self._run(self.latest))
+        latest = self.latest
+        latest.subscribers += 1
+        seen = 0  # New subscribers start with the current value
+        try:
+            while True:
+                seq, value = await latest.wait_newer(seen, timeout)
+                if seq is None:
+                    return
+                if seq != seen:
+                    seen = seq
+                    yield value
+                else:
+                    yield None
+        finally:
+            latest.subscribers -= 1
+
+    def get_stats(self):
+        latest = self.latest
+        return {
+            "running": self._task is not None,
+            "subscribers": latest.subscribers if latest else 0,
+            "published": latest.seq if latest else 0,
+            "skipped": latest.skipped if latest else 0,
+        }
+
+
+class FrameFeed(Feed):
+    """Advances one frame generator (capture, pose, encode) in its own thread"""
+
+    def __init__(self, frame_source, idle_timeout=5.0):
+        super().__init__(idle_timeout)
+        self.frame_source = frame_source
+        # One thread: the generator owns the camera and must not run concurrently
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-feed")
+
+    async def produce(self, latest):
+        loop = asyncio.get_running_loop()
+        frames = self.frame_source()
+        try:
+            while latest.subscribers or not await self._idle(latest):
+                chunk = await loop.run_in_executor(self._executor, next, frames, None)
+                if chunk is None:
+                    break
+                await latest.publish(chunk)
+        finally:
+            close = getattr(frames, "close", None)
+            if close is not None:
+                await loop.run_in_executor(self._executor, close)
+
+
+class PolledFeed(Feed):
+    """Polls source() in an executor and publishes the result when it changes"""
+
+    def __init__(self, source, interval, executor, finished=None, idle_timeout=1.0):
+        super().__init__(idle_timeout)
+        self.source = source
+        self.interval = interval
+        self.executor = executor
+        self.finished = finished
+
+    async def produce(self, latest):
+        loop = asyncio.get_running_loop()
+        last = None
+        while latest.subscribers or not await self._idle(latest):
+            value = await loop.run_in_executor(self.executor, self.source)
+            data = json.dumps(value, default=str)
+            if data != last:
+                last = data
+                await latest.publish(data)
+            if self.finished is not None and self.finished(value):
+                break
+            await asyncio.sleep(self.interval)
+
+
+class AsyncServer:
+    def __init__(self, wsgi_app, frame_source=None, status_source=None, job_source=None,
+                 status_interval=0.25, wsgi_threads=16, heartbeat=15.0):
+        """
+        Args:
+            wsgi_app: Flask app (any WSGI callable) for all other routes
+            frame_source: () -> iterator of multipart MJPEG chunks (app.live_frames)
+            status_source: () -> live status dict (what /get_status returns)
+            job_source: (video_id) -> video analysis status dict or None if unknown
+            status_interval: Seconds between status and progress checks
+            wsgi_threads: Threads for WSGI requests and status sources
+            heartbeat: Seconds between SSE keepalive comments when nothing changes
+        """
+        self.wsgi_app = wsgi_app
+        self.status_source = status_source
+        self.job_source = job_source
+        self.status_interval = status_interval
+        self.heartbeat = heartbeat
+        self._executor = ThreadPoolExecutor(max_workers=wsgi_threads, thread_name_prefix="wsgi")
+
+        self.frames = FrameFeed(frame_source) if frame_source is not None else None
+        self.status = (PolledFeed(status_source, status_interval, self._executor)
+                       if status_source is not None else None)
+        self._jobs = {}
+
+    # ==================== ASGI ====================
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        path = scope["path"]
+        if path == "/video_feed" and self.frames is not None:
+            await self._until_disconnect(receive, self._stream_frames(send))
+        elif path == "/events/status" and self.status is not None:
+            await self._until_disconnect(receive, self._stream_events(send, self.status))
+        elif path.startswith("/events/video/") and self.job_source is not None:
+            feed = self._job_feed(path[len("/events/video/"):])
+            await self._until_disconnect(receive, self._stream_events(send, feed))
+        else:
+            await self._call_wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _until_disconnect(self, receive, stream):
+        """Run a streaming response until it ends or the client goes away"""
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        tasks = [asyncio.ensure_future(stream), asyncio.ensure_future(disconnected())]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Stream failed: {task.exception()}")
+
+    # ==================== STREAMS ====================
+
+    async def _stream_frames(self, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", MJPEG_CONTENT_TYPE), (b"cache-control", b"no-cache")]})
+        async for chunk in self.frames.subscribe():
+            # send() waits for the client, frames produced meanwhile are skipped
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def _stream_events(self, send, feed):
+        await send({"type": "http.response.start", "status": 200, "headers": SSE_HEADERS})
+        async for data in feed.subscribe(timeout=self.heartbeat):
+            body = b": keepalive\n\n" if data is None else f"data: {data}\n\n".encode()
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    def _job_feed(self, video_id):
+        feed = self._jobs.get(video_id)
+        if feed is None or (feed._task is None and feed.latest is not None and feed.latest.closed):
+            def source():
+                return self.job_source(video_id) or {"status": "not_found", "error": "Video ID not found"}
+
+            feed = PolledFeed(source, self.status_interval, self._executor,
+                              finished=lambda value: value.get("status") in JOB_FINISHED)
+            self._jobs = {vid: f for vid, f in self._jobs.items() if f._task is not None}
+            self._jobs[video_id] = feed
+        return feed
+
+    def get_stats(self):
+        return {
+            "video_feed": self.frames.get_stats() if self.frames else None,
+            "status_events": self.status.get_stats() if self.status else None,
+            "job_events": len(self._jobs),
+        }
+
+    # ==================== WSGI BRIDGE ====================
+
+    async def _call_wsgi(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        environ = wsgi_environ(scope, bytes(body))
+        loop = asyncio.get_running_loop()
+        status, headers, content = await loop.run_in_executor(self._executor, self._start_wsgi, environ)
+        await self._until_disconnect(receive, self._stream_wsgi(send, status, headers, content))
+
+    def _start_wsgi(self, environ):
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                                   for name, value in headers]
+
+        result = self.wsgi_app(environ, start_response)
+        return response["status"], response["headers"], _WsgiBody(result)
+
+    async def _stream_wsgi(self, send, status, headers, body):
+        """
+        Send a WSGI response body chunk by chunk (Response(generator),
+        send_file). Each chunk is pulled in an executor thread, so a
+        generator that blocks waiting for frames holds a WSGI thread but
+        never the event loop; send() waits for the client before the next
+        chunk is pulled.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            while True:
+                chunk = await loop.run_in_executor(self._executor, body.next_chunk)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            # A cancelled stream may still have a chunk being pulled; close() waits for it
+            loop.run_in_executor(self._executor, body.close)
+
+
+class _WsgiBody:
+    """WSGI response iterable pulled from executor threads, closed exactly once"""
+
+    def __init__(self, result):
+        self.result = result
+        self.iterator = iter(result)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def next_chunk(self):
+        with self._lock:
+            if self._closed:
+                return None
+            return next(self.iterator, None)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if hasattr(self.result, "close"):
+                self.result.close()
+
+
+def wsgi_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope with an already received body"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+        elif name != "CONTENT_LENGTH":
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
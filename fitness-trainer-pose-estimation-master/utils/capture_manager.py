@@ -0,0 +1,377 @@
+"""
+Several live cameras (stations) in one process.
+
+A gym runs one station per camera. CaptureManager opens a FrameSource for
+each station (utils/frame_source.py); every CameraStation has its own
+capture thread, ExerciseEngine, MJPEG stream and status:
+
+    capture -> pose inference -> engine (angles, FSM, feedback, overlay) -> JPEG
+
+Pose inference is shared: stations submit to one PoseInferenceService,
+each under its own session ('station:<id>'). A station waits for the
+result of its frame before capturing the next, so no camera has more than
+one frame queued. The service serves the sessions of a worker round-robin
+and keeps only the newest frame per session, so a fast or busy camera
+cannot starve the others.
+
+JPEG encoding only runs while someone watches a station. FPS and
+capture-to-output latency are kept per station (get_stats()) and recorded
+in the stage histogram under pipeline="station:<id>". Completed reps go to
+rep_sink (the rep telemetry store) at every set and when an exercise stops.
+
+Stations live in the process that opens them: two processes cannot share a
+capture device, so the app refuses CAMERA_STATIONS together with
+SHARED_STATE (multi-worker gunicorn).
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from exercises.engine import ExerciseEngine
+from exercises.loader import get_available_exercises
+from utils.draw_text_with_background import draw_text_with_background
+from utils.frame_source import FrameSource, open_frame_source
+from utils.metrics import NULL_STAGES
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_TIMEOUT_SEC = 2.0
+LATENCY_WINDOW = 300  # frames kept for the latency percentiles in get_stats()
+
+
+class CameraStation:
+    """One camera with its own capture thread, exercise engine and MJPEG stream"""
+
+    def __init__(self, station_id: str, source: FrameSource, inference, stages=None,
+                 rep_sink: Callable[[str, List[Dict[str, Any]], bool], None] = None):
+        """
+        Args:
+            station_id: Name used in URLs and metrics
+            source: Opened frame source, released by stop()
+            inference: PoseInferenceService (or anything with its estimate_pose/close_session)
+            stages: StageMetrics for this station; None records nothing
+            rep_sink: (exercise_type, reps, flush) for drained rep telemetry; None drops it
+        """
+        self.station_id = station_id
+        self.session_id = f'station:{station_id}'
+        self.source = source
+        self.inference = inference
+        self.stages = stages or NULL_STAGES
+        self.rep_sink = rep_sink
+        self.engine = ExerciseEngine(stages=stages)
+
+        self.exercise_running = False
+        self.exercise_goal = 10
+        self.sets_goal = 3
+        self.sets_completed = 0
+        self.workout_start_time = None
+
+        self.fps = 0.0
+        self.frames = 0
+        self.last_error = None
+        self._fps_count = 0
+        self._fps_start = time.perf_counter()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+        self._lock = threading.Lock()  # Engine and session fields
+        self._frame_cond = threading.Condition()
+        self._jpeg = None
+        self._jpeg_seq = 0
+        self.viewers = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ==================== Lifecycle ====================
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f'station-{self.station_id}', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=INFERENCE_TIMEOUT_SEC + 1)
+        self.source.release()
+        self.inference.close_session(self.session_id)
+        with self._frame_cond:
+            self._frame_cond.notify_all()
+
+    # ==================== Exercise session ====================
+
+    def _publish(self):
+        self.engine.publish_status({
+            'exercise_running': self.exercise_running,
+            'current_set': self.sets_completed + 1 if self.exercise_running else 0,
+            'total_sets': self.sets_goal,
+            'rep_goal': self.exercise_goal
+        })
+
+    def _save_reps(self, flush: bool):
+        """Hand reps completed since the last call to rep_sink"""
+        if self.engine.exercise_name is None:
+            return
+        reps = self.engine.drain_rep_telemetry()
+        if self.rep_sink is not None and (reps or flush):
+            try:
+                self.rep_sink(self.engine.exercise_name, reps, flush)
+            except OSError as e:
+                self._report_error(f"Saving rep telemetry failed: {e}")
+
+    def start_exercise(self, exercise_type: str, sets: int = 3, reps: int = 10):
+        available = get_available_exercises()
+        if exercise_type not in available:
+            return {'success': False, 'error': f'Invalid exercise type. Available: {available}'}
+        with self._lock:
+            # Keep reps of a previous exercise that finished without stop_exercise()
+            self._save_reps(flush=True)
+            if not self.engine.set_exercise(exercise_type):
+                return {'success': False, 'error': f'Failed to load exercise: {exercise_type}'}
+            self.sets_goal = sets
+            self.exercise_goal = reps
+            self.sets_completed = 0
+            self.workout_start_time = time.time()
+            self.exercise_running = True
+            self._publish()
+        logger.info(f"Station {self.station_id}: started {exercise_type}, {reps} reps x {sets} sets")
+        return {'success': True, 'exercise': exercise_type}
+
+    def stop_exercise(self) -> Optional[Dict]:
+        """
+        Stop the running exercise.
+
+        Returns:
+            log_workout() arguments for the stopped workout, None if none was running
+        """
+        with self._lock:
+            workout = None
+            if self.exercise_running and self.engine.exercise:
+                counter = self.engine.get_counter()
+                workout = {
+                    'exercise_type': self.engine.exercise_name,
+                    'sets': self.sets_completed + (1 if counter > 0 else 0),
+                    'reps': self.exercise_goal,
+                    'duration_seconds': int(time.time() - self.workout_start_time),
+                    'form_score': self.engine.exercise.avg_form_score
+                }
+            self.exercise_running = False
+            self._save_reps(flush=True)
+            self._publish()
+        return workout
+
+    def get_status(self):
+        """Same fields as the single-camera /get_status, plus the station and its fps"""
+        snapshot = self.engine.get_snapshot()
+        status = {
+            'station': self.station_id,
+            'exercise': self.engine.exercise_name,
+            'exercise_running': snapshot.session.get('exercise_running', False),
+            'current_reps': snapshot.counter,
+            'current_set': snapshot.session.get('current_set', 0),
+            'total_sets': snapshot.session.get('total_sets', 0),
+            'rep_goal': snapshot.session.get('rep_goal', 0),
+            'version': snapshot.version,
+            'fps': round(self.fps, 1)
+        }
+        if status['exercise_running'] and snapshot.status:
+            status['form_score'] = snapshot.status.get('form_score', 100)
+            status['avg_form_score'] = snapshot.status.get('avg_form_score', 100)
+            status['form_grade'] = snapshot.status.get('form_grade', 'A')
+        return status
+
+    def get_stats(self):
+        latencies = np.array(list(self._latencies)) * 1000 if self._latencies else None
+        return {
+            'station': self.station_id,
+            'source': self.source.get_info(),
+            'running': self._thread is not None and self._thread.is_alive(),
+            'exercise_running': self.exercise_running,
+            'fps': round(self.fps, 1),
+            'frames': self.frames,
+            'viewers': self.viewers,
+            'latency_ms': {
+                'p50': round(float(np.percentile(latencies, 50)), 1),
+                'p95': round(float(np.percentile(latencies, 95)), 1),
+                'max': round(float(latencies.max()), 1),
+            } if latencies is not None else None,
+            'last_error': self.last_error,
+        }
+
+    # ==================== Capture loop ====================
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self.stages.time('capture'):
+                captured = self.source.read_frame()
+            if captured is None:
+                if not self.source.isOpened():
+                    self.last_error = 'Frame source closed'
+                    break
+                time.sleep(0.01)
+                continue
+            frame = captured.image
+            self._count_frame()
+
+            results = None
+            exercise_name = self.engine.exercise_name if self.exercise_running else None
+            if exercise_name:
+                try:
+                    with self.stages.time('estimate_pose'):
+                        results = self.inference.estimate_pose(self.session_id, frame, exercise_name,
+                                                               timeout=INFERENCE_TIMEOUT_SEC)
+                except Exception as e:
+                    self._report_error(f"Pose inference failed: {e}")
+
+            with self._lock:
+                if results is not None and results.pose_landmarks and self.exercise_running:
+                    self._process(frame, results.pose_landmarks.landmark)
+
+            if self.viewers:
+                cv2.putText(frame, f"{self.station_id}  FPS: {self.fps:.1f}", (10, frame.shape[0] - 15),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+                with self.stages.time('jpeg_encode'):
+                    ok, buffer = cv2.imencode('.jpg', frame)
+                if ok:
+                    self._publish_jpeg(buffer.tobytes())
+
+            latency = time.perf_counter() - captured.timestamp
+            self._latencies.append(latency)
+            self.stages.observe('frame_latency', latency)
+
+    def _count_frame(self):
+        self.frames += 1
+        self._fps_count += 1
+        elapsed = time.perf_counter() - self._fps_start
+        if elapsed >= 1.0:
+            self.fps = self._fps_count / elapsed
+            self._fps_count = 0
+            self._fps_start = time.perf_counter()
+
+    def _report_error(self, message):
+        # Log a failure once, not on every frame
+        if message != self.last_error:
+            logger.error(f"Station {self.station_id}: {message}")
+        self.last_error = message
+
+    def _process(self, frame, landmarks):
+        """Engine update, overlays and set/workout completion (like app.generate_frames)"""
+        result = self.engine.process_frame(frame, landmarks)
+        if not result["success"]:
+            return
+        self.engine.draw_status_overlay(frame, self.exercise_goal, self.sets_goal, self.sets_completed)
+        self.engine.draw_form_score(frame)
+
+        if self.engine.get_counter() < self.exercise_goal:
+            return
+        self.sets_completed += 1
+        if self.sets_completed >= self.sets_goal:
+            self.exercise_running = False
+            message, color = f"WORKOUT COMPLETE! Avg Score: {self.engine.exercise.avg_form_score}", (0, 200, 0)
+        else:
+            message, color = f"SET {self.sets_completed} COMPLETE! Rest for 30 sec", (0, 0, 200)
+        self._publish()
+        self.engine.reset()
+        self._save_reps(flush=not self.exercise_running)
+        draw_text_with_background(frame, message, (frame.shape[1] // 2 - 200, frame.shape[0] // 2),
+                                  cv2.FONT_HERSHEY_DUPLEX, 1.0, (255, 255, 255), color, 2)
+
+    # ==================== MJPEG ====================
+
+    def _publish_jpeg(self, jpeg: bytes):
+        with self._frame_cond:
+            self._jpeg = jpeg
+            self._jpeg_seq += 1
+            self._frame_cond.notify_all()
+
+    def frames_mjpeg(self):
+        """MJPEG chunks of this station; a slow viewer skips to the newest frame"""
+        with self._frame_cond:
+            self.viewers += 1
+        try:
+            seen = self._jpeg_seq
+            while not self._stop.is_set():
+                with self._frame_cond:
+                    self._frame_cond.wait_for(lambda: self._jpeg_seq != seen or self._stop.is_set(), timeout=1.0)
+                    if self._jpeg_seq == seen:
+                        continue
+                    seen, jpeg = self._jpeg_seq, self._jpeg
+                yield b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n'
+        finally:
+            with self._frame_cond:
+                self.viewers -= 1
+
+
+class CaptureManager:
+    """Stations by id, all sharing one pose inference service"""
+
+    def __init__(self, inference, stage_factory: Callable = None, rep_sink: Callable = None):
+        """
+        Args:
+            inference: PoseInferenceService shared by all stations
+            stage_factory: station id -> StageMetrics, or None to record nothing
+            rep_sink: Passed to every CameraStation
+        """
+        self.inference = inference
+        self.stage_factory = stage_factory
+        self.rep_sink = rep_sink
+        self._stations: Dict[str, CameraStation] = {}
+        self._lock = threading.Lock()
+
+    def add(self, station_id: str, source, speed: float = 1.0) -> CameraStation:
+        """
+        Open a station and start capturing.
+
+        Args:
+            source: FrameSource, or a CAMERA_SOURCE-style spec for open_frame_source()
+        """
+        with self._lock:
+            if station_id in self._stations:
+                raise ValueError(f"Station already exists: {station_id}")
+            if isinstance(source, str):
+                source = open_frame_source(source, speed=speed)
+            stages = self.stage_factory(station_id) if self.stage_factory else None
+            station = self._stations[station_id] = CameraStation(station_id, source, self.inference, stages,
+                                                                      self.rep_sink)
+        logger.info(f"Station {station_id}: capturing from {source.name}")
+        return station.start()
+
+    def remove(self, station_id: str):
+        with self._lock:
+            station = self._stations.pop(station_id, None)
+        if station is not None:
+            station.stop()
+
+    def get(self, station_id: str) -> Optional[CameraStation]:
+        return self._stations.get(station_id)
+
+    def __len__(self):
+        return len(self._stations)
+
+    def __iter__(self):
+        return iter(list(self._stations.values()))
+
+    def get_stats(self):
+        return [station.get_stats() for station in self]
+
+    def close(self):
+        for station_id in list(self._stations):
+            self.remove(station_id)
+
+
+def parse_stations(spec: str) -> Dict[str, str]:
+    """'front=0,back=clips/squat.mp4' -> {'front': '0', 'back': 'clips/squat.mp4'}"""
+    stations = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        station_id, sep, source = item.partition('=')
+        if not sep or not station_id.strip() or not source.strip():
+            raise ValueError(f"Station must be <id>=<source>: {item}")
+        stations[station_id.strip()] = source.strip()
+    return stations
@@ -0,0 +1,309 @@
+"""
+Frame sources for the live pipeline.
+
+app.py captures through a FrameSource instead of cv2.VideoCapture(0), so the
+live loop runs the same way on a webcam, a network stream, a video file or
+generated frames. open_frame_source() picks one from a spec string (the
+CAMERA_SOURCE environment variable):
+
+    0, 1, ...                  local capture device (1280x720 @ 30 fps requested)
+    rtsp://..., http://...     network stream, anything cv2.VideoCapture opens
+    clips/squat.mp4            video file, looped
+    recordings/x_squat.plmk    landmark log drawn as a stick figure, looped
+    synthetic:squat            generated stick figure doing the exercise
+
+Files and generated frames are paced at their frame rate times `speed`
+(CAMERA_SOURCE_SPEED): 1.0 plays in real time like a camera, 4.0 four
+times faster, 0 as fast as frames can be produced.
+
+read_frame() returns a CapturedFrame with the perf_counter() time the frame
+was captured (grabbed from the device, or due on the source's clock) and
+its index. Frames are decoded straight into the source's FramePool, a ring
+of preallocated buffers: a frame stays valid until `pool.size` more frames
+have been read, so downstream stages can draw on it or keep it without a
+copy. read() keeps the cv2.VideoCapture signature.
+"""
+
+import os
+import time
+from typing import NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# MediaPipe landmark indices
+_POINTS = {
+    'nose': 0,
+    'left_shoulder': 11, 'right_shoulder': 12,
+    'left_elbow': 13, 'right_elbow': 14,
+    'left_wrist': 15, 'right_wrist': 16,
+    'left_hip': 23, 'right_hip': 24,
+    'left_knee': 25, 'right_knee': 26,
+    'left_ankle': 27, 'right_ankle': 28,
+}
+
+_BONES = [
+    ('left_shoulder', 'right_shoulder'), ('left_hip', 'right_hip'),
+    ('left_shoulder', 'left_hip'), ('right_shoulder', 'right_hip'),
+    ('left_shoulder', 'left_elbow'), ('left_elbow', 'left_wrist'),
+    ('right_shoulder', 'right_elbow'), ('right_elbow', 'right_wrist'),
+    ('left_hip', 'left_knee'), ('left_knee', 'left_ankle'),
+    ('right_hip', 'right_knee'), ('right_knee', 'right_ankle'),
+]
+
+
+def draw_stick_figure(pose, width, height, out=None):
+    """
+    One BGR frame: a solid stick figure on a plain studio background.
+
+    Args:
+        pose: (33, 4) normalized landmarks (x, y, z, visibility); NaN for no person
+        out: (height, width, 3) uint8 buffer to draw into
+    """
+    frame = out if out is not None else np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = (205, 200, 190)
+    frame[int(height * 0.94):] = (120, 110, 100)  # floor
+    if pose is None or np.isnan(pose[0, 0]):
+        return frame
+
+    def point(name):
+        x, y = pose[_POINTS[name], :2]
+        return int(x * width), int(y * height)
+
+    thickness = max(3, width // 60)
+    torso = np.array([point('left_shoulder'), point('right_shoulder'), point('right_hip'), point('left_hip')])
+    cv2.fillConvexPoly(frame, torso, (60, 70, 160), lineType=cv2.LINE_AA)
+    for a, b in _BONES:
+        cv2.line(frame, point(a), point(b), (50, 60, 90), thickness, lineType=cv2.LINE_AA)
+    cv2.circle(frame, point('nose'), max(6, width // 28), (140, 170, 220), -1, lineType=cv2.LINE_AA)
+    return frame
+
+
+class CapturedFrame(NamedTuple):
+    image: np.ndarray
+    timestamp: float  # time.perf_counter() at capture
+    index: int
+
+
+class FramePool:
+    """Ring of preallocated frame buffers of one shape"""
+
+    def __init__(self, shape: Tuple[int, ...], size: int = 4, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.size = size
+        self._buffers = [np.empty(self.shape, dtype=dtype) for _ in range(size)]
+        self._next = 0
+
+    def next(self) -> np.ndarray:
+        """The buffer for the next frame (the least recently handed out)"""
+        buffer = self._buffers[self._next]
+        self._next = (self._next + 1) % self.size
+        return buffer
+
+
+class _Pacer:
+    """Releases frames at fps * speed on the perf_counter() clock"""
+
+    def __init__(self, fps: float, speed: float):
+        self.interval = 1.0 / (fps * speed) if speed > 0 else 0.0
+        self._due = None
+
+    def wait(self) -> float:
+        """Sleep until the next frame is due; returns the time it was due"""
+        now = time.perf_counter()
+        if not self.interval:
+            return now
+        if self._due is None or self._due < now - 1.0:
+            self._due = now  # First frame, or fell more than a second behind: resynchronize
+        elif self._due > now:
+            time.sleep(self._due - now)
+        due = self._due
+        self._due += self.interval
+        return due
+
+
+class FrameSource:
+    """
+    Base class of all frame sources.
+
+    Subclasses implement _produce(out), which fills `out` (or returns a new
+    array if the frame does not fit it) and returns (image, capture time),
+    or None when no frame could be read.
+    """
+
+    pool_size = 4
+
+    def __init__(self, name: str, width: int, height: int, fps: float):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pool = FramePool((height, width, 3), self.pool_size)
+        self.frames_read = 0
+
+    def isOpened(self) -> bool:
+        return True
+
+    def _produce(self, out: np.ndarray) -> Optional[Tuple[np.ndarray, float]]:
+        raise NotImplementedError
+
+    def read_frame(self, out: np.ndarray = None) -> Optional[CapturedFrame]:
+        """
+        Next frame, or None if the source has none.
+
+        Args:
+            out: Buffer to capture into instead of the pool (e.g. shared memory)
+        """
+        if not self.isOpened():
+            return None
+        buffer = out if out is not None and out.shape == self.pool.shape else self.pool.next()
+        produced = self._produce(buffer)
+        if produced is None:
+            return None
+        image, timestamp = produced
+        self.frames_read += 1
+        return CapturedFrame(image, timestamp, self.frames_read - 1)
+
+    def read(self, image: np.ndarray = None):
+        """cv2.VideoCapture.read() equivalent: (success, frame)"""
+        frame = self.read_frame(image)
+        return (True, frame.image) if frame is not None else (False, None)
+
+    def release(self):
+        pass
+
+    def get_info(self):
+        return {
+            'source': self.name,
+            'width': self.width,
+            'height': self.height,
+            'fps': self.fps,
+            'frames_read': self.frames_read,
+        }
+
+
+class DeviceSource(FrameSource):
+    """Local capture device (index) or network stream (URL) via cv2.VideoCapture"""
+
+    def __init__(self, device, width: int = 1280, height: int = 720, fps: float = 30):
+        self._capture = cv2.VideoCapture(device)
+        if isinstance(device, int):
+            self._capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self._capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            self._capture.set(cv2.CAP_PROP_FPS, fps)
+        # The device may pick a different mode than requested
+        super().__init__(str(device),
+                         int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH)) or width,
+                         int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) or height,
+                         self._capture.get(cv2.CAP_PROP_FPS) or fps)
+
+    def isOpened(self):
+        return self._capture is not None and self._capture.isOpened()
+
+    def _produce(self, out):
+        if not self._capture.grab():
+            return None
+        timestamp = time.perf_counter()
+        success, image = self._capture.retrieve(out)
+        return (image, timestamp) if success else None
+
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+
+class FileSource(FrameSource):
+    """Video file played at its frame rate times `speed`, looped unless loop=False"""
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = True):
+        self._capture = cv2.VideoCapture(path)
+        self.loop = loop
+        super().__init__(path,
+                         int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                         int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                         self._capture.get(cv2.CAP_PROP_FPS) or 30.0)
+        self._pacer = _Pacer(self.fps, speed)
+
+    def isOpened(self):
+        return self._capture is not None and self._capture.isOpened()
+
+    def _produce(self, out):
+        timestamp = self._pacer.wait()
+        success, image = self._capture.read(out)
+        if not success and self.loop:
+            # End of file: start over
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, image = self._capture.read(out)
+        return (image, timestamp) if success else None
+
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+
+class SyntheticSource(FrameSource):
+    """
+    In-memory generator: a stick figure drawn from a landmark sequence.
+
+    Args:
+        poses: (F, 33, 4) normalized landmarks, NaN rows for frames without a person
+    """
+
+    def __init__(self, poses: np.ndarray, width: int = 640, height: int = 480, fps: float = 30,
+                 speed: float = 1.0, loop: bool = True, name: str = 'synthetic'):
+        super().__init__(name, width, height, fps)
+        self.poses = poses
+        self.loop = loop
+        self._pacer = _Pacer(fps, speed)
+        self._released = False
+
+    @classmethod
+    def from_landmark_log(cls, path: str, speed: float = 1.0, loop: bool = True):
+        """Replay a LandmarkRecorder log at its recorded size and frame rate"""
+        from pose_estimation.landmark_recorder import LandmarkLogReader
+        reader = LandmarkLogReader(path)
+        timestamps, poses = reader.read_all()
+        steps = np.diff(timestamps)
+        fps = 1.0 / float(np.median(steps)) if len(steps) and np.median(steps) > 0 else 30.0
+        height, width = reader.frame_shape
+        return cls(poses, width, height, fps, speed, loop, name=path)
+
+    @classmethod
+    def for_exercise(cls, exercise_name: str, seconds: float = 10.0, width: int = 640, height: int = 480,
+                     fps: float = 30, speed: float = 1.0):
+        """Repetitions of an exercise, generated like the benchmarks' (pose_estimation/synthetic.py)"""
+        from pose_estimation.synthetic import exercise_sequence
+        from exercises.loader import load_exercise
+        exercise = load_exercise(exercise_name)
+        poses = exercise_sequence(exercise, int(seconds * fps), fps=int(fps), frame_shape=(height, width))
+        return cls(poses, width, height, fps, speed, name=f'synthetic:{exercise_name}')
+
+    def isOpened(self):
+        return not self._released and len(self.poses) > 0
+
+    def _produce(self, out):
+        if self.frames_read >= len(self.poses) and not self.loop:
+            return None
+        timestamp = self._pacer.wait()
+        pose = self.poses[self.frames_read % len(self.poses)]
+        return draw_stick_figure(pose, self.width, self.height, out), timestamp
+
+    def release(self):
+        self._released = True
+
+
+def open_frame_source(spec: str = '0', speed: float = 1.0) -> FrameSource:
+    """FrameSource for a CAMERA_SOURCE spec (see the module docstring)"""
+    if spec.isdigit():
+        return DeviceSource(int(spec))
+    if spec.startswith('synthetic:'):
+        return SyntheticSource.for_exercise(spec.split(':', 1)[1], speed=speed)
+    if '://' in spec:
+        return DeviceSource(spec)
+    if not os.path.exists(spec):
+        raise FileNotFoundError(f"Camera source not found: {spec}")
+    if spec.endswith('.plmk'):
+        return SyntheticSource.from_landmark_log(spec, speed)
+    return FileSource(spec, speed)
@@ -0,0 +1,312 @@
+"""
+Low-overhead metrics exported in the Prometheus text format (/metrics).
+
+Hot paths time their stages with StageMetrics:
+
+    stages = stage_metrics(registry, 'live')
+    with stages.time('estimate_pose'):
+        results = estimator.process(frame)
+
+One observation is two perf_counter() calls, a bisect and an uncontended
+lock, so it can stay enabled in production. Histograms keep fixed buckets;
+nothing grows with the number of frames.
+
+Video analysis runs in a subprocess (video_processor.py). It records the
+same stage histograms in its own registry and writes export() into its
+results JSON; the web process merge()s them when the job ends.
+
+Given an enabled Tracer (utils/tracing.py), StageMetrics also records each
+timed stage as a span for per-frame timelines.
+"""
+
+import bisect
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Frame stage durations: 0.5 ms (overlay) .. 1 s (a stalled inference)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+STAGE_HISTOGRAM = 'fitness_stage_duration_seconds'
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', '_lock')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: above the largest bucket
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Iterable[float] = STAGE_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> _HistogramChild:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, _HistogramChild(self.buckets))
+        return child
+
+    def observe(self, value: float, *label_values):
+        self.labels(*label_values).observe(value)
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        for key, child in sorted(self._children.items()):
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f'{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}'
+            labels = _format_labels(self.label_names, key)
+            yield f'{self.name}_sum{labels} {_format_value(total)}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        key = tuple(str(v) for v in label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f'{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}'
+
+
+class Gauge:
+    """
+    Value read when /metrics is scraped.
+
+    read() returns a number, or {label values tuple: number} when the gauge
+    has labels.
+    """
+
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, help_text: str, read: Callable, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.read = read
+        self.label_names = tuple(labels)
+
+    def render(self):
+        try:
+            value = self.read()
+        except Exception:
+            return
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} {self.metric_type}'
+        values = value.items() if isinstance(value, dict) else [((), value)]
+        for key, v in values:
+            if v is None:
+                continue
+            key = key if isinstance(key, tuple) else (key,)
+            yield f'{self.name}{_format_labels(self.label_names, key)} {_format_value(v)}'
+
+
+class CallbackCounter(Gauge):
+    """Counter whose total is kept elsewhere (e.g. process CPU time) and read on scrape"""
+
+    metric_type = 'counter'
+
+
+class MetricsRegistry:
+    """Named metrics of one process, rendered in registration order"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                  buckets: Iterable[float] = STAGE_BUCKETS) -> Histogram:
+        """Register a histogram, or return the one already registered under `name`"""
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, read: Callable, labels: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, read, labels))
+
+    def callback_counter(self, name: str, help_text: str, read: Callable,
+                         labels: Tuple[str, ...] = ()) -> CallbackCounter:
+        return self._register(CallbackCounter(name, help_text, read, labels))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class _StageTimer:
+    __slots__ = ('stages', 'stage', 'child', 'start')
+
+    def __init__(self, stages, stage: str, child: _HistogramChild):
+        self.stages = stages
+        self.stage = stage
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.child.observe(end - self.start)
+        tracer = self.stages.tracer
+        if tracer is not None and tracer.enabled:
+            tracer.add(self.stage, self.start, end, self.stages.pipeline)
+        return False
+
+
+class StageMetrics:
+    """Stage duration histograms of one pipeline (live camera, video analysis)"""
+
+    def __init__(self, histogram: Histogram, pipeline: str, tracer=None):
+        self.histogram = histogram
+        self.pipeline = pipeline
+        self.tracer = tracer
+        self._children: Dict[str, _HistogramChild] = {}
+
+    def _child(self, stage: str) -> _HistogramChild:
+        child = self._children.get(stage)
+        if child is None:
+            child = self._children[stage] = self.histogram.labels(self.pipeline, stage)
+        return child
+
+    def time(self, stage: str) -> _StageTimer:
+        """Context manager that records the duration of its block"""
+        return _StageTimer(self, stage, self._child(stage))
+
+    def observe(self, stage: str, seconds: float):
+        self._child(stage).observe(seconds)
+
+    def export(self) -> Dict[str, Dict]:
+        """JSON-serializable bucket counts, for merge() in another process"""
+        exported = {}
+        for stage, child in list(self._children.items()):
+            counts, total = child.snapshot()
+            exported[stage] = {'counts': counts, 'sum': total}
+        return exported
+
+    def merge(self, exported: Optional[Dict[str, Dict]]):
+        """Add bucket counts exported by another process with the same buckets"""
+        for stage, data in (exported or {}).items():
+            child = self._child(stage)
+            if len(data.get('counts', ())) != len(child.counts):
+                continue
+            with child._lock:
+                for i, count in enumerate(data['counts']):
+                    child.counts[i] += count
+                child.sum += data.get('sum', 0.0)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullStageMetrics:
+    """Stand-in when no metrics are collected (picklable, records nothing)"""
+
+    _timer = _NullTimer()
+
+    def time(self, stage: str):
+        return self._timer
+
+    def observe(self, stage: str, seconds: float):
+        pass
+
+
+NULL_STAGES = NullStageMetrics()
+
+
+def stage_metrics(registry: MetricsRegistry, pipeline: str, tracer=None) -> StageMetrics:
+    """Stage timings of `pipeline` in the shared stage duration histogram (and `tracer`, if given)"""
+    histogram = registry.histogram(STAGE_HISTOGRAM, 'Duration of each frame processing stage',
+                                   labels=('pipeline', 'stage'), buckets=STAGE_BUCKETS)
+    return StageMetrics(histogram, pipeline, tracer)
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux /proc; peak RSS elsewhere)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return None
@@ -0,0 +1,177 @@
+"""
+Statistical sampling profiler for a running process.
+
+sample() wakes up every `interval` seconds for the requested duration, reads
+every thread's current Python stack with sys._current_frames() and counts
+identical stacks. Nothing runs between requests, so an idle profiler costs
+nothing; while sampling, the cost is one stack walk per thread per interval.
+
+The result is in the collapsed-stack format used by flamegraph.pl,
+speedscope and inferno:
+
+    MainThread;app.py:generate_frames;exercises/engine.py:process_frame 42
+
+Video analysis subprocesses (video_processor.py) call install_signal_handler()
+at startup; once the handler is installed they create a ready file, and
+only then does the web process signal them (SIGUSR2's default action would
+terminate the job). The web process writes the duration to a request file
+and sends SIGUSR2; the subprocess samples itself on a background thread and
+writes its collapsed stacks next to the request file (see
+request_subprocess_profile).
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+PROFILE_SIGNAL = getattr(signal, 'SIGUSR2', None)  # not available on Windows
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame_label(frame) -> str:
+    path = frame.f_code.co_filename
+    if path.startswith(_ROOT):
+        path = os.path.relpath(path, _ROOT)
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{frame.f_code.co_name}"
+
+
+def sample(seconds: float, interval: float = 0.005, max_depth: int = 64) -> Counter:
+    """
+    Sample the stacks of all other threads of this process.
+
+    Returns:
+        Counter of collapsed stacks (root first, ';'-separated) -> samples
+    """
+    own = threading.get_ident()
+    stacks = Counter()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for tid, frame in sys._current_frames().items():
+            if tid == own:
+                continue
+            labels = []
+            while frame is not None and len(labels) < max_depth:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(tid, f"thread-{tid}"))
+            stacks[';'.join(reversed(labels))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def collapsed(stacks: Dict[str, int], prefix: str = '') -> str:
+    """Collapsed-stack text, most frequent first"""
+    lines = [f"{prefix}{stack} {count}" for stack, count in sorted(stacks.items(), key=lambda s: -s[1])]
+    return '\n'.join(lines) + ('\n' if lines else '')
+
+
+def parse_collapsed(text: str) -> Counter:
+    stacks = Counter()
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(' ')
+        if stack and count.isdigit():
+            stacks[stack] += int(count)
+    return stacks
+
+
+# ==================== Subprocesses ====================
+
+def _request_path(base_path: str) -> str:
+    return f"{base_path}.profile_request"
+
+
+def _result_path(base_path: str) -> str:
+    return f"{base_path}.profile"
+
+
+def _ready_path(base_path: str) -> str:
+    return f"{base_path}.profile_ready"
+
+
+def install_signal_handler(base_path: str, interval: float = 0.005):
+    """
+    Let the parent process profile this process on demand (PROFILE_SIGNAL).
+
+    Args:
+        base_path: Path shared with the parent; request and result files are
+                   derived from it (the video job's results JSON)
+    """
+    if PROFILE_SIGNAL is None:
+        return
+
+    def run(seconds):
+        stacks = sample(seconds, interval)
+        tmp_path = _result_path(base_path) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(collapsed(stacks))
+        os.replace(tmp_path, _result_path(base_path))
+
+    def handler(signum, frame):
+        # Keep the handler short: read the duration and sample on a thread
+        try:
+            with open(_request_path(base_path), 'r') as f:
+                seconds = float(f.read().strip() or 0)
+            os.remove(_request_path(base_path))
+        except (OSError, ValueError):
+            return
+        threading.Thread(target=run, args=(seconds,), name='profiler', daemon=True).start()
+
+    signal.signal(PROFILE_SIGNAL, handler)
+    # Until the handler is installed the signal's default action would kill
+    # the process, so the parent only signals once this file exists
+    with open(_ready_path(base_path), 'w'):
+        pass
+
+
+def subprocess_ready(base_path: str) -> bool:
+    """True once the subprocess installed its handler and can be signalled"""
+    return PROFILE_SIGNAL is not None and os.path.exists(_ready_path(base_path))
+
+
+def remove_subprocess_files(base_path: str):
+    """Delete the profiling files of a finished subprocess"""
+    for path in (_ready_path(base_path), _request_path(base_path), _result_path(base_path)):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def request_subprocess_profile(pid: int, base_path: str, seconds: float) -> bool:
+    """Ask a subprocess that called install_signal_handler() to profile itself"""
+    if not subprocess_ready(base_path):
+        return False
+    try:
+        os.remove(_result_path(base_path))
+    except OSError:
+        pass
+    with open(_request_path(base_path), 'w') as f:
+        f.write(str(seconds))
+    try:
+        os.kill(pid, PROFILE_SIGNAL)
+    except OSError:
+        os.remove(_request_path(base_path))
+        return False
+    return True
+
+
+def collect_subprocess_profile(base_path: str, timeout: float) -> Optional[Counter]:
+    """Collapsed stacks written by the subprocess, or None if none arrived in time"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with open(_result_path(base_path), 'r') as f:
+                text = f.read()
+            os.remove(_result_path(base_path))
+            return parse_collapsed(text)
+        except OSError:
+            time.sleep(0.05)
+    return None
@@ -0,0 +1,131 @@
+"""
+Per-frame spans in the Chrome trace-event format (chrome://tracing, Perfetto).
+
+Metrics (utils/metrics.py) say how long stages take on average; a trace
+shows one frame at a time, so a stall, a slow upload or two stages running
+in parallel on different threads can be seen on a timeline.
+
+The tracer is off unless enabled. When on, each span is one tuple appended
+to a fixed-size ring buffer, so a long-running server keeps only the most
+recent events. StageMetrics records a span for every timed stage when it is
+given a tracer, and loops add a "frame" span around each frame.
+
+    tracer = Tracer(enabled=True)
+    with tracer.span('read', cat='prefetch'):
+        ...
+    tracer.dump('trace.json')          # or export(seconds=10) for a window
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add(self.name, self.start, time.perf_counter(), self.cat, self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    def __init__(self, capacity: int = 50000, enabled: bool = False):
+        """
+        Args:
+            capacity: Spans kept in the ring buffer (oldest are dropped)
+            enabled: Record spans; when False add() and span() do nothing
+        """
+        self.enabled = enabled
+        self._events = deque(maxlen=capacity)
+        self._threads: Dict[int, str] = {}
+        # perf_counter() is monotonic but has no epoch; keep the offset so
+        # traces from different processes share a wall-clock timeline
+        self._epoch_offset = time.time() - time.perf_counter()
+
+    def add(self, name: str, start: float, end: float, cat: str = 'stage', args: Optional[Dict[str, Any]] = None):
+        """Record a span from perf_counter() start/end timestamps"""
+        if not self.enabled:
+            return
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        # deque.append is atomic, so spans from many threads need no lock
+        self._events.append((name, cat, start, end, tid, args))
+
+    def span(self, name: str, cat: str = 'stage', **args):
+        """Context manager recording its block as a span"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args or None)
+
+    def clear(self):
+        self._events.clear()
+
+    def __len__(self):
+        return len(self._events)
+
+    def export(self, seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Buffered spans as a Chrome trace-event document.
+
+        Args:
+            seconds: Only spans that ended in the last `seconds` (None = all)
+        """
+        events = list(self._events)
+        if seconds is not None:
+            cutoff = time.perf_counter() - seconds
+            events = [e for e in events if e[3] >= cutoff]
+
+        pid = os.getpid()
+        trace_events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in list(self._threads.items())
+        ]
+        for name, cat, start, end, tid, args in events:
+            event = {
+                'name': name,
+                'cat': cat,
+                'ph': 'X',
+                'ts': round((start + self._epoch_offset) * 1e6, 1),
+                'dur': round((end - start) * 1e6, 1),
+                'pid': pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = args
+            trace_events.append(event)
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path: str, seconds: Optional[float] = None):
+        """Write export() as JSON (written to a temp file, then moved into place)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.export(seconds), f)
+        os.replace(tmp_path, path)
@@ -2,6 +2,9 @@
 Standalone video processor - Runs in separate process to avoid memory issues
 Creates output video WITH SKELETON OVERLAY
 Usage: python video_processor.py <video_path> <exercise_type> <output_json_path> [output_video_path]
+                                 [--inference-width N] [--model-complexity 0|1|2|auto]
+                                 [--latency-budget-ms MS] [--benchmark-cache PATH]
+                                 [--no-segment-detection] [--trace TRACE_JSON]
 """
 
 import os
@@ -13,8 +16,20 @@ os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
 
 import sys
 import json
+import argparse
 import cv2
 import gc
+import queue
+import threading
+import time
+import numpy as np
+
+from utils.metrics import MetricsRegistry, stage_metrics
+from utils.profiler import install_signal_handler
+from utils.tracing import Tracer
+
+# Spans kept for --trace: ~8 per frame, enough for a 2 minute 60 fps upload
+TRACE_CAPACITY = 200000
 
 # Try to use imageio with ffmpeg for H.264 support
 try:
@@ -26,6 +41,162 @@ except ImportError:
     print("imageio not available, using OpenCV for output")
 
 
+class FramePrefetcher:
+    """
+    Read frames on a background thread so decoding overlaps pose inference.
+
+    Frames for which ``should_decode(index)`` returns False are only grabbed
+    (``cap.grab()`` without ``retrieve()``), which skips the BGR conversion
+    and copy, and are never handed to the consumer. Frame indices are 1-based
+    to match the processing loop's ``frame_count``.
+    """
+
+    def __init__(self, cap, should_decode=None, queue_size=8, last_index=None, tracer=None):
+        self.cap = cap
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.should_decode = should_decode or (lambda index: True)
+        self.last_index = last_index  # stop reading after this frame
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='prefetch', daemon=True)
+        self.frames_read = 0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _put(self, item):
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        index = 0
+        try:
+            while not self._stop_event.is_set():
+                index += 1
+                if self.last_index is not None and index > self.last_index:
+                    break
+                if self.should_decode(index):
+                    with self.tracer.span('read', cat='prefetch', frame=index):
+                        ret, frame = self.cap.read()
+                    if not ret:
+                        break
+                    if not self._put((index, frame)):
+                        break
+                else:
+                    with self.tracer.span('grab', cat='prefetch', frame=index):
+                        grabbed = self.cap.grab()
+                    if not grabbed:
+                        break
+                self.frames_read = index
+        except Exception as e:
+            print(f"Frame prefetch error: {e}")
+        finally:
+            self._put(None)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            yield item
+
+    def stop(self):
+        """Stop the reader thread; must be called before releasing the capture."""
+        self._stop_event.set()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+
+def detect_active_segment(video_path: str, fps: float, sample_fps: float = 8, thumb_width: int = 96,
+                          margin_sec: float = 1.0, static_hold: bool = False):
+    """
+    Cheap pre-pass that finds where the exercise happens in a clip.
+    
+    Samples downscaled grayscale frames at ~sample_fps and measures motion
+    energy between samples. The segment runs from the first active sample to
+    the last one, so rests between sets and still phases stay in; only the
+    idle lead-in and lead-out are trimmed.
+    
+    A static hold (plank, wall sit) barely moves once the person is in
+    position, so a clip that ends mid-hold would look idle after the
+    get-in. With static_hold only the lead-in is trimmed.
+    
+    Returns:
+        dict with start/end frame (1-based, inclusive) and seconds, or None if
+        the clip has no clear idle part and should be analyzed in full
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+    
+    stride = max(1, int(round(fps / sample_fps)))
+    sample_indices = []
+    energies = []
+    prev_thumb = None
+    index = 0
+    try:
+        while True:
+            index += 1
+            if index % stride:
+                if not cap.grab():
+                    break
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            h, w = frame.shape[:2]
+            thumb_size = (thumb_width, max(1, int(h * thumb_width / w)))
+            thumb = cv2.cvtColor(cv2.resize(frame, thumb_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+            if prev_thumb is not None:
+                energies.append(float(cv2.absdiff(thumb, prev_thumb).mean()))
+                sample_indices.append(index)
+            prev_thumb = thumb
+    finally:
+        cap.release()
+    
+    total_frames = index - 1
+    samples_per_sec = fps / stride
+    if len(energies) < samples_per_sec * 3:
+        return None
+    
+    # Smooth over ~1 second so single-frame noise does not count
+    window = max(1, int(samples_per_sec))
+    smoothed = np.convolve(energies, np.ones(window) / window, mode='same')
+    floor, peak = np.percentile(smoothed, [20, 95])
+    if peak - floor < 0.5:
+        return None
+    threshold = floor + 0.25 * (peak - floor)
+    active = smoothed > threshold
+    
+    active_samples = np.flatnonzero(active)
+    if len(active_samples) == 0:
+        return None
+    first, last = active_samples[0], active_samples[-1]
+    margin = int(margin_sec * fps)
+    start_frame = max(1, sample_indices[first] - stride - margin)
+    end_frame = total_frames if static_hold else min(total_frames, sample_indices[last] + margin)
+    
+    return {
+        'start_frame': start_frame,
+        'end_frame': end_frame,
+        'start_sec': round((start_frame - 1) / fps, 2),
+        'end_sec': round(end_frame / fps, 2),
+        'total_frames': total_frames,
+        'motion_threshold': round(float(threshold), 3),
+    }
+
+
 def draw_skeleton(frame, landmarks, mp_pose, mp_drawing):
     """Draw enhanced skeleton on frame with neon glow effect"""
     h, w = frame.shape[:2]
@@ -218,11 +389,36 @@ def draw_stats_overlay(frame, stats):
     return frame
 
 
-def process_video(video_path: str, exercise_type: str, output_json_path: str, output_video_path: str = None):
-    """Process video, draw skeleton, and write results"""
-    import mediapipe as mp
+def read_sample_frames(video_path: str, count: int = 5, repeats: int = 3):
+    """Frames spread over the clip (each repeated so MediaPipe tracks), for model benchmarking"""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    try:
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        for i in range(count):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(total * (i + 1) / (count + 1)))
+            ret, frame = cap.read()
+            if ret:
+                frames.extend([frame] * repeats)
+    finally:
+        cap.release()
+    return frames
+
+
+def process_video(video_path: str, exercise_type: str, output_json_path: str, output_video_path: str = None,
+                  inference_width: int = None, model_complexity=1, latency_budget_ms: float = None,
+                  benchmark_cache: str = None, detect_segment: bool = True, trace_path: str = None):
+    """Process video, draw skeleton, and write results (and a Chrome trace to trace_path)"""
+    from pose_estimation.estimation import PoseEstimator, DEFAULT_INFERENCE_WIDTH
     from exercises.engine import ExerciseEngine
     
+    # Stage timings go into the results JSON for the web process' /metrics
+    tracer = Tracer(TRACE_CAPACITY, enabled=trace_path is not None)
+    stages = stage_metrics(MetricsRegistry(), 'video', tracer)
+    
+    if inference_width is None:
+        inference_width = DEFAULT_INFERENCE_WIDTH
+    
     results = {
         'status': 'processing',
         'progress': 0,
@@ -237,13 +433,15 @@ def process_video(video_path: str, exercise_type: str, output_json_path: str, ou
     }
     
     def save_results():
+        results['stage_metrics'] = stages.export()
         with open(output_json_path, 'w') as f:
             json.dump(results, f)
     
     cap = None
     out = None
-    pose = None
+    pose_estimator = None
     imageio_writer = None
+    prefetcher = None
     
     try:
         # Open video
@@ -318,21 +516,26 @@ def process_video(video_path: str, exercise_type: str, output_json_path: str, ou
             results['output_video'] = output_video_path
             print(f"Output video: {output_video_path}")
         
-        # Initialize MediaPipe
-        mp_pose = mp.solutions.pose
-        mp_drawing = mp.solutions.drawing_utils
-        
-        pose = mp_pose.Pose(
-            static_image_mode=False,  # Video mode for better tracking
-            model_complexity=1,  # Better accuracy
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+        # Initialize MediaPipe (video mode for better tracking)
+        pose_estimator = PoseEstimator(
+            static_mode=False,
+            model_complexity=model_complexity,
+            inference_width=inference_width,
+            track_roi=True,
+            latency_budget_ms=latency_budget_ms,
+            benchmark_frames=read_sample_frames(video_path) if model_complexity == 'auto' else None,
+            benchmark_cache=benchmark_cache
         )
-        print("MediaPipe Pose initialized")
+        results['pose_model'] = pose_estimator.get_model_info()
+        print(f"Pose model: {results['pose_model']['model']}")
+        mp_pose = pose_estimator.mp_pose
+        mp_drawing = pose_estimator.mp_drawing
+        inference_w, inference_h = pose_estimator.get_inference_size((height, width))
+        results['inference_size'] = [inference_w, inference_h]
+        print(f"MediaPipe Pose initialized (inference at {inference_w}x{inference_h})")
         
         # Initialize exercise engine
-        engine = ExerciseEngine()
+        engine = ExerciseEngine(stages=stages)
         if not engine.set_exercise(exercise_type):
             print(f"WARNING: Failed to load exercise: {exercise_type}")
         else:
@@ -351,21 +554,55 @@ def process_video(video_path: str, exercise_type: str, output_json_path: str, ou
             'feedback': ''
         }
         
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            frame_count += 1
-            results['progress'] = int((frame_count / total_frames) * 100)
+        # Find the active exercise interval so idle lead-in/lead-out
+        # skip MediaPipe entirely
+        static_hold = engine.exercise is not None and engine.exercise.type == 'duration'
+        segment = detect_active_segment(video_path, fps, static_hold=static_hold) if detect_segment else None
+        if segment:
+            segment_start, segment_end = segment['start_frame'], segment['end_frame']
+            print(f"Active segment: {segment['start_sec']}s - {segment['end_sec']}s")
+        else:
+            segment_start, segment_end = 1, None
+        results['active_segment'] = segment
+        
+        def in_segment(index):
+            return index >= segment_start and (segment_end is None or index <= segment_end)
+        
+        # Without a rendered output only analysis frames are needed: skipped
+        # frames are grabbed but never decoded or sent through MediaPipe.
+        render_output = imageio_writer is not None or out is not None
+        if render_output:
+            should_decode = None
+            last_index = None
+        else:
+            should_decode = lambda index: index % analyze_skip == 0 and in_segment(index)
+            last_index = segment_end
+            print("No output video requested, running at analysis rate")
+        results['analysis_only'] = not render_output
+        
+        prefetcher = FramePrefetcher(cap, should_decode, last_index=last_index, tracer=tracer).start()
+        last_saved_frame = 0
+        wait_start = time.perf_counter()
+        
+        for frame_count, frame in prefetcher:
+            # Time spent waiting for the prefetch thread to decode
+            frame_start = time.perf_counter()
+            stages.observe('decode', frame_start - wait_start)
+            tracer.add('decode', wait_start, frame_start, 'video')
+            if total_frames > 0:
+                results['progress'] = min(100, int((frame_count / total_frames) * 100))
             
-            # Process with MediaPipe
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pose_results = pose.process(rgb_frame)
+            # Process with MediaPipe at inference resolution
+            if in_segment(frame_count):
+                with stages.time('estimate_pose'):
+                    pose_results = pose_estimator.process(frame)
+            else:
+                pose_results = None
             
-            if pose_results.pose_landmarks:
+            if pose_results is not None and pose_results.pose_landmarks:
                 # Draw skeleton on frame
-                frame = draw_skeleton(frame, pose_results.pose_landmarks, mp_pose, mp_drawing)
+                with stages.time('skeleton_overlay'):
+                    frame = draw_skeleton(frame, pose_results.pose_landmarks, mp_pose, mp_drawing)
                 
                 # Analyze exercise periodically
                 if frame_count % analyze_skip == 0:
@@ -395,30 +632,42 @@ def process_video(video_path: str, exercise_type: str, output_json_path: str, ou
                         print(f"[Frame {frame_count}] Counter: {status.get('counter', 0)}, State: {status.get('current_state')}, Left: {status.get('counter_left', 'N/A')}, Right: {status.get('counter_right', 'N/A')}")
             
             # Draw stats overlay
-            frame = draw_stats_overlay(frame, current_stats)
+            with stages.time('status_overlay'):
+                frame = draw_stats_overlay(frame, current_stats)
             
             # Write frame to output video
             if imageio_writer:
-                # Convert BGR to RGB for imageio
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                imageio_writer.append_data(frame_rgb)
+                with stages.time('h264_encode'):
+                    # Convert BGR to RGB for imageio
+                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    imageio_writer.append_data(frame_rgb)
             elif out:
-                out.write(frame)
+                with stages.time('video_encode'):
+                    out.write(frame)
             
             # Save intermediate results
-            if frame_count % 60 == 0:
+            if frame_count - last_saved_frame >= 60:
+                last_saved_frame = frame_count
+                results['pose_model'] = pose_estimator.get_model_info()
                 save_results()
             
             # Memory management
-            del rgb_frame
             if frame_count % 100 == 0:
                 gc.collect()
+            wait_start = time.perf_counter()
+            tracer.add('frame', frame_start, wait_start, 'video', {'frame': frame_count})
+        
+        frame_count = prefetcher.frames_read
+        prefetcher.stop()
+        
+        results['roi_stats'] = dict(pose_estimator.roi_stats)
+        results['pose_model'] = pose_estimator.get_model_info()
         
         # Cleanup video capture
         if cap:
             cap.release()
-        if pose:
-            pose.close()
+        if pose_estimator:
+            pose_estimator.close()
         
         # IMPORTANT: Write final stats to results (in case last frame didn't trigger update)
         results['reps'] = current_stats['reps']
@@ -473,6 +722,8 @@ def process_video(video_path: str, exercise_type: str, output_json_path: str, ou
         import traceback
         traceback.print_exc()
     finally:
+        if prefetcher:
+            prefetcher.stop()
         if cap:
             try:
                 cap.release()
@@ -488,22 +739,44 @@ def process_video(video_path: str, exercise_type: str, output_json_path: str, ou
                 out.release()
             except:
                 pass
-        if pose:
+        if pose_estimator:
             try:
-                pose.close()
+                pose_estimator.close()
             except:
                 pass
+        if trace_path:
+            try:
+                tracer.dump(trace_path)
+                print(f"Trace written: {trace_path} ({len(tracer)} spans)")
+            except OSError as e:
+                print(f"Error writing trace: {e}")
         gc.collect()
 
 
 if __name__ == '__main__':
-    if len(sys.argv) < 4:
-        print("Usage: python video_processor.py <video_path> <exercise_type> <output_json_path> [output_video_path]")
-        sys.exit(1)
-    
-    video_path = sys.argv[1]
-    exercise_type = sys.argv[2]
-    output_json_path = sys.argv[3]
-    output_video_path = sys.argv[4] if len(sys.argv) > 4 else None
-    
-    process_video(video_path, exercise_type, output_json_path, output_video_path)
+    parser = argparse.ArgumentParser(description="Analyze an exercise video and write results as JSON")
+    parser.add_argument('video_path')
+    parser.add_argument('exercise_type')
+    parser.add_argument('output_json_path')
+    parser.add_argument('output_video_path', nargs='?', default=None)
+    parser.add_argument('--inference-width', type=int, default=None,
+                        help="Downscale frames wider than this before pose inference (0 = source resolution)")
+    parser.add_argument('--model-complexity', default='1', choices=['0', '1', '2', 'auto'],
+                        help="MediaPipe model, or auto to pick one from the latency budget")
+    parser.add_argument('--latency-budget-ms', type=float, default=None,
+                        help="Per-frame inference budget used by --model-complexity=auto")
+    parser.add_argument('--benchmark-cache', default=None,
+                        help="JSON file for sharing host model benchmarks between jobs")
+    parser.add_argument('--no-segment-detection', action='store_true',
+                        help="Analyze the whole clip instead of only the detected active segment")
+    parser.add_argument('--trace', default=None, metavar='TRACE_JSON',
+                        help="Write per-frame stage spans as Chrome trace-event JSON (chrome://tracing, Perfetto)")
+    args = parser.parse_args()
+    
+    model_complexity = args.model_complexity if args.model_complexity == 'auto' else int(args.model_complexity)
+    # The web server's admin profiler samples this job on request (utils/profiler.py)
+    install_signal_handler(args.output_json_path)
+    process_video(args.video_path, args.exercise_type, args.output_json_path, args.output_video_path,
+                  inference_width=args.inference_width, model_complexity=model_complexity,
+                  latency_budget_ms=args.latency_budget_ms, benchmark_cache=args.benchmark_cache,
+                  detect_segment=not args.no_segment_detection, trace_path=args.trace)